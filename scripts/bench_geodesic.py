@@ -0,0 +1,85 @@
+"""Micro-benchmark: scalar haversine loops vs the NumPy geodesic kernels.
+
+Usage (from the repo root):
+
+    PYTHONPATH=. python scripts/bench_geodesic.py
+"""
+
+from __future__ import annotations
+
+import random
+import time
+from typing import Callable
+
+import numpy as np
+
+from src.domain.algorithms.geo_utils import haversine_distance_m
+from src.domain.algorithms.geodesic import (
+    as_arrays,
+    cumulative_distances_m,
+    distances_from_m,
+)
+from src.domain.models import GeoPoint
+
+
+def _best_ms(fn: Callable[[], object], repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, (time.perf_counter() - t0) * 1000.0)
+    return best
+
+
+def _scalar_cumulative(points: list[GeoPoint]) -> list[float]:
+    out = [0.0]
+    for a, b in zip(points, points[1:]):
+        out.append(out[-1] + haversine_distance_m(a, b))
+    return out
+
+
+def _scalar_nearest(points: list[GeoPoint], target: GeoPoint) -> int:
+    best_i, best_d = 0, float("inf")
+    for i, p in enumerate(points):
+        d = haversine_distance_m(p, target)
+        if d < best_d:
+            best_i, best_d = i, d
+    return best_i
+
+
+def main() -> None:
+    rng = random.Random(1)
+    target = GeoPoint(lat=28.11, lon=-15.43)
+    print(f"{'case':<28} {'n':>7} {'scalar ms':>10} {'numpy ms':>10} {'speedup':>8}")
+    for n in (100, 1_000, 10_000, 100_000):
+        pts = [
+            GeoPoint(lat=28.08 + rng.random() * 0.06, lon=-15.45 + rng.random() * 0.06)
+            for _ in range(n)
+        ]
+        lats, lons = as_arrays(pts)
+        cases = {
+            "cumulative distances": (
+                lambda pts=pts: _scalar_cumulative(pts),
+                lambda lats=lats, lons=lons: cumulative_distances_m(lats, lons),
+            ),
+            "nearest vertex": (
+                lambda pts=pts: _scalar_nearest(pts, target),
+                lambda lats=lats, lons=lons: int(
+                    np.argmin(distances_from_m(target.lat, target.lon, lats, lons))
+                ),
+            ),
+            "nearest vertex (+to arrays)": (
+                lambda pts=pts: _scalar_nearest(pts, target),
+                lambda pts=pts: int(
+                    np.argmin(distances_from_m(target.lat, target.lon, *as_arrays(pts)))
+                ),
+            ),
+        }
+        for name, (scalar, vector) in cases.items():
+            s_ms = _best_ms(scalar)
+            v_ms = _best_ms(vector)
+            print(f"{name:<28} {n:>7} {s_ms:>10.3f} {v_ms:>10.3f} {s_ms / v_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
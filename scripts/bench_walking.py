@@ -0,0 +1,117 @@
+"""Benchmark point-to-point walking searches.
+
+Compares the networkx reference (nx.shortest_path) with the walk_search
+backends (Dijkstra, A* with haversine, ALT) and reports settled-node counts
+and latency.
+
+Usage (from the repo root):
+
+    PYTHONPATH=. python scripts/bench_walking.py                # synthetic grid
+    PYTHONPATH=. python scripts/bench_walking.py graph.graphml  # real graph
+"""
+
+from __future__ import annotations
+
+import random
+import statistics
+import sys
+import time
+from typing import Any
+
+import networkx as nx
+
+from src.app.services.routing_helpers import (
+    build_landmark_table,
+    shortest_walk,
+    walk_search,
+)
+
+
+def _grid_graph(n: int = 120) -> Any:
+    g = nx.MultiDiGraph()
+    step = 0.0009  # ~100 m
+    rng = random.Random(7)
+    for i in range(n):
+        for j in range(n):
+            g.add_node((i, j), x=-15.45 + j * step, y=28.08 + i * step)
+    for i in range(n):
+        for j in range(n):
+            for di, dj in ((0, 1), (1, 0)):
+                b = (i + di, j + dj)
+                if b not in g:
+                    continue
+                length = 100.0 * (1.0 + rng.random() * 0.4)
+                g.add_edge((i, j), b, length=length)
+                g.add_edge(b, (i, j), length=length)
+    return g
+
+
+def _load_graph(path: str) -> Any:
+    if path.lower().endswith(".graphml"):
+        import osmnx as ox
+
+        return ox.load_graphml(path)
+    import pickle
+
+    with open(path, "rb") as fp:
+        return pickle.load(fp)
+
+
+def _time_ms(fn) -> tuple[float, Any]:
+    t0 = time.perf_counter()
+    out = fn()
+    return (time.perf_counter() - t0) * 1000.0, out
+
+
+def main() -> None:
+    graph = _load_graph(sys.argv[1]) if len(sys.argv) > 1 else _grid_graph()
+    nodes = list(graph.nodes)
+    rng = random.Random(42)
+    pairs = [(rng.choice(nodes), rng.choice(nodes)) for _ in range(30)]
+
+    build_ms, landmarks = _time_ms(
+        lambda: build_landmark_table(graph, graph_version="bench", count=8)
+    )
+    print(
+        f"graph: {graph.number_of_nodes()} nodes, {graph.number_of_edges()} edges; "
+        f"landmarks built in {build_ms:.0f} ms"
+    )
+
+    methods = {
+        "networkx": lambda s, t: (
+            nx.shortest_path(graph, s, t, weight="length"),
+            None,
+        ),
+        "dijkstra": lambda s, t: (None, walk_search(graph, s, targets=(t,))),
+        "astar": lambda s, t: (None, shortest_walk(graph, s, t, method="astar")),
+        "alt": lambda s, t: (
+            None,
+            shortest_walk(graph, s, t, method="alt", landmarks=landmarks),
+        ),
+    }
+
+    print(f"{'method':<10} {'median ms':>10} {'p95 ms':>10} {'settled (median)':>18}")
+    for name, fn in methods.items():
+        times: list[float] = []
+        settled: list[int] = []
+        for s, t in pairs:
+            try:
+                ms, (_, tree) = _time_ms(lambda fn=fn, s=s, t=t: fn(s, t))
+            except nx.NetworkXNoPath:
+                continue
+            times.append(ms)
+            if tree is not None:
+                settled.append(len(tree.dist_m))
+        if not times:
+            continue
+        times.sort()
+        p95 = times[min(len(times) - 1, int(len(times) * 0.95))]
+        settled_txt = f"{int(statistics.median(settled))}" if settled else "n/a"
+        print(
+            f"{name:<10} {statistics.median(times):>10.2f} {p95:>10.2f} "
+            f"{settled_txt:>18}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Build the routing artifacts stored next to the prebuilt walking graph.
+
+Snapping every GTFS stop onto the street graph is too slow for a request,
+so the router only loads the table written here ('<OSM_GRAPH_PATH>.stops.json'
+or STOP_SNAPS_PATH) and snaps stops per request while it is missing or
+stale. With --landmarks the ALT landmark table ('<OSM_GRAPH_PATH>.landmarks.pkl'
+or LANDMARKS_PATH) is built too; without it WALK_SEARCH_METHOD=alt runs as
+plain A*. Re-run after changing the GTFS feed or the graph.
+
+Usage (from the repo root):
+
+    OSM_GRAPH_PATH=data/lpa_walk.graphml PYTHONPATH=. \\
+        python scripts/build_routing_artifacts.py --landmarks 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from src.adapters.maps.osmnx_map_adapter import OSMnxMapAdapter
+from src.adapters.persistence.local_gtfs_repository import LocalGtfsRepository
+from src.adapters.persistence.local_landmark_repository import (
+    LocalLandmarkRepository,
+)
+from src.adapters.persistence.local_stop_snap_repository import (
+    LocalStopSnapRepository,
+)
+from src.app.services.multimodal_routing_service import MultimodalRoutingService
+from src.domain.models import GeoPoint
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--landmarks",
+        type=int,
+        default=0,
+        metavar="N",
+        help="also build an ALT table with N landmarks (default: skip)",
+    )
+    args = parser.parse_args()
+    if not (os.getenv("OSM_GRAPH_PATH") or "").strip():
+        sys.exit("OSM_GRAPH_PATH must point to the prebuilt walking graph")
+
+    service = MultimodalRoutingService(
+        gtfs_repository=LocalGtfsRepository(),
+        map_provider=OSMnxMapAdapter(network_type="walk"),
+        stop_snap_repository=LocalStopSnapRepository(),
+        landmark_repository=LocalLandmarkRepository() if args.landmarks > 0 else None,
+        landmark_count=max(1, args.landmarks),
+    )
+    # With OSM_GRAPH_PATH set the whole prebuilt graph is returned.
+    graph = service.map_provider.get_street_graph(
+        center=GeoPoint(lat=0.0, lon=0.0), dist_m=service.street_graph_dist_m
+    )
+
+    stats: dict[str, object] = {}
+    t0 = time.perf_counter()
+    snaps = service.prepare_stop_snaps(graph)
+    stats["stop_snaps"] = {
+        "stops": len(snaps.snaps_by_stop_id) if snaps else 0,
+        "graph_version": snaps.graph_version if snaps else None,
+        "seconds": round(time.perf_counter() - t0, 2),
+    }
+    if args.landmarks > 0:
+        t0 = time.perf_counter()
+        landmarks = service.prepare_landmarks(graph)
+        stats["landmarks"] = {
+            "landmarks": len(landmarks.landmarks) if landmarks else 0,
+            "graph_version": landmarks.graph_version if landmarks else None,
+            "seconds": round(time.perf_counter() - t0, 2),
+        }
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Prune, strip and contract a prebuilt walking graph.
+
+Keeps the largest strongly connected component, drops every attribute the
+router does not read and contracts degree-2 chains into shortcut edges (with
+their original geometry). Prints the statistics as JSON.
+
+Usage (from the repo root):
+
+    PYTHONPATH=. python scripts/preprocess_graph.py in.graphml out.graphml
+    PYTHONPATH=. python scripts/preprocess_graph.py in.pkl out.pkl --no-contract
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import pickle
+from pathlib import Path
+from typing import Any
+
+import osmnx as ox
+
+from src.adapters.maps.graph_preprocessing import preprocess_walk_graph
+
+
+def _load(path: Path) -> Any:
+    if path.name.lower().endswith(".graphml"):
+        return ox.load_graphml(path)
+    with open(path, "rb") as fp:
+        return pickle.load(fp)
+
+
+def _save(graph: Any, path: Path) -> None:
+    if path.name.lower().endswith(".graphml"):
+        ox.save_graphml(graph, path)
+        return
+    with open(path, "wb") as fp:
+        pickle.dump(graph, fp, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source", type=Path)
+    parser.add_argument("target", type=Path)
+    parser.add_argument(
+        "--no-contract", action="store_true", help="skip degree-2 contraction"
+    )
+    args = parser.parse_args()
+
+    graph, stats = preprocess_walk_graph(
+        _load(args.source), contract=not args.no_contract
+    )
+    _save(graph, args.target)
+    print(json.dumps(stats.as_dict(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,68 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
+from typing import Iterable
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 
-from src.adapters.api.dependencies import get_realtime_view_service
+from src.adapters.api.dependencies import (
+    get_realtime_view_service,
+    get_vehicle_stream_hub,
+)
 from src.adapters.api.schemas.realtime import (
+    DepartureSchema,
     RouteShapeSchema,
     RouteShapesSchema,
+    StopDeparturesSchema,
     StopSchema,
+    TrailPointSchema,
     TransitRouteSchema,
+    VehicleMatchesResponseSchema,
+    VehicleMatchSchema,
     VehicleSchema,
     VehiclesResponseSchema,
+    VehicleTrailSchema,
+    VehicleTrailsResponseSchema,
 )
 from src.adapters.api.schemas.routes import GeoPointSchema
 from src.app.services.realtime_view_service import RealtimeViewService
+from src.app.services.vehicle_stream import VehicleStreamHub
+from src.domain.models.geo import BoundingBox, GeoPoint
 
 router = APIRouter(prefix="/realtime", tags=["realtime"])
 
+BBOX_QUERY = Query(
+    default=None,
+    description="Viewport as 'min_lon,min_lat,max_lon,max_lat' (WGS84).",
+)
+
+
+def _parse_bbox(raw: str | None) -> BoundingBox | None:
+    if raw is None or not raw.strip():
+        return None
+    try:
+        min_lon, min_lat, max_lon, max_lat = (float(x) for x in raw.split(","))
+        return BoundingBox(
+            min_lat=min_lat, min_lon=min_lon, max_lat=max_lat, max_lon=max_lon
+        )
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=422,
+            detail="bbox must be 'min_lon,min_lat,max_lon,max_lat'",
+        ) from exc
+
+
+def _stop_schemas(stops: Iterable[tuple[str, str, GeoPoint]]) -> list[StopSchema]:
+    return [
+        StopSchema(
+            stop_id=sid,
+            name=name,
+            location=GeoPointSchema(lat=loc.lat, lon=loc.lon),
+        )
+        for (sid, name, loc) in stops
+    ]
+
 
 @router.get("/routes", response_model=list[TransitRouteSchema])
 def list_routes(
@@ -56,31 +101,68 @@ def get_route_shape(
 @router.get("/routes/{route_id}/stops", response_model=list[StopSchema])
 def get_route_stops(
     route_id: str,
+    direction_id: str | None = Query(default=None),
+    bbox: str | None = BBOX_QUERY,
     service: RealtimeViewService = Depends(get_realtime_view_service),
 ) -> list[StopSchema]:
-    stops = service.route_stops(route_id=route_id)
-    return [
-        StopSchema(
-            stop_id=sid,
-            name=name,
-            location=GeoPointSchema(lat=loc.lat, lon=loc.lon),
-        )
-        for (sid, name, loc) in stops
-    ]
+    stops = service.route_stops(
+        route_id=route_id, direction_id=direction_id, bbox=_parse_bbox(bbox)
+    )
+    return _stop_schemas(stops)
+
+
+@router.get("/stops", response_model=list[StopSchema])
+def get_stops_in_bbox(
+    bbox: str = Query(description=BBOX_QUERY.description),
+    limit: int | None = Query(default=None, ge=1),
+    service: RealtimeViewService = Depends(get_realtime_view_service),
+) -> list[StopSchema]:
+    box = _parse_bbox(bbox)
+    if box is None:
+        raise HTTPException(status_code=422, detail="bbox is required")
+    return _stop_schemas(service.stops_in_bbox(bbox=box, limit=limit))
+
+
+@router.get("/stops/{stop_id}/departures", response_model=StopDeparturesSchema)
+async def get_stop_departures(
+    stop_id: str,
+    limit: int = Query(default=10, ge=1, le=100),
+    service: RealtimeViewService = Depends(get_realtime_view_service),
+) -> StopDeparturesSchema:
+    board = await service.stop_departures(stop_id=stop_id, limit=limit)
+    if board is None:
+        raise HTTPException(status_code=404, detail="Stop not found")
+    stop, rows = board
+    return StopDeparturesSchema(
+        stop_id=stop.id,
+        name=stop.name,
+        departures=[
+            DepartureSchema(
+                trip_id=row.departure.trip_id,
+                route_id=row.departure.route_id,
+                route_short_name=row.route_short_name,
+                headsign=row.departure.headsign,
+                scheduled_at=row.scheduled_at,
+                expected_at=row.expected_at,
+                delay_s=row.delay_s,
+            )
+            for row in rows
+        ],
+    )
 
 
 @router.get("/vehicles", response_model=VehiclesResponseSchema)
 async def list_vehicles(
     route_id: list[str] = Query(default=[]),
+    bbox: str | None = BBOX_QUERY,
     service: RealtimeViewService = Depends(get_realtime_view_service),
 ) -> VehiclesResponseSchema:
     route_ids = set(route_id) or None
-    vehicles = await service.list_vehicles(route_ids=route_ids)
+    snap = await service.vehicle_snapshot(route_ids=route_ids, bbox=_parse_bbox(bbox))
 
-    fetched_at = datetime.now(tz=timezone.utc)
     return VehiclesResponseSchema(
-        fetched_at=fetched_at,
-        is_cached=False,
+        fetched_at=snap.fetched_at or datetime.now(tz=timezone.utc),
+        is_cached=snap.is_cached,
         vehicles=[
             VehicleSchema(
                 vehicle_id=v.vehicle_id,
@@ -93,6 +175,86 @@ async def list_vehicles(
                 timestamp=v.timestamp,
                 stop_id=v.stop_id,
             )
-            for v in vehicles
+            for v in snap.vehicles
+        ],
+    )
+
+
+@router.get("/vehicles/matched", response_model=VehicleMatchesResponseSchema)
+async def list_vehicle_matches(
+    route_id: list[str] = Query(default=[]),
+    service: RealtimeViewService = Depends(get_realtime_view_service),
+) -> VehicleMatchesResponseSchema:
+    """Vehicles snapped onto their trip shapes (distance along route, stop progress)."""
+
+    snap, matches = await service.vehicle_matches(route_ids=set(route_id) or None)
+    return VehicleMatchesResponseSchema(
+        fetched_at=snap.fetched_at or datetime.now(tz=timezone.utc),
+        is_cached=snap.is_cached,
+        matches=[
+            VehicleMatchSchema(
+                key=m.key,
+                trip_id=m.trip_id,
+                route_id=m.route_id,
+                shape_id=m.shape_id,
+                lat=m.lat,
+                lon=m.lon,
+                offset_m=m.offset_m,
+                along_m=m.along_m,
+                shape_length_m=m.shape_length_m,
+                prev_stop_id=m.prev_stop_id,
+                next_stop_id=m.next_stop_id,
+                stop_progress=m.stop_progress,
+            )
+            for m in matches
         ],
     )
+
+
+@router.get("/vehicles/trails", response_model=VehicleTrailsResponseSchema)
+def list_vehicle_trails(
+    route_id: list[str] = Query(default=[]),
+    max_age_s: float = Query(default=600.0, gt=0),
+    service: RealtimeViewService = Depends(get_realtime_view_service),
+) -> VehicleTrailsResponseSchema:
+    """Recent positions per vehicle (oldest first) from the in-process track store."""
+
+    trails = service.vehicle_trails(
+        route_ids=set(route_id) or None, max_age_s=max_age_s
+    )
+    return VehicleTrailsResponseSchema(
+        trails=[
+            VehicleTrailSchema(
+                key=t.key,
+                route_id=t.route_id,
+                points=[
+                    TrailPointSchema(
+                        lat=lat,
+                        lon=lon,
+                        timestamp=datetime.fromtimestamp(ts, tz=timezone.utc),
+                    )
+                    for ts, lat, lon in zip(t.timestamps, t.lats, t.lons)
+                ],
+            )
+            for t in trails
+        ]
+    )
+
+
+@router.get("/vehicles/stream")
+async def stream_vehicles(
+    route_id: list[str] = Query(default=[]),
+    hub: VehicleStreamHub = Depends(get_vehicle_stream_hub),
+) -> StreamingResponse:
+    """Server-Sent Events: a `snapshot` event, then compact `delta` events.
+
+    Vehicles use short keys (k=key, r=route_id, v=vehicle_id, t=trip_id,
+    b=bearing, s=speed_mps, ts=epoch seconds); deltas carry `upserted`
+    vehicles and `removed` keys.
+    """
+
+    return StreamingResponse(
+        hub.stream(set(route_id) or None),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
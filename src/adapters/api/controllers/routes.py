@@ -3,8 +3,13 @@ from __future__ import annotations
 from datetime import datetime
 
 from fastapi import APIRouter, Depends, HTTPException
+from starlette.concurrency import run_in_threadpool
 
-from src.adapters.api.dependencies import get_route_jobs_service, get_routing_service
+from src.adapters.api.dependencies import (
+    get_route_jobs_service,
+    get_routing_executor,
+    get_threadpool_routing_service,
+)
 from src.adapters.api.schemas.routes import (
     EnqueueResponseSchema,
     GeoPointSchema,
@@ -16,12 +21,31 @@ from src.adapters.api.schemas.routes import (
 )
 from src.app.services.multimodal_routing_service import MultimodalRoutingService
 from src.app.services.route_jobs_service import RouteJobsService
+from src.app.services.routing_executor import RoutingExecutor
+from src.domain.algorithms.polyline import GeometryFormat, path_for_response
+from src.domain.exceptions import RoutingBusy, RoutingTimeout, RoutingUnavailable
 from src.domain.models import GeoPoint
 
 router = APIRouter(tags=["routes"])
 
 
-def _route_to_schema(route) -> RouteSchema:
+def _route_to_schema(
+    route,
+    *,
+    geometry: GeometryFormat = "points",
+    simplify_m: float | None = None,
+) -> RouteSchema:
+    def leg_path(leg) -> tuple[list[GeoPointSchema] | None, str | None]:
+        pts, encoded = path_for_response(
+            getattr(leg, "path", None) or (),
+            geometry=geometry,
+            simplify_m=simplify_m,
+        )
+        if pts is None:
+            return None, encoded
+        return [GeoPointSchema(lat=p.lat, lon=p.lon) for p in pts], None
+
+    legs = [(leg, *leg_path(leg)) for leg in route.legs]
     return RouteSchema(
         origin=GeoPointSchema(lat=route.origin.lat, lon=route.origin.lon),
         destination=GeoPointSchema(
@@ -42,11 +66,8 @@ def _route_to_schema(route) -> RouteSchema:
                 arrive_at=getattr(leg, "arrive_at", None),
                 distance_m=leg.distance_m,
                 duration_s=leg.duration_s,
-                path=(
-                    [GeoPointSchema(lat=p.lat, lon=p.lon) for p in leg.path]
-                    if getattr(leg, "path", None)
-                    else None
-                ),
+                path=path,
+                path_polyline=path_polyline,
                 line=(
                     TransitLineSchema(
                         route_id=leg.line.route_id,
@@ -60,7 +81,7 @@ def _route_to_schema(route) -> RouteSchema:
                 ),
                 trip_id=getattr(leg, "trip_id", None),
             )
-            for leg in route.legs
+            for leg, path, path_polyline in legs
         ],
         total_distance_m=route.total_distance_m,
         total_duration_s=route.total_duration_s,
@@ -68,20 +89,38 @@ def _route_to_schema(route) -> RouteSchema:
 
 
 @router.post("/routes", response_model=RouteSchema)
-def calculate_route(
+async def calculate_route(
     req: RouteRequestSchema,
-    service: MultimodalRoutingService = Depends(get_routing_service),
+    service: MultimodalRoutingService | None = Depends(get_threadpool_routing_service),
+    executor: RoutingExecutor | None = Depends(get_routing_executor),
 ) -> RouteSchema:
     origin = GeoPoint(lat=req.origin.lat, lon=req.origin.lon)
     destination = GeoPoint(lat=req.destination.lat, lon=req.destination.lon)
     depart_at = req.depart_at or datetime.now()
-    route = service.calculate_route(
-        origin=origin,
-        destination=destination,
-        depart_at=depart_at,
-        preference=req.preference,
-    )
-    return _route_to_schema(route)
+    if service is not None:
+        route = await run_in_threadpool(
+            lambda: service.calculate_route(
+                origin=origin,
+                destination=destination,
+                depart_at=depart_at,
+                preference=req.preference,
+            )
+        )
+    elif executor is not None:
+        try:
+            route = await executor.calculate_route(
+                origin=origin,
+                destination=destination,
+                depart_at=depart_at,
+                preference=req.preference,
+            )
+        except (RoutingBusy, RoutingUnavailable) as exc:
+            raise HTTPException(status_code=503, detail=str(exc)) from exc
+        except RoutingTimeout as exc:
+            raise HTTPException(status_code=504, detail=str(exc)) from exc
+    else:
+        raise HTTPException(status_code=503, detail="Routing service not configured")
+    return _route_to_schema(route, geometry=req.geometry, simplify_m=req.simplify_m)
 
 
 @router.post("/routes/async", response_model=EnqueueResponseSchema)
@@ -97,6 +136,8 @@ def enqueue_route(
         destination=destination,
         depart_at=depart_at,
         preference=req.preference,
+        geometry=req.geometry,
+        simplify_m=req.simplify_m,
     )
     return EnqueueResponseSchema(request_id=request_id)
 
@@ -1,46 +1,99 @@
 from __future__ import annotations
 
+import logging
 import os
+import threading
 
-from src.adapters.maps.osmnx_map_adapter import OSMnxMapAdapter
-from src.adapters.maps.s3_cached_map_adapter import S3CachedMapAdapter
 from src.adapters.messaging.sqs_queue_adapter import SQSQueueAdapter
 from src.adapters.persistence.dynamodb_route_result_repository import (
     DynamoDbRouteResultRepository,
 )
 from src.adapters.persistence.local_gtfs_repository import LocalGtfsRepository
-from src.app.ports.output import IMapProvider
+from src.adapters.routing_factory import build_routing_service
 from src.app.services.multimodal_routing_service import MultimodalRoutingService
 from src.app.services.realtime_view_service import RealtimeViewService
 from src.app.services.route_jobs_service import RouteJobsService
+from src.app.services.routing_executor import RoutingExecutor
+from src.app.services.vehicle_stream import VehicleStreamHub
+from src.app.services.vehicle_tracks import shared_vehicle_tracks
+from src.domain.models import GeoPoint
+
+logger = logging.getLogger(__name__)
 
 
 def get_routing_service() -> MultimodalRoutingService:
-    gtfs_repo = LocalGtfsRepository()
-    base_provider: IMapProvider = OSMnxMapAdapter(network_type="walk")
-    map_provider: IMapProvider = base_provider
-    if os.getenv("STREET_GRAPH_BUCKET"):
-        map_provider = S3CachedMapAdapter(upstream=base_provider)
+    queue_service = SQSQueueAdapter() if os.getenv("SQS_QUEUE_URL") else None
+    return build_routing_service(LocalGtfsRepository(), queue_service=queue_service)
+
+
+def get_threadpool_routing_service() -> MultimodalRoutingService | None:
+    """Service for `POST /routes` in the API process; None with a pool."""
+
+    if get_routing_executor() is not None:
+        return None
+    return get_routing_service()
+
+
+def warm_routing_service() -> MultimodalRoutingService:
+    """Routing service for a long-lived worker process, loaded up front.
+
+    The feed stays parsed until its files change, and the street graph
+    around the stops' centroid is fetched once (the whole graph when
+    OSM_GRAPH_PATH is set) so it sits in the adapters' caches.
+    """
+
+    service = build_routing_service(LocalGtfsRepository(keep_loaded=True))
+    try:
+        stops = list(service.gtfs_repository.load_feed().stops_by_id.values())
+        if stops:
+            center = GeoPoint(
+                lat=sum(s.location.lat for s in stops) / len(stops),
+                lon=sum(s.location.lon for s in stops) / len(stops),
+            )
+            service.map_provider.get_street_graph(
+                center=center, dist_m=service.street_graph_dist_m
+            )
+    except Exception:
+        # A cold worker is still a working one.
+        logger.warning("Routing worker warm-up failed", exc_info=True)
+    return service
 
-    queue_service = None
-    if os.getenv("SQS_QUEUE_URL"):
-        queue_service = SQSQueueAdapter()
 
-    service = MultimodalRoutingService(
-        gtfs_repository=gtfs_repo,
-        map_provider=map_provider,
-        queue_service=queue_service,
-    )
+_routing_executor: RoutingExecutor | None = None
+_routing_executor_lock = threading.Lock()
 
-    # Allow tuning via env without changing code.
-    if os.getenv("STREET_GRAPH_DIST_M"):
-        service.street_graph_dist_m = int(os.environ["STREET_GRAPH_DIST_M"])
-    if os.getenv("CANDIDATE_RADIUS_M"):
-        service.candidate_radius_m = float(os.environ["CANDIDATE_RADIUS_M"])
-    if os.getenv("MAX_CANDIDATE_STOPS"):
-        service.max_candidate_stops = int(os.environ["MAX_CANDIDATE_STOPS"])
 
-    return service
+def get_routing_executor() -> RoutingExecutor | None:
+    """Process pool for `POST /routes`; None keeps the request threadpool.
+
+    Env vars:
+      - ROUTING_WORKERS: worker processes (default 0 = disabled)
+      - ROUTING_MAX_QUEUE: calculations waiting beyond the busy workers
+        before answering 503 (default 16)
+      - ROUTING_TIMEOUT_S: per-request budget before answering 504 (default 30)
+      - ROUTING_START_METHOD: multiprocessing start method (default spawn)
+    """
+
+    global _routing_executor
+    workers_raw = (os.getenv("ROUTING_WORKERS") or "").strip()
+    if not workers_raw or int(workers_raw) <= 0:
+        return None
+    with _routing_executor_lock:
+        if _routing_executor is None:
+            queue_raw = (os.getenv("ROUTING_MAX_QUEUE") or "").strip()
+            timeout_raw = (os.getenv("ROUTING_TIMEOUT_S") or "").strip()
+            _routing_executor = RoutingExecutor(
+                factory=warm_routing_service,
+                workers=int(workers_raw),
+                max_queue=int(queue_raw) if queue_raw else 16,
+                timeout_s=float(timeout_raw) if timeout_raw else 30.0,
+                start_method=(os.getenv("ROUTING_START_METHOD") or "spawn").strip(),
+            )
+        return _routing_executor
+
+
+def peek_routing_executor() -> RoutingExecutor | None:
+    return _routing_executor
 
 
 def get_route_jobs_service() -> RouteJobsService:
@@ -58,11 +111,43 @@ def get_realtime_view_service() -> RealtimeViewService:
     vehicle_provider = None
     if os.getenv("GTFS_RT_VEHICLE_POSITIONS_URL"):
         from src.adapters.realtime.http_gtfs_realtime_vehicle_provider import (
-            HttpGtfsRealtimeVehicleProvider,
+            shared_http_vehicle_provider,
         )
 
-        vehicle_provider = HttpGtfsRealtimeVehicleProvider()
+        vehicle_provider = shared_http_vehicle_provider()
 
     return RealtimeViewService(
-        gtfs_repository=gtfs_repo, vehicle_provider=vehicle_provider
+        gtfs_repository=gtfs_repo,
+        vehicle_provider=vehicle_provider,
+        tracks=shared_vehicle_tracks(),
     )
+
+
+_vehicle_hub: VehicleStreamHub | None = None
+_vehicle_hub_lock = threading.Lock()
+
+
+def get_vehicle_stream_hub() -> VehicleStreamHub:
+    """Process-wide producer for `/realtime/vehicles/stream`.
+
+    Env vars:
+      - VEHICLE_STREAM_INTERVAL_S: seconds between polls (default 5)
+    """
+
+    global _vehicle_hub
+    with _vehicle_hub_lock:
+        if _vehicle_hub is None:
+
+            async def changes(since: int | None):
+                service = get_realtime_view_service()
+                return await service.vehicle_changes(since=since)
+
+            raw = (os.getenv("VEHICLE_STREAM_INTERVAL_S") or "").strip()
+            _vehicle_hub = VehicleStreamHub(
+                source=changes, interval_s=float(raw) if raw else 5.0
+            )
+        return _vehicle_hub
+
+
+def peek_vehicle_stream_hub() -> VehicleStreamHub | None:
+    return _vehicle_hub
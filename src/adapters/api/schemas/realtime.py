@@ -47,3 +47,56 @@ class VehiclesResponseSchema(BaseModel):
     fetched_at: datetime
     is_cached: bool
     vehicles: list[VehicleSchema]
+
+
+class DepartureSchema(BaseModel):
+    trip_id: str
+    route_id: str | None = None
+    route_short_name: str | None = None
+    headsign: str | None = None
+    scheduled_at: datetime
+    expected_at: datetime
+    delay_s: int | None = None
+
+
+class StopDeparturesSchema(BaseModel):
+    stop_id: str
+    name: str
+    departures: list[DepartureSchema]
+
+
+class TrailPointSchema(BaseModel):
+    lat: float
+    lon: float
+    timestamp: datetime
+
+
+class VehicleTrailSchema(BaseModel):
+    key: str
+    route_id: str | None = None
+    points: list[TrailPointSchema]
+
+
+class VehicleTrailsResponseSchema(BaseModel):
+    trails: list[VehicleTrailSchema]
+
+
+class VehicleMatchSchema(BaseModel):
+    key: str | None = None
+    trip_id: str | None = None
+    route_id: str | None = None
+    shape_id: str
+    lat: float
+    lon: float
+    offset_m: float
+    along_m: float
+    shape_length_m: float
+    prev_stop_id: str | None = None
+    next_stop_id: str | None = None
+    stop_progress: float | None = None
+
+
+class VehicleMatchesResponseSchema(BaseModel):
+    fetched_at: datetime
+    is_cached: bool
+    matches: list[VehicleMatchSchema]
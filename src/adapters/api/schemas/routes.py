@@ -32,6 +32,8 @@ class RouteLegSchema(BaseModel):
     distance_m: float | None = None
     duration_s: float | None = None
     path: list[GeoPointSchema] | None = None
+    # Google encoded polyline, set instead of `path` when geometry="polyline".
+    path_polyline: str | None = None
     line: TransitLineSchema | None = None
     trip_id: str | None = None
 
@@ -50,6 +52,9 @@ class RouteRequestSchema(BaseModel):
     destination: GeoPointSchema
     depart_at: datetime | None = None
     preference: Literal["fastest", "least_walking"] = "fastest"
+    geometry: Literal["points", "polyline"] = "points"
+    # Douglas-Peucker tolerance in meters applied to leg paths (None = full).
+    simplify_m: float | None = Field(default=None, ge=0.0)
 
 
 class EnqueueResponseSchema(BaseModel):
@@ -1,5 +1,7 @@
 from .osmnx_map_adapter import OSMnxMapAdapter
+from .tiled_map_adapter import TiledMapAdapter
 
 __all__ = [
     "OSMnxMapAdapter",
+    "TiledMapAdapter",
 ]
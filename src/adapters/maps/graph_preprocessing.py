@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, cast
+
+import networkx as nx
+from shapely.geometry import LineString
+
+logger = logging.getLogger(__name__)
+
+# Edge attributes the routing code reads; everything else is dropped.
+KEEP_EDGE_ATTRS = ("length", "name", "geometry")
+KEEP_NODE_ATTRS = ("x", "y")
+
+
+@dataclass(frozen=True, slots=True)
+class GraphPrepStats:
+    nodes_before: int
+    edges_before: int
+    nodes_after: int
+    edges_after: int
+    components_dropped: int
+    nodes_pruned: int
+    nodes_contracted: int
+    seconds: float
+
+    def as_dict(self) -> dict[str, int | float]:
+        return asdict(self)
+
+
+def _largest_component(graph: Any) -> tuple[set[Any], int]:
+    """Nodes of the largest (strongly) connected component, plus #dropped."""
+
+    if graph.number_of_nodes() == 0:
+        return set(), 0
+    if graph.is_directed():
+        components = list(nx.strongly_connected_components(graph))
+    else:
+        components = list(nx.connected_components(graph))
+    return max(components, key=len), len(components) - 1
+
+
+def _strip_attributes(graph: Any) -> None:
+    for _, data in graph.nodes(data=True):
+        for k in [k for k in data if k not in KEEP_NODE_ATTRS]:
+            del data[k]
+    for *_, data in graph.edges(data=True):
+        for k in [k for k in data if k not in KEEP_EDGE_ATTRS]:
+            del data[k]
+
+
+def _single_edge(graph: Any, u: Any, v: Any) -> dict[str, Any] | None:
+    """Data of the only u->v edge, or None if there are zero or several."""
+
+    if not graph.has_edge(u, v):
+        return None
+    if graph.is_multigraph():
+        edges = graph[u][v]
+        if len(edges) != 1:
+            return None
+        return cast(dict[str, Any], next(iter(edges.values())))
+    return cast(dict[str, Any], graph[u][v])
+
+
+def _edge_coords(graph: Any, u: Any, v: Any, data: dict[str, Any]) -> list[tuple]:
+    a, b = graph.nodes[u], graph.nodes[v]
+    geom = data.get("geometry")
+    if geom is None:
+        return [(a["x"], a["y"]), (b["x"], b["y"])]
+    coords = list(geom.coords)
+    # Undirected graphs may store the geometry in either direction.
+    (x0, y0), (x1, y1) = coords[0], coords[-1]
+    d_start = (x0 - a["x"]) ** 2 + (y0 - a["y"]) ** 2
+    d_end = (x1 - a["x"]) ** 2 + (y1 - a["y"]) ** 2
+    return coords if d_start <= d_end else coords[::-1]
+
+
+def _merge(
+    graph: Any, u: Any, v: Any, w: Any, first: dict[str, Any], second: dict[str, Any]
+) -> dict[str, Any]:
+    """Attributes of the u->w shortcut replacing u->v->w."""
+
+    len_a = float(first.get("length") or 0.0)
+    len_b = float(second.get("length") or 0.0)
+    coords = _edge_coords(graph, u, v, first) + _edge_coords(graph, v, w, second)[1:]
+    merged: dict[str, Any] = {"length": len_a + len_b, "geometry": LineString(coords)}
+    # Keep the name of the longer piece so street lookups stay meaningful.
+    name = first.get("name") if len_a >= len_b else second.get("name")
+    if name is None:
+        name = first.get("name") or second.get("name")
+    if name is not None:
+        merged["name"] = name
+    return merged
+
+
+def _contract_node(graph: Any, v: Any) -> bool:
+    """Replace v's two-neighbour chain edges with shortcuts; False if not eligible."""
+
+    if graph.has_edge(v, v):
+        return False
+
+    if not graph.is_directed():
+        nbrs = list(graph.neighbors(v))
+        if len(nbrs) != 2:
+            return False
+        u, w = nbrs
+        a, b = _single_edge(graph, u, v), _single_edge(graph, v, w)
+        if (
+            a is None
+            or b is None
+            or (not graph.is_multigraph() and graph.has_edge(u, w))
+        ):
+            return False
+        graph.add_edge(u, w, **_merge(graph, u, v, w, a, b))
+        graph.remove_node(v)
+        return True
+
+    preds = set(graph.predecessors(v))
+    succs = set(graph.successors(v))
+    if len(preds | succs) != 2:
+        return False
+
+    if preds == succs:
+        # Two-way street: u <-> v <-> w.
+        u, w = preds
+        pairs = [(u, w), (w, u)]
+    elif len(preds) == 1 and len(succs) == 1:
+        # One-way street: u -> v -> w.
+        (u,), (w,) = preds, succs
+        pairs = [(u, w)]
+    else:
+        return False
+
+    merged: list[tuple[Any, Any, dict[str, Any]]] = []
+    for a, b in pairs:
+        first, second = _single_edge(graph, a, v), _single_edge(graph, v, b)
+        if first is None or second is None:
+            return False
+        if not graph.is_multigraph() and graph.has_edge(a, b):
+            return False
+        merged.append((a, b, _merge(graph, a, v, b, first, second)))
+
+    for a, b, data in merged:
+        graph.add_edge(a, b, **data)
+    graph.remove_node(v)
+    return True
+
+
+def preprocess_walk_graph(
+    graph: Any, *, contract: bool = True
+) -> tuple[Any, GraphPrepStats]:
+    """Prune, strip and contract a walking graph for routing.
+
+    - keeps only the largest strongly connected component (connected for
+      undirected graphs), so snapped points can always reach each other;
+    - drops every node/edge attribute except x/y and length/name/geometry;
+    - contracts degree-2 chains into shortcut edges whose `geometry` keeps the
+      original polyline and whose `length` is the chain sum.
+
+    Returns a new graph (the input is not modified) and the run statistics.
+    """
+
+    t0 = time.perf_counter()
+    nodes_before = graph.number_of_nodes()
+    edges_before = graph.number_of_edges()
+
+    keep, dropped = _largest_component(graph)
+    out = graph.subgraph(keep).copy()
+    _strip_attributes(out)
+    nodes_pruned = nodes_before - out.number_of_nodes()
+
+    contracted = 0
+    if contract:
+        for v in list(out.nodes):
+            if _contract_node(out, v):
+                contracted += 1
+
+    stats = GraphPrepStats(
+        nodes_before=nodes_before,
+        edges_before=edges_before,
+        nodes_after=out.number_of_nodes(),
+        edges_after=out.number_of_edges(),
+        components_dropped=dropped,
+        nodes_pruned=nodes_pruned,
+        nodes_contracted=contracted,
+        seconds=time.perf_counter() - t0,
+    )
+    logger.info("Preprocessed walk graph: %s", stats.as_dict())
+    return out, stats
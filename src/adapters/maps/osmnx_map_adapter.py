@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import hashlib
+import json
 import os
 import pickle
 from dataclasses import dataclass
@@ -12,6 +14,17 @@ from src.adapters.aws import s3_client
 from src.app.ports.output import IMapProvider
 from src.domain.models import GeoPoint
 
+from .graph_preprocessing import preprocess_walk_graph
+from .s3_ranged_download import download_s3_object
+
+
+def _file_version(path: Path) -> str:
+    """Cheap fingerprint of a graph artifact (name, size, mtime)."""
+
+    st = path.stat()
+    raw = f"{path.name}:{st.st_size}:{st.st_mtime_ns}"
+    return hashlib.sha1(raw.encode()).hexdigest()[:16]
+
 
 @dataclass(slots=True)
 class OSMnxMapAdapter(IMapProvider):
@@ -55,11 +68,13 @@ class OSMnxMapAdapter(IMapProvider):
             # numeric types (e.g. edge "length"), otherwise shortest-path can
             # fail and the app falls back to a straight-line walk.
             self._prebuilt_graph = ox.load_graphml(path)
+            self._prebuilt_graph.graph["graph_version"] = _file_version(p)
             return self._prebuilt_graph
 
         if path.lower().endswith((".pkl", ".pickle")):
             with open(path, "rb") as fp:
                 self._prebuilt_graph = pickle.load(fp)
+            self._prebuilt_graph.graph["graph_version"] = _file_version(p)
             return self._prebuilt_graph
 
         raise RuntimeError(f"Unsupported OSM_GRAPH_PATH format: {path}")
@@ -74,6 +89,8 @@ class OSMnxMapAdapter(IMapProvider):
                     - OSM_GRAPH_S3_URI: optional source (s3://bucket/key) to download the prebuilt file
           - OSM_GRAPH_AUTO_BUILD: if '1'/'true', build when file is missing (default: true when OSM_GRAPH_PATH is set)
           - OSM_PLACE: place string for OSMnx (e.g. 'Las Palmas de Gran Canaria, Canary Islands, Spain')
+          - OSM_GRAPH_PREPROCESS: if '0'/'false', skip pruning/contraction (default: on;
+            statistics are written to '<OSM_GRAPH_PATH>.prep.json')
         """
 
         raw_path = (os.getenv("OSM_GRAPH_PATH") or "").strip()
@@ -117,6 +134,11 @@ class OSMnxMapAdapter(IMapProvider):
             graph = ox.graph_from_place(
                 place, network_type=self.network_type, simplify=True
             )
+            prep_raw = (os.getenv("OSM_GRAPH_PREPROCESS") or "").strip().lower()
+            if prep_raw not in {"0", "false", "no", "off"}:
+                graph, stats = preprocess_walk_graph(graph)
+                stats_path = path.with_name(path.name + ".prep.json")
+                stats_path.write_text(json.dumps(stats.as_dict(), indent=2))
 
             tmp = path.with_suffix(path.suffix + ".tmp")
             if path.name.lower().endswith(".graphml"):
@@ -135,9 +157,17 @@ class OSMnxMapAdapter(IMapProvider):
         This is the preferred mode for AWS: store a fixed graph in S3 and download
         it on container start (fast), without ever rebuilding from Overpass.
 
+        The object is fetched with concurrent ranged GETs and streamed to the
+        temp file (gunzipped on the fly for '.gz' keys), so peak memory stays
+        bounded for graphs of hundreds of MB.
+
         Env vars:
           - OSM_GRAPH_PATH: local file path (target)
-          - OSM_GRAPH_S3_URI: s3://bucket/key (source)
+          - OSM_GRAPH_S3_URI: s3://bucket/key (source; may be '.gz')
+          - OSM_GRAPH_SHA256: expected SHA-256 of the S3 object (optional;
+            otherwise the object's 'sha256' metadata is used if present)
+          - OSM_GRAPH_DOWNLOAD_PART_MB: range size in MiB (default 8)
+          - OSM_GRAPH_DOWNLOAD_CONCURRENCY: parallel ranges (default 8)
         """
 
         raw_path = (os.getenv("OSM_GRAPH_PATH") or "").strip()
@@ -176,15 +206,55 @@ class OSMnxMapAdapter(IMapProvider):
             if path.exists():
                 return
 
-            s3 = s3_client()
-            obj = s3.get_object(Bucket=bucket, Key=key)
-            body = obj["Body"].read()
+            part_mb = float(os.getenv("OSM_GRAPH_DOWNLOAD_PART_MB") or 8)
+            concurrency = int(os.getenv("OSM_GRAPH_DOWNLOAD_CONCURRENCY") or 8)
 
             tmp = path.with_suffix(path.suffix + ".tmp")
-            with open(tmp, "wb") as fp:
-                fp.write(body)
+            try:
+                download_s3_object(
+                    s3_client(),
+                    bucket=bucket,
+                    key=key,
+                    dest=tmp,
+                    part_size=max(1, int(part_mb * 1024 * 1024)),
+                    concurrency=concurrency,
+                    decompress=key.lower().endswith(".gz")
+                    and not path.name.lower().endswith(".gz"),
+                    expected_sha256=(os.getenv("OSM_GRAPH_SHA256") or "").strip()
+                    or None,
+                )
+            except Exception:
+                tmp.unlink(missing_ok=True)
+                raise
             os.replace(tmp, path)
 
+    def get_tile_graph(
+        self, *, west: float, south: float, east: float, north: float
+    ) -> Any:
+        """Download the street graph of one bbox tile.
+
+        Edges crossing the tile border are kept (truncate_by_edge) and small
+        fragments are retained, so neighbouring tiles stitch together on
+        shared OSM node ids. Empty tiles (e.g. sea) yield an empty graph.
+        """
+
+        import networkx as nx
+        from osmnx._errors import InsufficientResponseError
+
+        self._configure_osmnx()
+        try:
+            return ox.graph_from_bbox(
+                (west, south, east, north),
+                network_type=self.network_type,
+                simplify=True,
+                retain_all=True,
+                truncate_by_edge=True,
+            )
+        except InsufficientResponseError:
+            empty = nx.MultiDiGraph()
+            empty.graph["crs"] = ox.settings.default_crs
+            return empty
+
     def get_street_graph(self, *, center: GeoPoint, dist_m: int) -> Any:
         self._configure_osmnx()
 
@@ -3,29 +3,89 @@ from __future__ import annotations
 import gzip
 import os
 import pickle
+import threading
+import time
+from collections import OrderedDict
 from dataclasses import dataclass
+from pathlib import Path
 from typing import Any
 
+from botocore.exceptions import ClientError
+
 from src.adapters.aws import s3_client
 from src.app.ports.output import IMapProvider
 from src.domain.models import GeoPoint
 
+# Marker stored in graph.graph once numeric attributes are coerced, so cached
+# graphs skip the per-node/per-edge normalization pass on load.
+_NORMALIZED = "urbanpath_normalized"
+
+
+@dataclass(slots=True)
+class _MemoryEntry:
+    graph: Any
+    etag: str | None
+    checked_at_monotonic: float
+
+
+# Process-wide memory tier (services and adapters are built per request).
+_lock = threading.Lock()
+_memory: OrderedDict[str, _MemoryEntry] = OrderedDict()
+
+
+def _encode(graph: Any) -> bytes:
+    return pickle.dumps(graph, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _decode(data: bytes) -> Any:
+    return pickle.loads(data)
+
+
+def _replace_file(path: Path, data: bytes) -> None:
+    # Unique per writer: other processes may store the same graph.
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def _is_not_modified(exc: ClientError) -> bool:
+    error = exc.response.get("Error", {})
+    status = exc.response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+    return str(error.get("Code")) in {"304", "NotModified"} or status == 304
+
 
 @dataclass(slots=True)
 class S3CachedMapAdapter(IMapProvider):
-    """Caches street graphs in S3.
+    """Caches street graphs in memory, on local disk and in S3.
 
     This is an adapter-level decorator around another IMapProvider.
 
+    Lookup order: in-process LRU (trusted for STREET_GRAPH_REFRESH_S), then
+    the local disk copy revalidated against S3 with an ETag-conditional GET,
+    then the upstream provider. Graphs are stored already normalized as a
+    highest-protocol pickle, so loading skips the numeric coercion pass
+    (gzip only on the S3 wire copy). Unpickling still rebuilds networkx's
+    per-node and per-edge dicts, which the routing helpers need.
+
     Env vars:
       - STREET_GRAPH_BUCKET (required)
       - STREET_GRAPH_PREFIX (default: street-graphs)
+      - STREET_GRAPH_CACHE_DIR: local disk tier (default data/street_graph_cache)
+      - STREET_GRAPH_MEMORY_ENTRIES: graphs kept in memory (default 4)
+      - STREET_GRAPH_REFRESH_S: seconds before revalidating with S3 (default 300)
       - ENDPOINT_URL (preferred for LocalStack)
     """
 
     upstream: IMapProvider
     bucket: str | None = None
     prefix: str | None = None
+    cache_dir: str | Path | None = None
+    memory_entries: int | None = None
+    refresh_s: float | None = None
 
     def _bucket(self) -> str:
         value = self.bucket or os.getenv("STREET_GRAPH_BUCKET")
@@ -38,6 +98,23 @@ class S3CachedMapAdapter(IMapProvider):
             self.prefix or os.getenv("STREET_GRAPH_PREFIX") or "street-graphs"
         ).strip("/")
 
+    def _cache_dir(self) -> Path:
+        return Path(
+            self.cache_dir
+            or os.getenv("STREET_GRAPH_CACHE_DIR")
+            or "data/street_graph_cache"
+        )
+
+    def _memory_entries(self) -> int:
+        if self.memory_entries is not None:
+            return int(self.memory_entries)
+        return int(os.getenv("STREET_GRAPH_MEMORY_ENTRIES") or 4)
+
+    def _refresh_s(self) -> float:
+        if self.refresh_s is not None:
+            return float(self.refresh_s)
+        return float(os.getenv("STREET_GRAPH_REFRESH_S") or 300)
+
     def _key(
         self, *, center: GeoPoint, dist_m: int, network_type: str | None = None
     ) -> str:
@@ -48,25 +125,116 @@ class S3CachedMapAdapter(IMapProvider):
         return f"{self._prefix()}/nt={nt}/dist={int(dist_m)}/center={lat}_{lon}.pkl.gz"
 
     def get_street_graph(self, *, center: GeoPoint, dist_m: int):
-        s3 = s3_client()
-        bucket = self._bucket()
-
         network_type = getattr(self.upstream, "network_type", None)
         key = self._key(center=center, dist_m=dist_m, network_type=network_type)
 
+        # 1) Memory tier, trusted without a round trip for refresh_s.
+        with _lock:
+            entry = _memory.get(key)
+            if entry is not None:
+                _memory.move_to_end(key)
+        if (
+            entry is not None
+            and (time.monotonic() - entry.checked_at_monotonic) < self._refresh_s()
+        ):
+            return entry.graph
+
+        # 2) Local disk tier (used as the conditional-GET baseline).
+        local_graph, local_etag = (
+            (entry.graph, entry.etag) if entry is not None else self._read_disk(key)
+        )
+
+        # 3) S3, conditional on the ETag we already hold.
+        s3 = s3_client()
+        bucket = self._bucket()
         try:
-            obj = s3.get_object(Bucket=bucket, Key=key)
-            body = obj["Body"].read()
-            data = gzip.decompress(body)
-            graph = pickle.loads(data)
-            return self._normalize_graph(graph)
+            kwargs: dict[str, Any] = {"Bucket": bucket, "Key": key}
+            if local_graph is not None and local_etag:
+                kwargs["IfNoneMatch"] = local_etag
+            obj = s3.get_object(**kwargs)
+            graph = self._prepare(_decode(gzip.decompress(obj["Body"].read())))
+            etag = obj.get("ETag")
+            self._write_disk(key, graph, etag)
+            return self._remember(key, graph, etag)
+        except ClientError as exc:
+            if local_graph is not None and _is_not_modified(exc):
+                return self._remember(key, local_graph, local_etag)
         except Exception:
-            graph = self.upstream.get_street_graph(center=center, dist_m=dist_m)
+            pass
+
+        if local_graph is not None:
+            # S3 unreachable or object gone: keep serving the local copy.
+            return self._remember(key, local_graph, local_etag)
 
+        # 4) Build upstream and populate every tier.
+        graph = self._prepare(
+            self.upstream.get_street_graph(center=center, dist_m=dist_m)
+        )
+        payload = gzip.compress(_encode(graph))
+        put = s3.put_object(Bucket=bucket, Key=key, Body=payload)
+        etag = put.get("ETag") if isinstance(put, dict) else None
+        self._write_disk(key, graph, etag)
+        return self._remember(key, graph, etag)
+
+    def _prepare(self, graph: Any) -> Any:
+        meta = getattr(graph, "graph", None)
+        if not (isinstance(meta, dict) and meta.get(_NORMALIZED)):
+            # Legacy cache objects / fresh upstream graphs: one-off pass.
             graph = self._normalize_graph(graph)
-            payload = gzip.compress(pickle.dumps(graph))
-            s3.put_object(Bucket=bucket, Key=key, Body=payload)
-            return graph
+            if isinstance(meta, dict):
+                meta[_NORMALIZED] = True
+        return graph
+
+    def _remember(self, key: str, graph: Any, etag: str | None) -> Any:
+        self._tag_version(graph, key, etag)
+        with _lock:
+            _memory[key] = _MemoryEntry(
+                graph=graph, etag=etag, checked_at_monotonic=time.monotonic()
+            )
+            _memory.move_to_end(key)
+            while len(_memory) > max(1, self._memory_entries()):
+                _memory.popitem(last=False)
+        return graph
+
+    def _disk_paths(self, key: str) -> tuple[Path, Path]:
+        base = self._cache_dir() / key.removesuffix(".gz")
+        return base, base.with_suffix(base.suffix + ".etag")
+
+    def _read_disk(self, key: str) -> tuple[Any | None, str | None]:
+        path, etag_path = self._disk_paths(key)
+        if not path.exists():
+            return None, None
+        try:
+            graph = _decode(path.read_bytes())
+        except Exception:
+            return None, None
+        etag = None
+        if etag_path.exists():
+            etag = etag_path.read_text(encoding="utf-8").strip() or None
+        return graph, etag
+
+    def _write_disk(self, key: str, graph: Any, etag: str | None) -> None:
+        path, etag_path = self._disk_paths(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            _replace_file(path, _encode(graph))
+            _replace_file(etag_path, (etag or "").encode("utf-8"))
+        except OSError:
+            # The disk tier is an optimization only.
+            pass
+
+    def _tag_version(self, graph: Any, key: str, etag: str | None) -> None:
+        """Version the graph by S3 key and ETag.
+
+        The object under a key can be re-uploaded, and the walk/route caches,
+        stop snaps and landmarks are keyed on `graph_version`, so the ETag
+        (the object's content version) is part of it.
+        """
+
+        meta = getattr(graph, "graph", None)
+        if isinstance(meta, dict):
+            version = etag.strip('"') if etag else None
+            meta["graph_version"] = f"{key}@{version}" if version else key
 
     def _normalize_graph(self, graph: Any) -> Any:
         """Best-effort normalization of a street graph.
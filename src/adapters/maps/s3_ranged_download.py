@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import time
+import zlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, cast
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class DownloadStats:
+    bytes_downloaded: int
+    bytes_written: int
+    parts: int
+    seconds: float
+    sha256: str
+
+    @property
+    def throughput_mib_s(self) -> float:
+        if self.seconds <= 0:
+            return 0.0
+        return self.bytes_downloaded / (1024 * 1024) / self.seconds
+
+
+def download_s3_object(
+    s3: Any,
+    *,
+    bucket: str,
+    key: str,
+    dest: Path,
+    part_size: int = 8 * 1024 * 1024,
+    concurrency: int = 8,
+    decompress: bool | None = None,
+    expected_sha256: str | None = None,
+) -> DownloadStats:
+    """Download an S3 object with concurrent ranged GETs, streaming to `dest`.
+
+    Parts are fetched up to `concurrency` ahead and consumed strictly in
+    order, so peak memory is about `concurrency * part_size` regardless of
+    object size. Gzip objects (`.gz` keys by default) are decompressed on the
+    fly. The SHA-256 of the downloaded bytes is checked against
+    `expected_sha256`, or the object's `sha256` user metadata when present.
+
+    Raises RuntimeError on checksum mismatch; `dest` is only written, never
+    renamed, so callers keep control of the final atomic replace.
+    """
+
+    head = s3.head_object(Bucket=bucket, Key=key)
+    size = int(head["ContentLength"])
+    expected = expected_sha256 or (head.get("Metadata") or {}).get("sha256")
+    if decompress is None:
+        decompress = key.lower().endswith(".gz")
+
+    ranges = [
+        (start, min(start + part_size, size) - 1)
+        for start in range(0, size, max(1, part_size))
+    ]
+
+    def fetch(byte_range: tuple[int, int]) -> bytes:
+        start, end = byte_range
+        obj = s3.get_object(Bucket=bucket, Key=key, Range=f"bytes={start}-{end}")
+        return cast(bytes, obj["Body"].read())
+
+    hasher = hashlib.sha256()
+    # wbits=47 (32 + 15): auto-detect gzip/zlib headers.
+    inflater = zlib.decompressobj(wbits=47) if decompress else None
+    downloaded = 0
+    written = 0
+    t0 = time.perf_counter()
+
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    with (
+        open(dest, "wb") as fp,
+        ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool,
+    ):
+        pending: deque[Future[bytes]] = deque()
+        next_part = 0
+        while next_part < len(ranges) or pending:
+            while next_part < len(ranges) and len(pending) < max(1, concurrency):
+                pending.append(pool.submit(fetch, ranges[next_part]))
+                next_part += 1
+
+            chunk = pending.popleft().result()
+            downloaded += len(chunk)
+            hasher.update(chunk)
+            data = inflater.decompress(chunk) if inflater is not None else chunk
+            fp.write(data)
+            written += len(data)
+
+        if inflater is not None:
+            tail = inflater.flush()
+            fp.write(tail)
+            written += len(tail)
+
+    seconds = time.perf_counter() - t0
+    digest = hasher.hexdigest()
+
+    if downloaded != size:
+        raise RuntimeError(
+            f"Incomplete download of s3://{bucket}/{key}: {downloaded}/{size} bytes"
+        )
+    if expected and digest.lower() != str(expected).strip().lower():
+        raise RuntimeError(
+            f"Checksum mismatch for s3://{bucket}/{key}: "
+            f"expected sha256 {expected}, got {digest}"
+        )
+
+    stats = DownloadStats(
+        bytes_downloaded=downloaded,
+        bytes_written=written,
+        parts=len(ranges),
+        seconds=seconds,
+        sha256=digest,
+    )
+    logger.info(
+        "Downloaded s3://%s/%s: %d bytes in %d parts, %.2fs (%.1f MiB/s)%s",
+        bucket,
+        key,
+        downloaded,
+        stats.parts,
+        seconds,
+        stats.throughput_mib_s,
+        ", checksum ok" if expected else "",
+    )
+    return stats
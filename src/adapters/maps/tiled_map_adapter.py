@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import math
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import networkx as nx
+
+from src.adapters.aws import s3_client
+from src.app.ports.output import IMapProvider
+from src.domain.models import GeoPoint
+
+from .osmnx_map_adapter import OSMnxMapAdapter
+
+# Meters per degree of latitude (good enough for tile coverage).
+_M_PER_DEG = 111_320.0
+
+# Process-wide tiers shared by every adapter instance (services are built per
+# request): decoded tiles, and stitched graphs per exact tile set.
+_lock = threading.Lock()
+_tiles: OrderedDict[str, Any] = OrderedDict()
+_stitched: OrderedDict[tuple[str, ...], Any] = OrderedDict()
+# One lock per tile key, so concurrent cold requests download a tile once.
+_tile_locks: dict[str, threading.Lock] = {}
+
+
+@dataclass(slots=True)
+class TiledMapAdapter(IMapProvider):
+    """Serves street graphs stitched from a fixed grid of cached tiles.
+
+    Each tile's walk subgraph is downloaded once, then cached on local disk
+    and (optionally) in S3. A request loads only the tiles covering the
+    square `center +/- dist_m` and composes them in memory; OSM node ids are
+    global, so tiles join on shared border nodes.
+
+    Env vars:
+      - STREET_GRAPH_TILE_DEG: tile edge in degrees (default 0.02, ~2.2 km)
+      - STREET_GRAPH_TILE_DIR: local tile cache dir (default data/osm_tiles)
+      - STREET_GRAPH_BUCKET: optional S3 bucket for shared tiles
+      - STREET_GRAPH_PREFIX: S3 key prefix (default: street-graphs)
+      - STREET_GRAPH_TILE_MEMORY: decoded tiles kept in memory (default 64)
+    """
+
+    upstream: OSMnxMapAdapter
+    tile_deg: float | None = None
+    cache_dir: str | Path | None = None
+    bucket: str | None = None
+    prefix: str | None = None
+    max_tiles_in_memory: int | None = None
+    max_stitched_in_memory: int = 4
+
+    def _tile_deg(self) -> float:
+        if self.tile_deg is not None:
+            return float(self.tile_deg)
+        return float(os.getenv("STREET_GRAPH_TILE_DEG") or 0.02)
+
+    def _cache_dir(self) -> Path:
+        return Path(
+            self.cache_dir or os.getenv("STREET_GRAPH_TILE_DIR") or "data/osm_tiles"
+        )
+
+    def _bucket(self) -> str | None:
+        return self.bucket or os.getenv("STREET_GRAPH_BUCKET") or None
+
+    def _prefix(self) -> str:
+        return (
+            self.prefix or os.getenv("STREET_GRAPH_PREFIX") or "street-graphs"
+        ).strip("/")
+
+    def _max_tiles(self) -> int:
+        if self.max_tiles_in_memory is not None:
+            return int(self.max_tiles_in_memory)
+        return int(os.getenv("STREET_GRAPH_TILE_MEMORY") or 64)
+
+    def tiles_for(self, *, center: GeoPoint, dist_m: int) -> list[tuple[int, int]]:
+        """(row, col) indices of the tiles covering center +/- dist_m."""
+
+        size = self._tile_deg()
+        dlat = float(dist_m) / _M_PER_DEG
+        cos_lat = max(0.01, math.cos(math.radians(center.lat)))
+        dlon = float(dist_m) / (_M_PER_DEG * cos_lat)
+
+        row0 = math.floor((center.lat - dlat) / size)
+        row1 = math.floor((center.lat + dlat) / size)
+        col0 = math.floor((center.lon - dlon) / size)
+        col1 = math.floor((center.lon + dlon) / size)
+        return [
+            (row, col) for row in range(row0, row1 + 1) for col in range(col0, col1 + 1)
+        ]
+
+    def _key(self, row: int, col: int) -> str:
+        nt = (self.upstream.network_type or "walk").strip().lower()
+        return (
+            f"{self._prefix()}/tiles/nt={nt}/deg={self._tile_deg()}/{row}_{col}.pkl.gz"
+        )
+
+    def _cached_tile(self, key: str) -> Any | None:
+        with _lock:
+            cached = _tiles.get(key)
+            if cached is not None:
+                _tiles.move_to_end(key)
+            return cached
+
+    def _load_tile(self, row: int, col: int) -> Any:
+        key = self._key(row, col)
+        cached = self._cached_tile(key)
+        if cached is not None:
+            return cached
+
+        with _lock:
+            tile_lock = _tile_locks.setdefault(key, threading.Lock())
+        with tile_lock:
+            # Another request may have loaded it while we waited.
+            cached = self._cached_tile(key)
+            if cached is not None:
+                return cached
+            return self._fetch_tile(key, row, col)
+
+    def _fetch_tile(self, key: str, row: int, col: int) -> Any:
+        path = self._cache_dir() / key
+        graph = self._read_disk(path)
+        if graph is None:
+            graph = self._read_s3(key)
+            if graph is not None:
+                self._write_disk(path, graph)
+        if graph is None:
+            size = self._tile_deg()
+            graph = self.upstream.get_tile_graph(
+                west=col * size,
+                south=row * size,
+                east=(col + 1) * size,
+                north=(row + 1) * size,
+            )
+            self._write_disk(path, graph)
+            self._write_s3(key, graph)
+
+        with _lock:
+            _tiles[key] = graph
+            while len(_tiles) > max(1, self._max_tiles()):
+                _tiles.popitem(last=False)
+        return graph
+
+    def _read_disk(self, path: Path) -> Any | None:
+        if not path.exists():
+            return None
+        try:
+            return pickle.loads(gzip.decompress(path.read_bytes()))
+        except Exception:
+            # Corrupt/partial tile: rebuild it.
+            return None
+
+    def _write_disk(self, path: Path, graph: Any) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Unique per writer: other processes may store the same tile.
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            tmp.write_bytes(gzip.compress(pickle.dumps(graph)))
+            os.replace(tmp, path)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+
+    def _read_s3(self, key: str) -> Any | None:
+        bucket = self._bucket()
+        if not bucket:
+            return None
+        try:
+            obj = s3_client().get_object(Bucket=bucket, Key=key)
+            return pickle.loads(gzip.decompress(obj["Body"].read()))
+        except Exception:
+            return None
+
+    def _write_s3(self, key: str, graph: Any) -> None:
+        bucket = self._bucket()
+        if not bucket:
+            return
+        try:
+            payload = gzip.compress(pickle.dumps(graph))
+            s3_client().put_object(Bucket=bucket, Key=key, Body=payload)
+        except Exception:
+            # The local disk tier still holds the tile.
+            pass
+
+    def get_street_graph(self, *, center: GeoPoint, dist_m: int) -> Any:
+        tiles = self.tiles_for(center=center, dist_m=dist_m)
+        keys = tuple(self._key(row, col) for row, col in tiles)
+
+        with _lock:
+            cached = _stitched.get(keys)
+            if cached is not None:
+                _stitched.move_to_end(keys)
+                return cached
+
+        graphs = [self._load_tile(row, col) for row, col in tiles]
+        graph = nx.compose_all(graphs) if len(graphs) > 1 else graphs[0].copy()
+        graph.graph["graph_version"] = hashlib.sha1(
+            "|".join(keys).encode()
+        ).hexdigest()[:16]
+
+        with _lock:
+            _stitched[keys] = graph
+            while len(_stitched) > max(1, self.max_stitched_in_memory):
+                _stitched.popitem(last=False)
+        return graph
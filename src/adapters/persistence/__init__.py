@@ -1,7 +1,11 @@
 from .dynamodb_route_result_repository import DynamoDbRouteResultRepository
 from .local_gtfs_repository import LocalGtfsRepository
+from .local_landmark_repository import LocalLandmarkRepository
+from .local_stop_snap_repository import LocalStopSnapRepository
 
 __all__ = [
     "DynamoDbRouteResultRepository",
     "LocalGtfsRepository",
+    "LocalLandmarkRepository",
+    "LocalStopSnapRepository",
 ]
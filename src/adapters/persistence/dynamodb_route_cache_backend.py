@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import os
+import time
+from dataclasses import dataclass
+
+from src.adapters.aws import dynamodb_client
+from src.app.ports.output import IRouteCacheBackend
+
+
+@dataclass(slots=True)
+class DynamoDbRouteCacheBackend(IRouteCacheBackend):
+    """Route cache entries shared through DynamoDB.
+
+    Items are {cache_key (S, hash key), value (B), expires_at (N, epoch s)};
+    enable DynamoDB TTL on `expires_at` to have expired items deleted.
+    Expiry is also checked on read, since TTL deletion is lazy.
+
+    Env vars:
+      - ROUTE_CACHE_TABLE: table name
+      - ENDPOINT_URL (preferred for LocalStack)
+      - AWS_REGION
+    """
+
+    table_name: str | None = None
+
+    def _table(self) -> str:
+        return self.table_name or os.getenv("ROUTE_CACHE_TABLE") or ""
+
+    def get(self, key: str) -> bytes | None:
+        resp = dynamodb_client().get_item(
+            TableName=self._table(), Key={"cache_key": {"S": key}}
+        )
+        item = resp.get("Item")
+        if not item or "value" not in item:
+            return None
+        if float(item.get("expires_at", {}).get("N", "0")) <= time.time():
+            return None
+        value = item["value"].get("B")
+        return value if isinstance(value, bytes) else None
+
+    def put(self, key: str, value: bytes, *, ttl_s: float) -> None:
+        dynamodb_client().put_item(
+            TableName=self._table(),
+            Item={
+                "cache_key": {"S": key},
+                "value": {"B": value},
+                "expires_at": {"N": str(int(time.time() + ttl_s))},
+            },
+        )
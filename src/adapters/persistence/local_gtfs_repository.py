@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 import csv
+import hashlib
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 
 from src.app.ports.output import IGtfsRepository
@@ -16,15 +17,43 @@ def _parse_gtfs_time_to_seconds(raw: str) -> int:
     return int(hh) * 3600 + int(mm) * 60 + int(ss)
 
 
+def _parse_optional_float(raw: str | None) -> float | None:
+    try:
+        return float(raw) if raw not in (None, "") else None
+    except ValueError:
+        return None
+
+
+_FEED_FILES = ("routes.txt", "trips.txt", "shapes.txt", "stops.txt", "stop_times.txt")
+
+
+def _feed_version(base: Path) -> str:
+    """Cheap fingerprint of the feed files (name, size, mtime)."""
+
+    h = hashlib.sha1()
+    for name in _FEED_FILES:
+        p = base / name
+        if not p.exists():
+            continue
+        st = p.stat()
+        h.update(f"{name}:{st.st_size}:{st.st_mtime_ns};".encode())
+    return h.hexdigest()[:16]
+
+
 @dataclass(slots=True)
 class LocalGtfsRepository(IGtfsRepository):
     """Loads a GTFS feed from a directory of .txt files.
 
     Env vars:
       - GTFS_PATH: path to directory containing stops.txt, stop_times.txt, trips.txt
+
+    With `keep_loaded`, the parsed feed is reused while the files'
+    fingerprint is unchanged (long-lived routing worker processes).
     """
 
     base_path: str | Path | None = None
+    keep_loaded: bool = False
+    _loaded: GtfsFeed | None = field(default=None, init=False, repr=False)
 
     def _base(self) -> Path:
         value = self.base_path or os.getenv("GTFS_PATH") or "data/gtfs"
@@ -32,6 +61,15 @@ class LocalGtfsRepository(IGtfsRepository):
 
     def load_feed(self) -> GtfsFeed:
         base = self._base()
+        if self.keep_loaded:
+            loaded = self._loaded
+            if loaded is not None and loaded.version == _feed_version(base):
+                return loaded
+            self._loaded = self._parse(base)
+            return self._loaded
+        return self._parse(base)
+
+    def _parse(self, base: Path) -> GtfsFeed:
 
         # Optional metadata.
         from src.domain.models.gtfs import GtfsRoute, GtfsTrip
@@ -66,12 +104,15 @@ class LocalGtfsRepository(IGtfsRepository):
                         trip_id=trip_id,
                         route_id=(row.get("route_id") or "").strip() or None,
                         shape_id=(row.get("shape_id") or "").strip() or None,
+                        direction_id=(row.get("direction_id") or "").strip() or None,
+                        headsign=(row.get("trip_headsign") or "").strip() or None,
                     )
 
         shapes_by_id: dict[str, tuple[GeoPoint, ...]] = {}
+        shape_dist_by_shape: dict[str, tuple[float, ...]] = {}
         shapes_path = base / "shapes.txt"
         if shapes_path.exists():
-            tmp: dict[str, list[tuple[int, GeoPoint]]] = {}
+            tmp: dict[str, list[tuple[int, GeoPoint, float | None]]] = {}
             with shapes_path.open("r", encoding="utf-8", newline="") as fp:
                 reader = csv.DictReader(fp)
                 for row in reader:
@@ -85,12 +126,19 @@ class LocalGtfsRepository(IGtfsRepository):
                     except (TypeError, ValueError, KeyError):
                         continue
                     tmp.setdefault(shape_id, []).append(
-                        (seq, GeoPoint(lat=lat, lon=lon))
+                        (
+                            seq,
+                            GeoPoint(lat=lat, lon=lon),
+                            _parse_optional_float(row.get("shape_dist_traveled")),
+                        )
                     )
 
             for shape_id, pts in tmp.items():
                 pts.sort(key=lambda x: x[0])
-                shapes_by_id[shape_id] = tuple(p for _, p in pts)
+                shapes_by_id[shape_id] = tuple(p for _, p, _ in pts)
+                dists = [d for _, _, d in pts if d is not None]
+                if len(dists) == len(pts):
+                    shape_dist_by_shape[shape_id] = tuple(dists)
 
         stops_by_id: dict[str, Stop] = {}
         with (base / "stops.txt").open("r", encoding="utf-8", newline="") as fp:
@@ -107,7 +155,9 @@ class LocalGtfsRepository(IGtfsRepository):
                 )
 
         # Build stop_times per trip with ordering.
-        stop_times_by_trip: dict[str, list[tuple[int, str, int, int]]] = {}
+        stop_times_by_trip: dict[
+            str, list[tuple[int, str, int, int, float | None]]
+        ] = {}
         with (base / "stop_times.txt").open("r", encoding="utf-8", newline="") as fp:
             reader = csv.DictReader(fp)
             for row in reader:
@@ -121,17 +171,27 @@ class LocalGtfsRepository(IGtfsRepository):
                 dep_s = _parse_gtfs_time_to_seconds(row["departure_time"])
 
                 stop_times_by_trip.setdefault(trip_id, []).append(
-                    (seq, stop_id, dep_s, arr_s)
+                    (
+                        seq,
+                        stop_id,
+                        dep_s,
+                        arr_s,
+                        _parse_optional_float(row.get("shape_dist_traveled")),
+                    )
                 )
 
         # Connections: consecutive stop_times within each trip.
         from src.domain.models.gtfs import Connection
 
         connections: list[Connection] = []
+        stop_ids_by_trip: dict[str, tuple[str, ...]] = {}
+        stop_dist_by_trip: dict[str, tuple[float | None, ...]] = {}
         for trip_id, entries in stop_times_by_trip.items():
             entries.sort(key=lambda x: x[0])
-            for (_, a_stop, a_dep, _), (_, b_stop, _, b_arr) in zip(
-                entries, entries[1:]
+            stop_ids_by_trip[trip_id] = tuple(e[1] for e in entries)
+            stop_dist_by_trip[trip_id] = tuple(e[4] for e in entries)
+            for i, ((_, a_stop, a_dep, _, _), (_, b_stop, _, b_arr, _)) in enumerate(
+                zip(entries, entries[1:])
             ):
                 if a_stop not in stops_by_id or b_stop not in stops_by_id:
                     continue
@@ -142,6 +202,7 @@ class LocalGtfsRepository(IGtfsRepository):
                         dep_time_s=int(a_dep),
                         arr_time_s=int(b_arr),
                         trip_id=trip_id,
+                        seq_index=i,
                     )
                 )
 
@@ -153,4 +214,8 @@ class LocalGtfsRepository(IGtfsRepository):
             routes_by_id=routes_by_id,
             trips_by_id=trips_by_id,
             shapes_by_id=shapes_by_id,
+            version=_feed_version(base),
+            stop_ids_by_trip=stop_ids_by_trip,
+            stop_dist_by_trip=stop_dist_by_trip,
+            shape_dist_by_shape=shape_dist_by_shape,
         )
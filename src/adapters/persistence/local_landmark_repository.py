@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import os
+import pickle
+from dataclasses import dataclass
+from pathlib import Path
+
+from src.app.ports.output import ILandmarkRepository
+from src.domain.models import LandmarkTable
+
+# Per-process memo: path -> (mtime_ns, table).
+_LOADED: dict[str, tuple[int, LandmarkTable]] = {}
+
+
+@dataclass(slots=True)
+class LocalLandmarkRepository(ILandmarkRepository):
+    """Stores ALT landmark tables as a pickle next to the prebuilt graph.
+
+    Env vars:
+      - LANDMARKS_PATH: explicit artifact path (optional)
+      - OSM_GRAPH_PATH: default artifact is '<OSM_GRAPH_PATH>.landmarks.pkl'
+    """
+
+    path: str | Path | None = None
+
+    def _path(self) -> Path | None:
+        value = self.path or (os.getenv("LANDMARKS_PATH") or "").strip()
+        if value:
+            return Path(value)
+        graph_path = (os.getenv("OSM_GRAPH_PATH") or "").strip()
+        if not graph_path:
+            return None
+        return Path(graph_path + ".landmarks.pkl")
+
+    def load(self) -> LandmarkTable | None:
+        path = self._path()
+        if path is None or not path.exists():
+            return None
+
+        mtime_ns = path.stat().st_mtime_ns
+        cached = _LOADED.get(str(path))
+        if cached is not None and cached[0] == mtime_ns:
+            return cached[1]
+
+        try:
+            with path.open("rb") as fp:
+                table = pickle.load(fp)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            return None
+        if not isinstance(table, LandmarkTable):
+            return None
+
+        _LOADED[str(path)] = (mtime_ns, table)
+        return table
+
+    def save(self, table: LandmarkTable) -> None:
+        path = self._path()
+        if path is None:
+            return
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with tmp.open("wb") as fp:
+            pickle.dump(table, fp, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        _LOADED[str(path)] = (path.stat().st_mtime_ns, table)
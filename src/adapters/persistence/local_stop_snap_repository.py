@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+from src.app.ports.output import IStopSnapRepository
+from src.domain.models import StopSnap, StopSnapTable
+
+# Per-process memo: path -> (mtime_ns, table). Avoids re-reading the JSON on
+# every request while still picking up a rebuilt artifact.
+_LOADED: dict[str, tuple[int, StopSnapTable]] = {}
+
+
+@dataclass(slots=True)
+class LocalStopSnapRepository(IStopSnapRepository):
+    """Stores the stop snapping table as JSON next to the prebuilt graph.
+
+    Env vars:
+      - STOP_SNAPS_PATH: explicit artifact path (optional)
+      - OSM_GRAPH_PATH: default artifact is '<OSM_GRAPH_PATH>.stops.json'
+    """
+
+    path: str | Path | None = None
+
+    def _path(self) -> Path | None:
+        value = self.path or (os.getenv("STOP_SNAPS_PATH") or "").strip()
+        if value:
+            return Path(value)
+        graph_path = (os.getenv("OSM_GRAPH_PATH") or "").strip()
+        if not graph_path:
+            return None
+        return Path(graph_path + ".stops.json")
+
+    def load(self) -> StopSnapTable | None:
+        path = self._path()
+        if path is None or not path.exists():
+            return None
+
+        mtime_ns = path.stat().st_mtime_ns
+        cached = _LOADED.get(str(path))
+        if cached is not None and cached[0] == mtime_ns:
+            return cached[1]
+
+        try:
+            with path.open("r", encoding="utf-8") as fp:
+                raw = json.load(fp)
+            table = StopSnapTable(
+                feed_version=str(raw["feed_version"]),
+                graph_version=str(raw["graph_version"]),
+                snaps_by_stop_id={
+                    str(s["stop_id"]): StopSnap(
+                        stop_id=str(s["stop_id"]),
+                        node=s["node"],
+                        distance_m=float(s["distance_m"]),
+                        street_name=s.get("street_name"),
+                    )
+                    for s in raw.get("snaps", [])
+                },
+            )
+        except (OSError, ValueError, KeyError, TypeError):
+            # A corrupt artifact is treated as missing: requests snap stops on
+            # the fly until scripts/build_routing_artifacts.py rewrites it.
+            return None
+
+        _LOADED[str(path)] = (mtime_ns, table)
+        return table
+
+    def save(self, table: StopSnapTable) -> None:
+        path = self._path()
+        if path is None:
+            return
+
+        payload = {
+            "feed_version": table.feed_version,
+            "graph_version": table.graph_version,
+            "snaps": [
+                {
+                    "stop_id": s.stop_id,
+                    "node": s.node,
+                    "distance_m": s.distance_m,
+                    "street_name": s.street_name,
+                }
+                for s in table.snaps_by_stop_id.values()
+            ],
+        }
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with tmp.open("w", encoding="utf-8") as fp:
+            json.dump(payload, fp)
+        os.replace(tmp, path)
+        _LOADED[str(path)] = (path.stat().st_mtime_ns, table)
@@ -1,15 +1,31 @@
 from __future__ import annotations
 
 import asyncio
+import logging
 import os
+import threading
 import time
-from dataclasses import dataclass, field
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
 from datetime import datetime, timezone
 
 import httpx
 
+from src.adapters.realtime.shared_snapshot import SharedVehicleSnapshot
+from src.adapters.realtime.trip_updates import parse_trip_delays
+from src.adapters.realtime.vehicle_table import (
+    VehicleRow,
+    VehicleTable,
+    parse_vehicle_rows,
+)
 from src.app.ports.output import IRealtimeVehicleProvider
-from src.domain.models.realtime import RealtimeVehicle
+from src.domain.models.realtime import (
+    RealtimeSnapshot,
+    RealtimeVehicle,
+    RealtimeVehicleChanges,
+)
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass(slots=True)
@@ -20,32 +36,92 @@ class HttpGtfsRealtimeVehicleProvider(IRealtimeVehicleProvider):
       - GTFS_RT_VEHICLE_POSITIONS_URL: URL to a GTFS-RT VehiclePositions feed
       - GTFS_RT_HEADERS: optional headers, as 'Key:Value;Key2:Value2'
       - GTFS_RT_TIMEOUT_S: request timeout (default 10)
-      - GTFS_RT_CACHE_TTL_S: in-process cache TTL seconds (default 25)
+      - GTFS_RT_CACHE_TTL_S: snapshot freshness in seconds (default 25)
+      - GTFS_RT_MAX_STALE_S: oldest snapshot still served while a refresh
+        runs in the background (default 300)
+      - GTFS_RT_MAX_CONNECTIONS: pooled upstream connections (default 4)
+      - GTFS_RT_PARSE_EXECUTOR: 'thread' (default) or 'process' for protobuf
+        decoding
+      - GTFS_RT_TRIP_UPDATES_URL: optional TripUpdates feed for departure
+        delays (same headers, TTL and client)
+      - GTFS_RT_SHARED_SNAPSHOT_PATH: optional file shared by the workers of
+        a host; one elected worker fetches and publishes the parsed feed,
+        the others read it instead of calling upstream
 
     Notes:
       - If URL is not configured, returns an empty list.
-      - Cache is per-process and shared across requests.
+      - One pooled `httpx.AsyncClient` is kept for the provider's lifetime.
+      - Requests are conditional (ETag / Last-Modified); a 304 keeps the
+        parsed snapshot without re-parsing.
+      - Stale-while-revalidate: a stale snapshot is returned immediately and
+        refreshed in the background; only a cold (or too stale) cache waits
+        for upstream. `start()` runs a refresher that keeps it warm.
+      - Upstream errors keep serving the last snapshot when there is one.
+      - Decoding runs off the event loop and feeds a keyed `VehicleTable`, so
+        unchanged vehicles are reused and `changes_since` returns deltas.
+      - With a shared snapshot, followers' refreshes only re-read the file,
+        and a follower takes over fetching when the fetcher's lock is freed.
+        The snapshot age is the fetcher's, so keep the background refresher
+        enabled. TripUpdates are still fetched per worker.
     """
 
     url: str | None = None
+    trip_updates_url: str | None = None
     headers_raw: str | None = None
     timeout_s: float = 10.0
     cache_ttl_s: float = 25.0
+    max_stale_s: float = 300.0
+    max_connections: int = 4
+    parse_executor: str = "thread"
+    shared_path: str | None = None
+    # Injected in tests (httpx.MockTransport); None uses the network.
+    transport: httpx.AsyncBaseTransport | None = None
+
+    fetches: int = field(default=0, init=False)
+    not_modified: int = field(default=0, init=False)
+    errors: int = field(default=0, init=False)
 
-    # In-process cache
     _lock: asyncio.Lock = field(default_factory=asyncio.Lock, init=False, repr=False)
-    _cached_at_monotonic: float = 0.0
-    _cached_vehicles: tuple[RealtimeVehicle, ...] = ()
+    _client: httpx.AsyncClient | None = field(default=None, init=False, repr=False)
+    _snapshot: RealtimeSnapshot | None = field(default=None, init=False, repr=False)
+    _fetched_monotonic: float = field(default=0.0, init=False, repr=False)
+    _etag: str | None = field(default=None, init=False, repr=False)
+    _last_modified: str | None = field(default=None, init=False, repr=False)
+    _revalidate_task: asyncio.Task | None = field(default=None, init=False, repr=False)
+    _refresher_task: asyncio.Task | None = field(default=None, init=False, repr=False)
+    _table: VehicleTable = field(default_factory=VehicleTable, init=False, repr=False)
+    _delays: dict[str, int] = field(default_factory=dict, init=False, repr=False)
+    _delays_monotonic: float | None = field(default=None, init=False, repr=False)
+    _delays_etag: str | None = field(default=None, init=False, repr=False)
+    _delays_lock: asyncio.Lock = field(
+        default_factory=asyncio.Lock, init=False, repr=False
+    )
+    _shared_file: SharedVehicleSnapshot | None = field(
+        default=None, init=False, repr=False
+    )
+    _shared_generation: int = field(default=0, init=False, repr=False)
 
     def __post_init__(self) -> None:
         if self.url is None:
             self.url = os.getenv("GTFS_RT_VEHICLE_POSITIONS_URL")
+        if self.trip_updates_url is None:
+            self.trip_updates_url = os.getenv("GTFS_RT_TRIP_UPDATES_URL")
         if self.headers_raw is None:
             self.headers_raw = os.getenv("GTFS_RT_HEADERS")
         if os.getenv("GTFS_RT_TIMEOUT_S"):
             self.timeout_s = float(os.environ["GTFS_RT_TIMEOUT_S"])
         if os.getenv("GTFS_RT_CACHE_TTL_S"):
             self.cache_ttl_s = float(os.environ["GTFS_RT_CACHE_TTL_S"])
+        if os.getenv("GTFS_RT_MAX_STALE_S"):
+            self.max_stale_s = float(os.environ["GTFS_RT_MAX_STALE_S"])
+        if os.getenv("GTFS_RT_MAX_CONNECTIONS"):
+            self.max_connections = int(os.environ["GTFS_RT_MAX_CONNECTIONS"])
+        if os.getenv("GTFS_RT_PARSE_EXECUTOR"):
+            self.parse_executor = os.environ["GTFS_RT_PARSE_EXECUTOR"].strip().lower()
+        if self.shared_path is None:
+            self.shared_path = os.getenv("GTFS_RT_SHARED_SNAPSHOT_PATH") or None
+        if self.shared_path:
+            self._shared_file = SharedVehicleSnapshot(self.shared_path)
 
     def _headers(self) -> dict[str, str]:
         raw = (self.headers_raw or "").strip()
@@ -65,85 +141,258 @@ class HttpGtfsRealtimeVehicleProvider(IRealtimeVehicleProvider):
                 headers[k] = v
         return headers
 
+    def _http(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout_s,
+                transport=self.transport,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+        return self._client
+
+    def _age_s(self) -> float:
+        return time.monotonic() - self._fetched_monotonic
+
     async def list_vehicles(self) -> tuple[RealtimeVehicle, ...]:
+        return (await self.snapshot()).vehicles
+
+    async def snapshot(self) -> RealtimeSnapshot:
         if not self.url:
-            return ()
+            return RealtimeSnapshot(vehicles=())
+
+        snap = self._snapshot
+        if snap is not None:
+            age = self._age_s()
+            if age < self.cache_ttl_s:
+                return replace(snap, is_cached=True)
+            if age < self.max_stale_s:
+                self._schedule_revalidate()
+                return replace(snap, is_cached=True)
+
+        try:
+            return await self._refresh(fresh_for_s=self.cache_ttl_s)
+        except httpx.HTTPError:
+            if snap is None:
+                raise
+            logger.warning(
+                "GTFS-RT fetch failed; serving stale snapshot", exc_info=True
+            )
+            return replace(snap, is_cached=True)
+
+    async def _refresh(self, *, fresh_for_s: float) -> RealtimeSnapshot:
+        """Fetch unless another caller refreshed within `fresh_for_s`."""
 
         async with self._lock:
-            now_mono = time.monotonic()
-            if (
-                self._cached_vehicles
-                and (now_mono - self._cached_at_monotonic) < self.cache_ttl_s
-            ):
-                return self._cached_vehicles
-
-            async with httpx.AsyncClient(timeout=self.timeout_s) as client:
-                resp = await client.get(self.url, headers=self._headers())
+            if self._snapshot is not None and self._age_s() < fresh_for_s:
+                return replace(self._snapshot, is_cached=True)
+            return await self._fetch()
+
+    async def _fetch(self) -> RealtimeSnapshot:
+        assert self.url
+        shared = self._shared_file
+        if shared is not None and not shared.try_lead():
+            return await self._follow(shared)
+
+        headers = self._headers()
+        if self._snapshot is not None:
+            if self._etag:
+                headers["If-None-Match"] = self._etag
+            if self._last_modified:
+                headers["If-Modified-Since"] = self._last_modified
+
+        self.fetches += 1
+        try:
+            resp = await self._http().get(self.url, headers=headers)
+            if resp.status_code == 304 and self._snapshot is not None:
+                self.not_modified += 1
+                published = None
+            else:
                 resp.raise_for_status()
-                content = resp.content
+                published = await self._ingest(resp.content)
+                self._etag = resp.headers.get("etag")
+                self._last_modified = resp.headers.get("last-modified")
+        except httpx.HTTPError:
+            self.errors += 1
+            raise
 
-            vehicles = _parse_gtfs_rt_vehicle_positions(content)
+        fetched_at = datetime.now(tz=timezone.utc)
+        if shared is not None:
+            if published is not None:
+                await asyncio.to_thread(
+                    shared.publish, *published, fetched_at=fetched_at.timestamp()
+                )
+            else:
+                await asyncio.to_thread(shared.touch, fetched_at.timestamp())
 
-            self._cached_at_monotonic = time.monotonic()
-            self._cached_vehicles = vehicles
-            return vehicles
+        self._snapshot = RealtimeSnapshot(
+            vehicles=self._table.vehicles,
+            fetched_at=fetched_at,
+            feed_timestamp=self._table.feed_timestamp,
+        )
+        self._fetched_monotonic = time.monotonic()
+        return self._snapshot
 
+    async def _follow(self, shared: SharedVehicleSnapshot) -> RealtimeSnapshot:
+        """Adopt the fetcher's latest published snapshot (no upstream call)."""
 
-def _parse_gtfs_rt_vehicle_positions(content: bytes) -> tuple[RealtimeVehicle, ...]:
-    # Import lazily so the app can still start without the dependency in dev.
-    try:
-        from google.transit import gtfs_realtime_pb2  # type: ignore
-    except Exception:
-        return ()
+        header = await asyncio.to_thread(shared.read_header)
+        deadline = time.monotonic() + self.timeout_s
+        while header is None and time.monotonic() < deadline:
+            # The fetcher's first download is still in flight.
+            await asyncio.sleep(0.2)
+            header = await asyncio.to_thread(shared.read_header)
+        if header is None:
+            return self._snapshot or RealtimeSnapshot(vehicles=())
 
-    feed = gtfs_realtime_pb2.FeedMessage()
-    feed.ParseFromString(content)
+        if header.generation != self._shared_generation or self._snapshot is None:
+            published = await asyncio.to_thread(shared.read)
+            if published is None:
+                return self._snapshot or RealtimeSnapshot(vehicles=())
+            header, rows = published
+            await asyncio.to_thread(self._table.apply, header.header_ts, rows)
+            self._shared_generation = header.generation
 
-    out: list[RealtimeVehicle] = []
+        self._snapshot = RealtimeSnapshot(
+            vehicles=self._table.vehicles,
+            fetched_at=datetime.fromtimestamp(header.fetched_at, tz=timezone.utc),
+            feed_timestamp=self._table.feed_timestamp,
+        )
+        # Age as seen by the fetcher, so freshness matches across workers.
+        self._fetched_monotonic = time.monotonic() - max(
+            0.0, time.time() - header.fetched_at
+        )
+        return self._snapshot
 
-    for ent in feed.entity:
-        if not ent.HasField("vehicle"):
-            continue
+    async def _ingest(self, content: bytes) -> tuple[int | None, list[VehicleRow]]:
+        """Decode and merge a feed without blocking the event loop."""
 
-        v = ent.vehicle
-        if not v.HasField("position"):
-            continue
+        if self.parse_executor == "process":
+            loop = asyncio.get_running_loop()
+            header_ts, rows = await loop.run_in_executor(
+                _parse_pool(), parse_vehicle_rows, content
+            )
+            await asyncio.to_thread(self._table.apply, header_ts, rows)
+            return header_ts, rows
+        return await asyncio.to_thread(self._ingest_sync, content)
 
-        pos = v.position
-        lat = float(pos.latitude)
-        lon = float(pos.longitude)
+    def _ingest_sync(self, content: bytes) -> tuple[int | None, list[VehicleRow]]:
+        header_ts, rows = parse_vehicle_rows(content)
+        self._table.apply(header_ts, rows)
+        return header_ts, rows
 
-        trip_id = None
-        route_id = None
-        if v.HasField("trip"):
-            trip_id = v.trip.trip_id or None
-            route_id = v.trip.route_id or None
+    async def changes_since(self, feed_timestamp: int | None) -> RealtimeVehicleChanges:
+        await self.snapshot()
+        return self._table.changes_since(feed_timestamp)
 
-        vehicle_id = None
-        if v.HasField("vehicle"):
-            vehicle_id = v.vehicle.id or None
+    async def trip_delays(self) -> dict[str, int]:
+        if not self.trip_updates_url:
+            return {}
+
+        async with self._delays_lock:
+            fetched = self._delays_monotonic
+            if fetched is not None and time.monotonic() - fetched < self.cache_ttl_s:
+                return self._delays
+
+            headers = self._headers()
+            if self._delays_etag:
+                headers["If-None-Match"] = self._delays_etag
+            try:
+                resp = await self._http().get(self.trip_updates_url, headers=headers)
+                if resp.status_code != 304:
+                    resp.raise_for_status()
+                    self._delays = await asyncio.to_thread(
+                        parse_trip_delays, resp.content
+                    )
+                    self._delays_etag = resp.headers.get("etag")
+            except httpx.HTTPError:
+                # Departure boards degrade to the schedule; retry after the TTL.
+                self.errors += 1
+                logger.warning("GTFS-RT TripUpdates fetch failed", exc_info=True)
+            self._delays_monotonic = time.monotonic()
+            return self._delays
+
+    def _schedule_revalidate(self) -> None:
+        task = self._revalidate_task
+        if task is None or task.done():
+            self._revalidate_task = asyncio.get_running_loop().create_task(
+                self._refresh_quietly(self.cache_ttl_s)
+            )
 
-        bearing = float(pos.bearing) if pos.HasField("bearing") else None
-        speed = float(pos.speed) if pos.HasField("speed") else None
+    async def _refresh_quietly(self, fresh_for_s: float) -> None:
+        try:
+            await self._refresh(fresh_for_s=fresh_for_s)
+        except httpx.HTTPError:
+            logger.warning("GTFS-RT background refresh failed", exc_info=True)
 
-        timestamp = None
-        if v.HasField("timestamp") and int(v.timestamp) > 0:
-            timestamp = datetime.fromtimestamp(int(v.timestamp), tz=timezone.utc)
+    async def _refresher(self) -> None:
+        # Refresh at half the TTL so requests keep hitting a fresh snapshot.
+        interval = max(1.0, self.cache_ttl_s / 2.0)
+        while True:
+            await self._refresh_quietly(interval)
+            await asyncio.sleep(interval)
 
-        stop_id = v.stop_id or None
+    async def start(self) -> None:
+        """Start the background refresher (no-op without a URL)."""
 
-        out.append(
-            RealtimeVehicle(
-                vehicle_id=vehicle_id,
-                trip_id=trip_id,
-                route_id=route_id,
-                lat=lat,
-                lon=lon,
-                bearing=bearing,
-                speed_mps=speed,
-                timestamp=timestamp,
-                stop_id=stop_id,
+        if self.url and self._refresher_task is None:
+            self._refresher_task = asyncio.get_running_loop().create_task(
+                self._refresher()
             )
-        )
 
-    return tuple(out)
+    async def aclose(self) -> None:
+        for task in (self._refresher_task, self._revalidate_task):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._refresher_task = self._revalidate_task = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self._shared_file is not None:
+            # Let another worker take over fetching right away.
+            self._shared_file.release()
+
+    def stats(self) -> dict[str, float | int]:
+        snap = self._snapshot
+        return {
+            "vehicles": len(snap.vehicles) if snap is not None else 0,
+            "feed_timestamp": self._table.feed_timestamp or 0,
+            "age_s": self._age_s() if snap is not None else -1.0,
+            "fetches": self.fetches,
+            "not_modified": self.not_modified,
+            "errors": self.errors,
+            "shared_leader": int(
+                self._shared_file is not None and self._shared_file.is_leader
+            ),
+        }
+
+
+_shared_lock = threading.Lock()
+_pool: ProcessPoolExecutor | None = None
+
+
+def _parse_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _shared_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=1)
+        return _pool
+
+
+_shared: HttpGtfsRealtimeVehicleProvider | None = None
+
+
+def shared_http_vehicle_provider() -> HttpGtfsRealtimeVehicleProvider:
+    """Process-wide provider, so the snapshot and connection pool are reused."""
+
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = HttpGtfsRealtimeVehicleProvider()
+        return _shared
@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import math
+import mmap
+import os
+import struct
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from src.adapters.realtime.vehicle_table import VehicleRow
+
+try:  # POSIX only; elsewhere every process fetches on its own.
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore[assignment]
+
+_MAGIC = b"GTFSRTV1"
+# magic, generation, header_ts (-1 = none), fetched_at (epoch s), rows, blob bytes
+_HEADER = struct.Struct("<8sQqdQQ")
+_HEADER_SIZE = 64
+_FETCHED_AT_OFFSET = 24
+# String columns of a VehicleRow, in row order.
+_STR_FIELDS = (0, 1, 2, 3, 9)
+
+
+@dataclass(frozen=True, slots=True)
+class SharedSnapshotHeader:
+    generation: int
+    header_ts: int | None
+    fetched_at: float
+    count: int
+
+
+def _row_strings(row: VehicleRow) -> tuple[str | None, ...]:
+    """The string columns of `row`, in _STR_FIELDS order."""
+
+    return (row[0], row[1], row[2], row[3], row[9])
+
+
+def _encode(
+    generation: int, header_ts: int | None, fetched_at: float, rows: list[VehicleRow]
+) -> bytes:
+    n = len(rows)
+    lat = np.fromiter((r[4] for r in rows), dtype="<f8", count=n)
+    lon = np.fromiter((r[5] for r in rows), dtype="<f8", count=n)
+    bearing = np.fromiter(
+        (math.nan if r[6] is None else r[6] for r in rows), dtype="<f8", count=n
+    )
+    speed = np.fromiter(
+        (math.nan if r[7] is None else r[7] for r in rows), dtype="<f8", count=n
+    )
+    ts = np.fromiter((-1 if r[8] is None else r[8] for r in rows), dtype="<i8", count=n)
+
+    parts: list[bytes] = []
+    nulls = np.zeros(len(_STR_FIELDS) * n, dtype=np.uint8)
+    offsets = np.zeros(len(_STR_FIELDS) * n + 1, dtype="<i8")
+    pos = 0
+    for i, row in enumerate(rows):
+        for j, value in enumerate(_row_strings(row)):
+            k = i * len(_STR_FIELDS) + j
+            if value is None:
+                nulls[k] = 1
+            else:
+                raw = value.encode()
+                parts.append(raw)
+                pos += len(raw)
+            offsets[k + 1] = pos
+    blob = b"".join(parts)
+
+    header = _HEADER.pack(
+        _MAGIC,
+        generation,
+        -1 if header_ts is None else header_ts,
+        fetched_at,
+        n,
+        len(blob),
+    ).ljust(_HEADER_SIZE, b"\0")
+    return b"".join(
+        (
+            header,
+            lat.tobytes(),
+            lon.tobytes(),
+            bearing.tobytes(),
+            speed.tobytes(),
+            ts.tobytes(),
+            offsets.tobytes(),
+            nulls.tobytes(),
+            blob,
+        )
+    )
+
+
+def _decode_header(raw: bytes) -> SharedSnapshotHeader | None:
+    if len(raw) < _HEADER.size:
+        return None
+    magic, generation, header_ts, fetched_at, count, _ = _HEADER.unpack_from(raw)
+    if magic != _MAGIC:
+        return None
+    return SharedSnapshotHeader(
+        generation=generation,
+        header_ts=None if header_ts < 0 else header_ts,
+        fetched_at=fetched_at,
+        count=count,
+    )
+
+
+@dataclass(slots=True)
+class SharedVehicleSnapshot:
+    """Parsed VehiclePositions shared by the worker processes of one host.
+
+    One process holds an exclusive `flock` on `<path>.lock` and is the only
+    one talking to upstream; it publishes every parsed feed to `path` as a
+    columnar file (numeric columns as little-endian arrays, strings as one
+    UTF-8 blob with offsets). Files are replaced atomically, so readers
+    memory-map a consistent version and decode it with one bulk NumPy read
+    per column instead of re-parsing the protobuf; rows are still built as
+    Python tuples for the vehicle table. When the fetcher exits its lock is
+    released and the next process to try takes over.
+    """
+
+    path: str
+    _lock_fd: int | None = field(default=None, init=False, repr=False)
+    _generation: int = field(default=0, init=False, repr=False)
+
+    @property
+    def is_leader(self) -> bool:
+        return self._lock_fd is not None or fcntl is None
+
+    def try_lead(self) -> bool:
+        """Become (or stay) the fetcher if no other process is."""
+
+        if self.is_leader:
+            return True
+        fd = os.open(f"{self.path}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        # Keep generations increasing across a change of fetcher.
+        header = self.read_header()
+        self._generation = header.generation if header is not None else 0
+        return True
+
+    def release(self) -> None:
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)  # also drops the flock
+            self._lock_fd = None
+
+    def publish(
+        self, header_ts: int | None, rows: list[VehicleRow], *, fetched_at: float
+    ) -> int:
+        """Write a new version; returns its generation."""
+
+        self._generation += 1
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as fh:
+            fh.write(_encode(self._generation, header_ts, fetched_at, rows))
+        os.replace(tmp, self.path)
+        return self._generation
+
+    def touch(self, fetched_at: float) -> None:
+        """Mark the current version as re-validated upstream (e.g. a 304)."""
+
+        try:
+            fd = os.open(self.path, os.O_WRONLY)
+        except FileNotFoundError:
+            return
+        try:
+            os.pwrite(fd, struct.pack("<d", fetched_at), _FETCHED_AT_OFFSET)
+        finally:
+            os.close(fd)
+
+    def read_header(self) -> SharedSnapshotHeader | None:
+        try:
+            fd = os.open(self.path, os.O_RDONLY)
+        except FileNotFoundError:
+            return None
+        try:
+            return _decode_header(os.pread(fd, _HEADER.size, 0))
+        finally:
+            os.close(fd)
+
+    def read(self) -> tuple[SharedSnapshotHeader, list[VehicleRow]] | None:
+        """Header and rows of the current version (None if nothing published)."""
+
+        try:
+            with open(self.path, "rb") as fh:
+                if os.fstat(fh.fileno()).st_size < _HEADER_SIZE:
+                    return None
+                mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            return None
+        try:
+            return self._rows(mm)
+        finally:
+            mm.close()
+
+    @staticmethod
+    def _rows(mm: mmap.mmap) -> tuple[SharedSnapshotHeader, list[VehicleRow]] | None:
+        header = _decode_header(mm[: _HEADER.size])
+        if header is None:
+            return None
+        n = header.count
+        s = len(_STR_FIELDS) * n
+
+        def column(dtype: str, count: int, offset: int) -> np.ndarray:
+            return np.frombuffer(mm, dtype=dtype, count=count, offset=offset)
+
+        off = _HEADER_SIZE
+        lat = column("<f8", n, off).tolist()
+        lon = column("<f8", n, off + 8 * n).tolist()
+        bearing = column("<f8", n, off + 16 * n).tolist()
+        speed = column("<f8", n, off + 24 * n).tolist()
+        ts = column("<i8", n, off + 32 * n).tolist()
+        offsets = column("<i8", s + 1, off + 40 * n).tolist()
+        nulls = column("u1", s, off + 40 * n + 8 * (s + 1)).tolist()
+        blob_at = off + 40 * n + 8 * (s + 1) + s
+
+        strings: list[str | None] = [
+            None
+            if nulls[k]
+            else mm[blob_at + offsets[k] : blob_at + offsets[k + 1]].decode()
+            for k in range(s)
+        ]
+        rows: list[VehicleRow] = []
+        for i in range(n):
+            key, vehicle_id, trip_id, route_id, stop_id = strings[
+                i * len(_STR_FIELDS) : (i + 1) * len(_STR_FIELDS)
+            ]
+            rows.append(
+                (
+                    key or "",
+                    vehicle_id,
+                    trip_id,
+                    route_id,
+                    lat[i],
+                    lon[i],
+                    None if math.isnan(bearing[i]) else bearing[i],
+                    None if math.isnan(speed[i]) else speed[i],
+                    None if ts[i] < 0 else ts[i],
+                    stop_id,
+                )
+            )
+        return header, rows
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+
+def parse_trip_delays(content: bytes) -> dict[str, int]:
+    """Trip-level delays (seconds) from a GTFS-RT TripUpdates feed.
+
+    Uses `TripUpdate.delay` when present, otherwise the first stop time
+    update carrying a departure (or arrival) delay, i.e. the prediction for
+    the next stop, which GTFS-RT propagates downstream.
+    """
+
+    # Import lazily so the app can still start without the dependency in dev.
+    try:
+        from google.transit import gtfs_realtime_pb2
+    except Exception:
+        return {}
+
+    feed = gtfs_realtime_pb2.FeedMessage()
+    feed.ParseFromString(content)
+
+    out: dict[str, int] = {}
+    for ent in feed.entity:
+        if not ent.HasField("trip_update"):
+            continue
+        tu = ent.trip_update
+        trip_id = tu.trip.trip_id
+        if not trip_id:
+            continue
+
+        delay: int | None = int(tu.delay) if tu.HasField("delay") else None
+        if delay is None:
+            for stu in tu.stop_time_update:
+                for event in (stu.departure, stu.arrival):
+                    if event.HasField("delay"):
+                        delay = int(event.delay)
+                        break
+                if delay is not None:
+                    break
+        if delay is not None:
+            out[trip_id] = delay
+    return out
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+from src.domain.models.realtime import RealtimeVehicle, RealtimeVehicleChanges
+
+# (key, vehicle_id, trip_id, route_id, lat, lon, bearing, speed, timestamp, stop_id)
+VehicleRow = tuple[
+    str,
+    str | None,
+    str | None,
+    str | None,
+    float,
+    float,
+    float | None,
+    float | None,
+    int | None,
+    str | None,
+]
+
+
+def parse_vehicle_rows(content: bytes) -> tuple[int | None, list[VehicleRow]]:
+    """Decode a VehiclePositions feed into plain rows (picklable, no models).
+
+    Returns (header timestamp or None, rows). Runs in a worker thread or
+    process, never on the event loop.
+    """
+
+    # Import lazily so the app can still start without the dependency in dev.
+    try:
+        from google.transit import gtfs_realtime_pb2
+    except Exception:
+        return None, []
+
+    feed = gtfs_realtime_pb2.FeedMessage()
+    feed.ParseFromString(content)
+    header_ts = int(feed.header.timestamp) if feed.header.timestamp else None
+
+    rows: list[VehicleRow] = []
+    for ent in feed.entity:
+        if not ent.HasField("vehicle"):
+            continue
+
+        v = ent.vehicle
+        if not v.HasField("position"):
+            continue
+
+        pos = v.position
+        trip_id = route_id = None
+        if v.HasField("trip"):
+            trip_id = v.trip.trip_id or None
+            route_id = v.trip.route_id or None
+
+        vehicle_id = None
+        if v.HasField("vehicle"):
+            vehicle_id = v.vehicle.id or None
+
+        timestamp = None
+        if v.HasField("timestamp") and int(v.timestamp) > 0:
+            timestamp = int(v.timestamp)
+
+        # Same precedence as RealtimeVehicle.key so delta keys match.
+        key = vehicle_id or trip_id or ent.id or f"#{len(rows)}"
+        rows.append(
+            (
+                key,
+                vehicle_id,
+                trip_id,
+                route_id,
+                float(pos.latitude),
+                float(pos.longitude),
+                float(pos.bearing) if pos.HasField("bearing") else None,
+                float(pos.speed) if pos.HasField("speed") else None,
+                timestamp,
+                v.stop_id or None,
+            )
+        )
+    return header_ts, rows
+
+
+def _vehicle(row: VehicleRow) -> RealtimeVehicle:
+    _, vehicle_id, trip_id, route_id, lat, lon, bearing, speed, ts, stop_id = row
+    return RealtimeVehicle(
+        vehicle_id=vehicle_id,
+        trip_id=trip_id,
+        route_id=route_id,
+        lat=lat,
+        lon=lon,
+        bearing=bearing,
+        speed_mps=speed,
+        timestamp=datetime.fromtimestamp(ts, tz=timezone.utc) if ts else None,
+        stop_id=stop_id,
+    )
+
+
+@dataclass(slots=True)
+class VehicleTable:
+    """Keyed vehicle state updated incrementally from successive feeds.
+
+    Unchanged rows keep their `RealtimeVehicle` object; each change is stamped
+    with the feed timestamp that introduced it so callers can ask for a delta.
+    Removals are remembered for `history_s` seconds of feed time; older
+    requests get the full set.
+    """
+
+    history_s: int = 600
+    feed_timestamp: int | None = None
+    vehicles: tuple[RealtimeVehicle, ...] = ()
+    _rows: dict[str, VehicleRow] = field(default_factory=dict, repr=False)
+    _by_key: dict[str, RealtimeVehicle] = field(default_factory=dict, repr=False)
+    _changed_at: dict[str, int] = field(default_factory=dict, repr=False)
+    _removed_at: dict[str, int] = field(default_factory=dict, repr=False)
+    _horizon: int | None = field(default=None, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def apply(self, header_ts: int | None, rows: list[VehicleRow]) -> int:
+        """Merge a full feed; returns the number of upserted + removed keys."""
+
+        with self._lock:
+            prev = self.feed_timestamp
+            ts = header_ts if header_ts is not None else prev or 0
+            # Content changed under the same header timestamp: still advance,
+            # otherwise a client holding `prev` would never see the change.
+            stamp = ts if prev is None or ts > prev else prev + 1
+
+            changed = 0
+            seen: set[str] = set()
+            for row in rows:
+                key = row[0]
+                if key in seen:
+                    continue
+                seen.add(key)
+                if self._rows.get(key) == row:
+                    continue
+                self._rows[key] = row
+                self._by_key[key] = _vehicle(row)
+                self._changed_at[key] = stamp
+                self._removed_at.pop(key, None)
+                changed += 1
+
+            for key in [k for k in self._rows if k not in seen]:
+                del self._rows[key], self._by_key[key], self._changed_at[key]
+                self._removed_at[key] = stamp
+                changed += 1
+
+            if changed or prev is None:
+                self.feed_timestamp = stamp
+                self.vehicles = tuple(self._by_key.values())
+                self._prune(stamp)
+            return changed
+
+    def _prune(self, now: int) -> None:
+        cutoff = now - self.history_s
+        old = [k for k, t in self._removed_at.items() if t <= cutoff]
+        for key in old:
+            t = self._removed_at.pop(key)
+            self._horizon = t if self._horizon is None else max(self._horizon, t)
+
+    def changes_since(self, feed_timestamp: int | None) -> RealtimeVehicleChanges:
+        with self._lock:
+            full = (
+                feed_timestamp is None
+                or self.feed_timestamp is None
+                or (self._horizon is not None and feed_timestamp < self._horizon)
+            )
+            if full or feed_timestamp is None:
+                return RealtimeVehicleChanges(
+                    feed_timestamp=self.feed_timestamp,
+                    upserted=self.vehicles,
+                    full=True,
+                )
+            return RealtimeVehicleChanges(
+                feed_timestamp=self.feed_timestamp,
+                upserted=tuple(
+                    self._by_key[k]
+                    for k, t in self._changed_at.items()
+                    if t > feed_timestamp
+                ),
+                removed=tuple(
+                    k for k, t in self._removed_at.items() if t > feed_timestamp
+                ),
+            )
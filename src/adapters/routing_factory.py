@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import os
+from typing import cast, get_args
+
+from src.adapters.maps.osmnx_map_adapter import OSMnxMapAdapter
+from src.adapters.maps.s3_cached_map_adapter import S3CachedMapAdapter
+from src.adapters.maps.tiled_map_adapter import TiledMapAdapter
+from src.adapters.persistence.dynamodb_route_cache_backend import (
+    DynamoDbRouteCacheBackend,
+)
+from src.adapters.persistence.local_landmark_repository import (
+    LocalLandmarkRepository,
+)
+from src.adapters.persistence.local_stop_snap_repository import (
+    LocalStopSnapRepository,
+)
+from src.app.ports.output import IGtfsRepository, IMapProvider, IQueueService
+from src.app.services.multimodal_routing_service import MultimodalRoutingService
+from src.app.services.route_cache import shared_route_cache
+from src.app.services.routing_helpers import WalkMethod
+from src.app.services.walk_cache import shared_walk_cache
+
+
+def build_routing_service(
+    gtfs_repository: IGtfsRepository,
+    *,
+    queue_service: IQueueService | None = None,
+) -> MultimodalRoutingService:
+    """Routing service wired from env, shared by the API and the SQS worker.
+
+    Env vars:
+      - STREET_GRAPH_TILES: opt into cached street graph tiles (ignored when
+        OSM_GRAPH_PATH is set)
+      - STREET_GRAPH_BUCKET: cache fetched street graphs in S3
+      - OSM_GRAPH_PATH / STOP_SNAPS_PATH / LANDMARKS_PATH: prebuilt artifacts
+      - ROUTE_CACHE_TABLE: share the route cache through DynamoDB
+      - STREET_GRAPH_DIST_M, STREET_GRAPH_MARGIN_M, CANDIDATE_RADIUS_M,
+        MAX_CANDIDATE_STOPS, WALK_SEARCH_METHOD, WALK_PATH_SIMPLIFY_M: tuning
+    """
+
+    base_provider = OSMnxMapAdapter(network_type="walk")
+    map_provider: IMapProvider = base_provider
+    tiles_raw = (os.getenv("STREET_GRAPH_TILES") or "").strip().lower()
+    # Tiles are opt-in; a prebuilt graph (OSM_GRAPH_PATH) always wins.
+    use_tiles = tiles_raw in {"1", "true", "yes", "on"} and not os.getenv(
+        "OSM_GRAPH_PATH"
+    )
+    if use_tiles:
+        map_provider = TiledMapAdapter(upstream=base_provider)
+    elif os.getenv("STREET_GRAPH_BUCKET"):
+        map_provider = S3CachedMapAdapter(upstream=base_provider)
+
+    # Stitched tile sets get a new graph version per viewport, so stop snap
+    # and landmark tables could never match them.
+    stop_snaps = None
+    if not use_tiles and (os.getenv("OSM_GRAPH_PATH") or os.getenv("STOP_SNAPS_PATH")):
+        stop_snaps = LocalStopSnapRepository()
+
+    landmarks = None
+    if not use_tiles and (os.getenv("OSM_GRAPH_PATH") or os.getenv("LANDMARKS_PATH")):
+        landmarks = LocalLandmarkRepository()
+
+    service = MultimodalRoutingService(
+        gtfs_repository=gtfs_repository,
+        map_provider=map_provider,
+        queue_service=queue_service,
+        stop_snap_repository=stop_snaps,
+        landmark_repository=landmarks,
+        walk_cache=shared_walk_cache(),
+        route_cache=shared_route_cache(route_cache_backend()),
+    )
+
+    # Allow tuning via env without changing code.
+    if os.getenv("STREET_GRAPH_DIST_M"):
+        service.street_graph_dist_m = int(os.environ["STREET_GRAPH_DIST_M"])
+    if os.getenv("STREET_GRAPH_MARGIN_M"):
+        service.street_graph_margin_m = int(os.environ["STREET_GRAPH_MARGIN_M"])
+    if os.getenv("CANDIDATE_RADIUS_M"):
+        service.candidate_radius_m = float(os.environ["CANDIDATE_RADIUS_M"])
+    if os.getenv("MAX_CANDIDATE_STOPS"):
+        service.max_candidate_stops = int(os.environ["MAX_CANDIDATE_STOPS"])
+    if os.getenv("WALK_SEARCH_METHOD"):
+        service.walk_method = _walk_method(os.environ["WALK_SEARCH_METHOD"])
+    if os.getenv("WALK_PATH_SIMPLIFY_M"):
+        service.walk_simplify_m = float(os.environ["WALK_PATH_SIMPLIFY_M"]) or None
+
+    return service
+
+
+def route_cache_backend() -> DynamoDbRouteCacheBackend | None:
+    """Shared route cache backend, when ROUTE_CACHE_TABLE is set."""
+
+    if not os.getenv("ROUTE_CACHE_TABLE"):
+        return None
+    return DynamoDbRouteCacheBackend()
+
+
+def _walk_method(raw: str) -> WalkMethod:
+    method = raw.strip().lower()
+    allowed = get_args(WalkMethod)
+    if method not in allowed:
+        raise ValueError(f"WALK_SEARCH_METHOD must be one of {', '.join(allowed)}")
+    return cast(WalkMethod, method)
@@ -1,13 +1,19 @@
 from .gtfs_repository import IGtfsRepository
+from .landmark_repository import ILandmarkRepository
 from .map_provider import IMapProvider
 from .queue_service import IQueueService
 from .realtime_vehicle_provider import IRealtimeVehicleProvider
+from .route_cache_backend import IRouteCacheBackend
 from .route_result_repository import IRouteResultRepository
+from .stop_snap_repository import IStopSnapRepository
 
 __all__ = [
     "IGtfsRepository",
+    "ILandmarkRepository",
     "IQueueService",
     "IMapProvider",
     "IRealtimeVehicleProvider",
+    "IRouteCacheBackend",
     "IRouteResultRepository",
+    "IStopSnapRepository",
 ]
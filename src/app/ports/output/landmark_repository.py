@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+
+from src.domain.models.landmarks import LandmarkTable
+
+
+class ILandmarkRepository(ABC):
+    """Port for persisting ALT landmark distance tables of a street graph."""
+
+    @abstractmethod
+    def load(self) -> LandmarkTable | None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def save(self, table: LandmarkTable) -> None:
+        raise NotImplementedError
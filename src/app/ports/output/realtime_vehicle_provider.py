@@ -1,8 +1,13 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from datetime import datetime, timezone
 
-from src.domain.models.realtime import RealtimeVehicle
+from src.domain.models.realtime import (
+    RealtimeSnapshot,
+    RealtimeVehicle,
+    RealtimeVehicleChanges,
+)
 
 
 class IRealtimeVehicleProvider(ABC):
@@ -11,3 +16,24 @@ class IRealtimeVehicleProvider(ABC):
     @abstractmethod
     async def list_vehicles(self) -> tuple[RealtimeVehicle, ...]:
         raise NotImplementedError
+
+    async def snapshot(self) -> RealtimeSnapshot:
+        """Vehicles plus freshness metadata; providers with a cache override this."""
+
+        vehicles = await self.list_vehicles()
+        return RealtimeSnapshot(
+            vehicles=vehicles, fetched_at=datetime.now(tz=timezone.utc)
+        )
+
+    async def changes_since(self, feed_timestamp: int | None) -> RealtimeVehicleChanges:
+        """Vehicles changed after `feed_timestamp`; the default is a full set."""
+
+        snap = await self.snapshot()
+        return RealtimeVehicleChanges(
+            feed_timestamp=snap.feed_timestamp, upserted=snap.vehicles, full=True
+        )
+
+    async def trip_delays(self) -> dict[str, int]:
+        """Current delay in seconds per trip_id (empty when not available)."""
+
+        return {}
@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+
+
+class IRouteCacheBackend(ABC):
+    """Port for a route result cache shared between processes/hosts."""
+
+    @abstractmethod
+    def get(self, key: str) -> bytes | None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def put(self, key: str, value: bytes, *, ttl_s: float) -> None:
+        raise NotImplementedError
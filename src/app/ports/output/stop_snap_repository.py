@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+
+from src.domain.models.stop_snap import StopSnapTable
+
+
+class IStopSnapRepository(ABC):
+    """Port for persisting the precomputed stop -> street node table."""
+
+    @abstractmethod
+    def load(self) -> StopSnapTable | None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def save(self, table: StopSnapTable) -> None:
+        raise NotImplementedError
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Generic, TypeVar
+
+from src.domain.models.gtfs import GtfsFeed
+
+T = TypeVar("T")
+
+
+class FeedScopedCache(Generic[T]):
+    """Small LRU of per-feed derived structures.
+
+    Feeds are reloaded per request, so entries are keyed by `feed.version`
+    (identity when the feed is unversioned).
+    """
+
+    def __init__(self, build: Callable[[GtfsFeed], T], *, slots: int = 2) -> None:
+        self._build = build
+        self._slots = max(1, int(slots))
+        self._entries: OrderedDict[Any, tuple[GtfsFeed, T]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, feed: GtfsFeed) -> T:
+        version = getattr(feed, "version", None)
+        key: Any = ("v", version) if version else ("id", id(feed))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (version or entry[0] is feed):
+                self._entries.move_to_end(key)
+                return entry[1]
+
+        value = self._build(feed)
+        with self._lock:
+            self._entries[key] = (feed, value)
+            while len(self._entries) > self._slots:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -1,17 +1,40 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import math
+from dataclasses import dataclass, replace
 from datetime import datetime, timedelta
 from typing import Any, Literal, Mapping
 
-from src.app.ports.output import IGtfsRepository, IMapProvider, IQueueService
+from src.app.ports.output import (
+    IGtfsRepository,
+    ILandmarkRepository,
+    IMapProvider,
+    IQueueService,
+    IStopSnapRepository,
+)
 from src.domain.algorithms.csa import earliest_arrival, reconstruct_connections
 from src.domain.algorithms.geo_utils import haversine_distance_m
 from src.domain.exceptions import NoPathFound
-from src.domain.models import GeoPoint, Route, RouteLeg, Stop, TransitLine, TravelMode
+from src.domain.models import (
+    GeoPoint,
+    LandmarkTable,
+    Route,
+    RouteLeg,
+    Stop,
+    StopSnapTable,
+    TransitLine,
+    TravelMode,
+)
 
+from .route_cache import RouteCache, RouteCacheKey
 from .routing_helpers import (
+    WalkMethod,
+    build_landmark_table,
+    build_stop_snap_table,
     candidate_stops,
+    graph_version,
+    nearest_node,
+    nearest_nodes_many,
     polyline_distance_m,
     seconds_since_midnight,
     service_datetime_from_seconds,
@@ -19,7 +42,11 @@ from .routing_helpers import (
     street_name_for_point,
     walk_distance_m,
     walk_path_points,
+    walk_result_from_tree,
+    walk_search,
 )
+from .shape_index import shape_index_for
+from .walk_cache import WalkCache, WalkResult
 
 Preference = Literal["fastest", "least_walking"]
 
@@ -30,17 +57,38 @@ class MultimodalRoutingService:
 
     - Walking is computed over an OSM street graph.
     - Transit is computed with a basic CSA over GTFS stop_times.
+    - Stops are snapped to the street graph once per (feed, graph) version
+      by `prepare_stop_snaps`; requests only load that table.
+    - Point-to-point walks (walking-only fallback) use A* by default, or ALT
+      when `walk_method="alt"` and `prepare_landmarks` stored a table for
+      the graph.
+    - Walking geometry follows the street graph's edge geometries, optionally
+      simplified with `walk_simplify_m`.
     """
 
     gtfs_repository: IGtfsRepository
     map_provider: IMapProvider
     queue_service: IQueueService | None = None
+    stop_snap_repository: IStopSnapRepository | None = None
+    landmark_repository: ILandmarkRepository | None = None
 
     # Tuning knobs (MVP defaults)
     walk_speed_mps: float = 1.4
     max_candidate_stops: int = 12
     candidate_radius_m: float = 1500.0
+    # Access/egress searches stop at candidate_radius_m * this (street detours).
+    access_detour_factor: float = 2.0
     street_graph_dist_m: int = 8000
+    street_graph_margin_m: int = 2000
+    walk_method: WalkMethod = "astar"
+    landmark_count: int = 8
+    # Douglas-Peucker tolerance (m) for walking geometry; None keeps every vertex.
+    walk_simplify_m: float | None = None
+
+    # Walking results keyed by snapped node pairs (shared across services).
+    walk_cache: WalkCache | None = None
+    # Whole routes keyed by snapped endpoints + departure bucket.
+    route_cache: RouteCache | None = None
 
     def calculate_route(
         self,
@@ -54,36 +102,78 @@ class MultimodalRoutingService:
 
         feed = self.gtfs_repository.load_feed()
 
-        # 1) Build a street graph centered on midpoint.
+        # 1) Build a street graph centered on midpoint, just large enough to
+        # cover both endpoints plus a margin for access/egress walks.
         center = GeoPoint(
             lat=(origin.lat + destination.lat) / 2.0,
             lon=(origin.lon + destination.lon) / 2.0,
         )
         street_graph = self.map_provider.get_street_graph(
-            center=center, dist_m=int(self.street_graph_dist_m)
+            center=center, dist_m=self._street_graph_dist_m(origin, destination)
+        )
+
+        cache_key, endpoint_nodes = self._route_cache_key(
+            feed, street_graph, origin, destination, depart_at, preference
         )
+        origin_node, destination_node = endpoint_nodes
+        if self.route_cache is not None and cache_key is not None:
+            cached = self.route_cache.get(cache_key)
+            if cached is not None:
+                reused = self._reuse_cached_route(
+                    cached,
+                    feed,
+                    street_graph,
+                    origin,
+                    destination,
+                    depart_at,
+                    preference,
+                    endpoint_nodes,
+                )
+                if reused is not None:
+                    return reused
 
         origin_street = self._street_name_for_point(street_graph, origin)
         destination_street = self._street_name_for_point(street_graph, destination)
 
         try:
             # 2) Candidate stops for access/egress.
-            origin_candidates = self._candidate_stops(feed.stops_by_id, origin)
-            dest_candidates = self._candidate_stops(feed.stops_by_id, destination)
+            origin_candidates = self._candidate_stops(feed, origin)
+            dest_candidates = self._candidate_stops(feed, destination)
 
             if not origin_candidates or not dest_candidates:
                 raise NoPathFound("No nearby stops found for origin/destination")
 
             # 3) Initial times = depart_at + walk_time (+ penalty if least_walking)
             depart_s = self._seconds_since_midnight(depart_at)
-            walk_penalty_s_per_m = 0.0 if preference == "fastest" else 2.0
+            walk_penalty_s_per_m = self._walk_penalty_s_per_m(preference)
+
+            # One search from the origin settles every access stop, one reverse
+            # search from the destination settles every egress stop.
+            snaps = self._stop_snap_table(feed, street_graph)
+            origin_walks = self._access_walks(
+                street_graph,
+                origin,
+                origin_candidates,
+                reverse=False,
+                snaps=snaps,
+                source=origin_node,
+            )
+            dest_walks = self._access_walks(
+                street_graph,
+                destination,
+                dest_candidates,
+                reverse=True,
+                snaps=snaps,
+                source=destination_node,
+            )
 
             initial: dict[str, int] = {}
             origin_walk: dict[str, tuple[float, float]] = {}
             for stop in origin_candidates:
-                dist_m = self._walk_distance_m(street_graph, origin, stop.location)
-                if dist_m is None:
+                access = origin_walks.get(stop.id)
+                if access is None:
                     continue
+                dist_m = access.distance_m
                 dur_s = dist_m / self.walk_speed_mps
                 penalty_s = dist_m * walk_penalty_s_per_m
                 initial[stop.id] = int(depart_s + dur_s + penalty_s)
@@ -104,9 +194,10 @@ class MultimodalRoutingService:
                 if arr_s is None:
                     continue
 
-                dist_m = self._walk_distance_m(street_graph, stop.location, destination)
-                if dist_m is None:
+                egress = dest_walks.get(stop.id)
+                if egress is None:
                     continue
+                dist_m = egress.distance_m
 
                 dur_s = dist_m / self.walk_speed_mps
                 penalty_s = dist_m * walk_penalty_s_per_m
@@ -155,8 +246,11 @@ class MultimodalRoutingService:
                     distance_m=float(o_walk_m),
                     duration_s=float(o_walk_s),
                     stops=(),
-                    path=self._walk_path_points(
-                        street_graph, origin, origin_stop.location
+                    path=self._access_path_points(
+                        street_graph,
+                        origin_walks.get(origin_stop.id),
+                        origin,
+                        origin_stop.location,
                     ),
                 )
             )
@@ -207,7 +301,9 @@ class MultimodalRoutingService:
                 if trip and trip.shape_id:
                     shape_pts = feed.shapes_by_id.get(trip.shape_id)
                     if shape_pts and len(shape_pts) >= 2:
-                        path = self._slice_polyline_between_points(
+                        path = self._indexed_shape_slice(
+                            feed, g, shape_pts, start=boarded_at, end=alighted_at
+                        ) or self._slice_polyline_between_points(
                             shape_pts, start=boarded_at, end=alighted_at
                         )
                 if not path and len(stops_seq) >= 2:
@@ -281,17 +377,144 @@ class MultimodalRoutingService:
                     distance_m=float(dest_walk_m),
                     duration_s=float(dest_walk_s),
                     stops=(),
-                    path=self._walk_path_points(
-                        street_graph, dest_stop.location, destination
+                    path=self._access_path_points(
+                        street_graph,
+                        dest_walks.get(dest_stop.id),
+                        dest_stop.location,
+                        destination,
                     ),
                 )
             )
 
-            return Route(origin=origin, destination=destination, legs=tuple(legs))
+            planned = Route(origin=origin, destination=destination, legs=tuple(legs))
         except NoPathFound:
-            # For UX: always provide at least a walking option.
+            # For UX: always provide at least a walking option. It is not
+            # cached: an earlier departure in the same bucket may still have
+            # a transit route.
             return self._walking_only_route(street_graph, origin, destination)
 
+        if self.route_cache is not None and cache_key is not None:
+            self.route_cache.put(cache_key, planned)
+        return planned
+
+    def _reuse_cached_route(
+        self,
+        cached: Route,
+        feed: Any,
+        graph: Any,
+        origin: GeoPoint,
+        destination: GeoPoint,
+        depart_at: datetime,
+        preference: str,
+        endpoint_nodes: tuple[Any, Any],
+    ) -> Route | None:
+        """A cached route adapted to this request, or None to recompute it.
+
+        A plan is only reused by requests leaving no earlier than the one it
+        was computed for and still catching its first boarding: the earliest
+        arrival reachable from a later start is never better, so the plan
+        stays optimal. An earlier request might catch an earlier trip and is
+        recomputed.
+
+        The transit legs are reused as is. The access and egress walks are
+        rebuilt for the requested endpoints (their node-to-node walks come
+        from the walk cache) and re-timed from `depart_at`.
+        """
+
+        legs = list(cached.legs)
+        if len(legs) < 3 or legs[0].mode != TravelMode.WALK:
+            return None
+        first, last = legs[0], legs[-1]
+        if first.depart_at is None or depart_at < first.depart_at:
+            return None
+        origin_stop = feed.stops_by_id.get(first.destination_stop_id or "")
+        dest_stop = feed.stops_by_id.get(last.origin_stop_id or "")
+        if origin_stop is None or dest_stop is None:
+            return None
+
+        snaps = self._stop_snap_table(feed, graph)
+        origin_node, destination_node = endpoint_nodes
+        access = self._access_walks(
+            graph, origin, [origin_stop], reverse=False, snaps=snaps, source=origin_node
+        ).get(origin_stop.id)
+        egress = self._access_walks(
+            graph,
+            destination,
+            [dest_stop],
+            reverse=True,
+            snaps=snaps,
+            source=destination_node,
+        ).get(dest_stop.id)
+        if access is None or egress is None:
+            return None
+
+        walk1_s = access.distance_m / self.walk_speed_mps
+        walk1_arrive = depart_at + timedelta(seconds=float(walk1_s))
+        # Same readiness the transit search used (walk plus its penalty).
+        penalty_s = access.distance_m * self._walk_penalty_s_per_m(preference)
+        board_at = legs[1].depart_at
+        if board_at is None or walk1_arrive + timedelta(seconds=penalty_s) > board_at:
+            return None
+        legs[0] = replace(
+            first,
+            origin=origin,
+            origin_name=self._street_name_for_point(graph, origin),
+            depart_at=depart_at,
+            arrive_at=walk1_arrive,
+            distance_m=float(access.distance_m),
+            duration_s=float(walk1_s),
+            path=self._access_path_points(graph, access, origin, origin_stop.location),
+        )
+
+        walk2_s = egress.distance_m / self.walk_speed_mps
+        walk2_depart = legs[-2].arrive_at or depart_at
+        legs[-1] = replace(
+            last,
+            destination=destination,
+            destination_name=self._street_name_for_point(graph, destination),
+            depart_at=walk2_depart,
+            arrive_at=walk2_depart + timedelta(seconds=float(walk2_s)),
+            distance_m=float(egress.distance_m),
+            duration_s=float(walk2_s),
+            path=self._access_path_points(
+                graph, egress, dest_stop.location, destination
+            ),
+        )
+        return Route(origin=origin, destination=destination, legs=tuple(legs))
+
+    @staticmethod
+    def _walk_penalty_s_per_m(preference: str) -> float:
+        return 0.0 if preference == "fastest" else 2.0
+
+    def _route_cache_key(
+        self,
+        feed: Any,
+        graph: Any,
+        origin: GeoPoint,
+        destination: GeoPoint,
+        depart_at: datetime,
+        preference: str,
+    ) -> tuple[RouteCacheKey | None, tuple[Any, Any]]:
+        """Cache key plus the snapped endpoint nodes (reused by access walks)."""
+
+        if self.route_cache is None:
+            return None, (None, None)
+        try:
+            origin_node, destination_node = nearest_nodes_many(
+                graph, [origin, destination]
+            )
+        except Exception:
+            return None, (None, None)
+        key = self.route_cache.key(
+            feed_version=getattr(feed, "version", None),
+            graph_version=graph_version(graph),
+            origin_node=origin_node,
+            destination_node=destination_node,
+            depart_at=depart_at,
+            preference=preference,
+        )
+        return key, (origin_node, destination_node)
+
     def _walking_only_route(
         self, graph: Any, origin: GeoPoint, destination: GeoPoint
     ) -> Route:
@@ -319,6 +542,11 @@ class MultimodalRoutingService:
         )
         return Route(origin=origin, destination=destination, legs=(leg,))
 
+    def _street_graph_dist_m(self, origin: GeoPoint, destination: GeoPoint) -> int:
+        half_span_m = haversine_distance_m(origin, destination) / 2.0
+        needed = int(math.ceil(half_span_m + float(self.street_graph_margin_m)))
+        return min(int(self.street_graph_dist_m), needed)
+
     def _service_datetime_from_seconds(self, base: datetime, seconds: int) -> datetime:
         return service_datetime_from_seconds(base, seconds)
 
@@ -328,6 +556,25 @@ class MultimodalRoutingService:
     def _polyline_distance_m(self, points: tuple[GeoPoint, ...]) -> float:
         return polyline_distance_m(points)
 
+    def _indexed_shape_slice(
+        self,
+        feed: Any,
+        group: list[Any],
+        shape_pts: tuple[GeoPoint, ...],
+        *,
+        start: GeoPoint,
+        end: GeoPoint,
+    ) -> tuple[GeoPoint, ...] | None:
+        """Leg geometry from the feed's precomputed stop positions, if any."""
+
+        first = getattr(group[0], "seq_index", None)
+        last = getattr(group[-1], "seq_index", None)
+        if first is None or last is None:
+            return None
+        return shape_index_for(feed).slice(
+            group[0].trip_id, first, last + 1, shape_pts, start=start, end=end
+        )
+
     def _slice_polyline_between_points(
         self, points: tuple[GeoPoint, ...], *, start: GeoPoint, end: GeoPoint
     ) -> tuple[GeoPoint, ...]:
@@ -352,23 +599,225 @@ class MultimodalRoutingService:
         }
         return self.queue_service.publish_request(message)
 
-    def _candidate_stops(
-        self, stops_by_id: dict[str, Stop], point: GeoPoint
-    ) -> list[Stop]:
+    def _candidate_stops(self, feed: Any, point: GeoPoint) -> list[Stop]:
         return candidate_stops(
-            stops_by_id,
+            feed.stops_by_id,
             point=point,
             radius_m=float(self.candidate_radius_m),
             max_count=int(self.max_candidate_stops),
+            feed_version=getattr(feed, "version", None),
         )
 
     def _seconds_since_midnight(self, dt: datetime) -> int:
         return seconds_since_midnight(dt)
 
     def _walk_distance_m(self, graph: Any, a: GeoPoint, b: GeoPoint) -> float | None:
-        return walk_distance_m(graph, a, b)
+        return walk_distance_m(
+            graph,
+            a,
+            b,
+            method=self.walk_method,
+            landmarks=self._landmark_table(graph),
+            cache=self.walk_cache,
+            simplify_m=self.walk_simplify_m,
+        )
 
     def _walk_path_points(
         self, graph: Any, a: GeoPoint, b: GeoPoint
     ) -> tuple[GeoPoint, ...]:
-        return walk_path_points(graph, a, b)
+        return walk_path_points(
+            graph,
+            a,
+            b,
+            method=self.walk_method,
+            landmarks=self._landmark_table(graph),
+            cache=self.walk_cache,
+            simplify_m=self.walk_simplify_m,
+        )
+
+    def prepare_landmarks(self, graph: Any) -> LandmarkTable | None:
+        """Build and persist the ALT landmark table if missing or stale.
+
+        Runs full-graph searches per landmark, so it belongs in preprocessing
+        (`scripts/build_routing_artifacts.py`), never in a request.
+        """
+
+        if self.landmark_repository is None:
+            return None
+        g_version = graph_version(graph)
+        if not g_version:
+            return None
+
+        table = self._stored_landmark_table(g_version)
+        if table is not None:
+            return table
+        table = build_landmark_table(
+            graph, graph_version=g_version, count=int(self.landmark_count)
+        )
+        self.landmark_repository.save(table)
+        return table
+
+    def _landmark_table(self, graph: Any) -> LandmarkTable | None:
+        """Stored ALT landmarks for this graph; None unless walk_method="alt".
+
+        A missing or stale table is not rebuilt here; ALT then degrades to
+        plain A*.
+        """
+
+        if self.walk_method != "alt":
+            return None
+        g_version = graph_version(graph)
+        if not g_version:
+            return None
+        return self._stored_landmark_table(g_version)
+
+    def _stored_landmark_table(self, g_version: str) -> LandmarkTable | None:
+        if self.landmark_repository is None:
+            return None
+        try:
+            table = self.landmark_repository.load()
+        except Exception:
+            return None
+        if table is not None and table.graph_version == g_version:
+            return table
+        return None
+
+    def prepare_stop_snaps(self, graph: Any) -> StopSnapTable | None:
+        """Build and persist the stop snapping table if missing or stale.
+
+        Snaps every stop of the feed, so it belongs in preprocessing
+        (`scripts/build_routing_artifacts.py`), never in a request.
+        """
+
+        if self.stop_snap_repository is None:
+            return None
+        feed = self.gtfs_repository.load_feed()
+        feed_version = getattr(feed, "version", None)
+        g_version = graph_version(graph)
+        if not feed_version or not g_version:
+            return None
+
+        table = self._stop_snap_table(feed, graph)
+        if table is not None:
+            return table
+        table = build_stop_snap_table(
+            graph,
+            feed.stops_by_id,
+            feed_version=feed_version,
+            graph_version=g_version,
+        )
+        self.stop_snap_repository.save(table)
+        return table
+
+    def _stop_snap_table(self, feed: Any, graph: Any) -> StopSnapTable | None:
+        """The stored stop snapping table, if it matches this feed and graph.
+
+        Only used when both the feed and the graph carry a version, so a stale
+        artifact can always be detected. A missing or stale table is not
+        rebuilt here; stops are then snapped per request.
+        """
+
+        if self.stop_snap_repository is None:
+            return None
+        feed_version = getattr(feed, "version", None)
+        g_version = graph_version(graph)
+        if not feed_version or not g_version:
+            return None
+
+        try:
+            table = self.stop_snap_repository.load()
+        except Exception:
+            # Never fail routing because of the artifact.
+            return None
+        if table is not None and table.matches(
+            feed_version=feed_version, graph_version=g_version
+        ):
+            return table
+        return None
+
+    def _access_walks(
+        self,
+        graph: Any,
+        point: GeoPoint,
+        stops: list[Stop],
+        *,
+        reverse: bool,
+        snaps: StopSnapTable | None = None,
+        source: Any = None,
+    ) -> dict[str, WalkResult]:
+        """Walks between `point` and every stop, from one bounded search.
+
+        Forward walks go point -> stop, reverse walks stop -> point. Cached
+        pairs are reused; the search only runs if some pair is missing and
+        gives up past `candidate_radius_m * access_detour_factor`, so an
+        unreachable stop cannot make it explore the whole graph.
+        Stops present in `snaps` reuse their precomputed node, and `source`
+        is the already snapped node of `point` when known.
+        """
+
+        if source is None:
+            try:
+                source = nearest_node(graph, point)
+            except Exception:
+                return {}
+
+        stop_nodes: dict[str, Any] = {}
+        for stop in stops:
+            node = snaps.node_for(stop.id) if snaps is not None else None
+            if node is not None:
+                stop_nodes[stop.id] = node
+                continue
+            try:
+                stop_nodes[stop.id] = nearest_node(graph, stop.location)
+            except Exception:
+                continue
+
+        version = graph_version(graph)
+        cache = self.walk_cache
+
+        def _pair(node: Any) -> tuple[Any, Any]:
+            return (node, source) if reverse else (source, node)
+
+        walks: dict[str, WalkResult] = {}
+        missing: dict[str, Any] = {}
+        for stop_id, node in stop_nodes.items():
+            hit = cache.get(version, *_pair(node)) if cache is not None else None
+            if hit is not None:
+                walks[stop_id] = hit
+            else:
+                missing[stop_id] = node
+
+        if not missing:
+            return walks
+
+        try:
+            tree = walk_search(
+                graph,
+                source,
+                targets=missing.values(),
+                cutoff_m=float(self.candidate_radius_m) * self.access_detour_factor,
+                reverse=reverse,
+            )
+        except Exception:
+            return walks
+
+        for stop_id, node in missing.items():
+            result = walk_result_from_tree(
+                graph, tree, node, simplify_m=self.walk_simplify_m
+            )
+            if result is None:
+                continue
+            walks[stop_id] = result
+            if cache is not None:
+                cache.put(version, *_pair(node), result)
+        return walks
+
+    def _access_path_points(
+        self, graph: Any, walk: WalkResult | None, a: GeoPoint, b: GeoPoint
+    ) -> tuple[GeoPoint, ...]:
+        if walk is None:
+            return self._walk_path_points(graph, a, b)
+        pts = walk.points()
+        if len(pts) >= 2:
+            return pts
+        return (a, b)
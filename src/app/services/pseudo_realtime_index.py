@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from src.app.services.feed_cache import FeedScopedCache
+from src.app.services.shape_index import shape_index_for
+from src.domain.algorithms.geodesic import (
+    as_arrays,
+    cumulative_distances_m,
+    distances_from_m,
+)
+from src.domain.models.geo import GeoPoint
+from src.domain.models.gtfs import Connection, GtfsFeed
+
+
+@dataclass(slots=True)
+class PseudoRealtimeIndex:
+    """Per-feed lookups for the schedule-only vehicle fallback.
+
+    Connections are bucketed by the minutes they span, so the active set for
+    a given time only touches one bucket. Trip metadata, shape cumulative
+    distances and stop -> shape vertex lookups are kept across calls.
+    """
+
+    connections: tuple[Connection, ...]
+    trip_route: dict[str, str | None]
+    trip_shape_id: dict[str, str | None]
+    bucket_s: int = 60
+    _buckets: dict[int, list[int]] = field(default_factory=dict, repr=False)
+    _shapes: dict[str, tuple[tuple[GeoPoint, ...], tuple[float, ...]] | None] = field(
+        default_factory=dict, repr=False
+    )
+    _shape_arrays: dict[str, tuple[np.ndarray, np.ndarray]] = field(
+        default_factory=dict, repr=False
+    )
+    _nearest_vertex: dict[tuple[str, str], int] = field(
+        default_factory=dict, repr=False
+    )
+
+    @classmethod
+    def build(cls, feed: GtfsFeed, *, bucket_s: int = 60) -> PseudoRealtimeIndex:
+        index = cls(
+            connections=feed.connections,
+            trip_route={t.trip_id: t.route_id for t in feed.trips_by_id.values()},
+            trip_shape_id={t.trip_id: t.shape_id for t in feed.trips_by_id.values()},
+            bucket_s=max(1, int(bucket_s)),
+        )
+        step = index.bucket_s
+        for i, c in enumerate(feed.connections):
+            if c.arr_time_s < c.dep_time_s:
+                continue
+            for b in range(c.dep_time_s // step, c.arr_time_s // step + 1):
+                index._buckets.setdefault(b, []).append(i)
+
+        for shape_id, cum in shape_index_for(feed).cumulative_m_by_shape.items():
+            pts = feed.shapes_by_id.get(shape_id)
+            if pts and len(pts) == len(cum):
+                index._shapes[shape_id] = (pts, cum)
+        return index
+
+    def active_at(self, now_s: int) -> list[Connection]:
+        """Connections with dep_time_s <= now_s <= arr_time_s, in feed order."""
+
+        conns = self.connections
+        out: list[Connection] = []
+        for i in self._buckets.get(now_s // self.bucket_s, ()):
+            c = conns[i]
+            if c.dep_time_s <= now_s <= c.arr_time_s:
+                out.append(c)
+        return out
+
+    def shape(
+        self, feed: GtfsFeed, shape_id: str
+    ) -> tuple[tuple[GeoPoint, ...], tuple[float, ...]] | None:
+        if shape_id in self._shapes:
+            return self._shapes[shape_id]
+
+        pts = feed.shapes_by_id.get(shape_id)
+        geom = None
+        if pts and len(pts) >= 2:
+            geom = (pts, tuple(cumulative_distances_m(*as_arrays(pts)).tolist()))
+        self._shapes[shape_id] = geom
+        return geom
+
+    def nearest_vertex(self, feed: GtfsFeed, shape_id: str, stop_id: str) -> int | None:
+        key = (shape_id, stop_id)
+        cached = self._nearest_vertex.get(key)
+        if cached is not None:
+            return cached
+
+        stop = feed.stops_by_id.get(stop_id)
+        geom = self.shape(feed, shape_id)
+        if stop is None or geom is None:
+            return None
+
+        arrays = self._shape_arrays.get(shape_id)
+        if arrays is None:
+            arrays = self._shape_arrays[shape_id] = as_arrays(geom[0])
+        lats, lons = arrays
+        best = int(
+            np.argmin(
+                distances_from_m(stop.location.lat, stop.location.lon, lats, lons)
+            )
+        )
+        self._nearest_vertex[key] = best
+        return best
+
+
+_indexes: FeedScopedCache[PseudoRealtimeIndex] = FeedScopedCache(
+    PseudoRealtimeIndex.build, slots=2
+)
+
+
+def pseudo_realtime_index_for(feed: GtfsFeed) -> PseudoRealtimeIndex:
+    return _indexes.get(feed)
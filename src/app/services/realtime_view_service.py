@@ -1,26 +1,36 @@
 from __future__ import annotations
 
-from collections import Counter
-from dataclasses import dataclass
-from datetime import datetime
+from bisect import bisect_left
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta, timezone
 
 from src.app.ports.output import IGtfsRepository, IRealtimeVehicleProvider
+from src.domain.algorithms.bbox_grid import BBoxGrid
+from src.domain.algorithms.departure_index import build_departure_index
 from src.domain.algorithms.geo_utils import haversine_distance_m
-from src.domain.models.geo import GeoPoint
-from src.domain.models.gtfs import GtfsRoute
-from src.domain.models.realtime import RealtimeVehicle
-
-
-def _build_cumulative_distances_m(points: tuple[GeoPoint, ...]) -> tuple[float, ...]:
-    if len(points) < 2:
-        return (0.0,) * len(points)
-
-    out: list[float] = [0.0]
-    total = 0.0
-    for i in range(1, len(points)):
-        total += haversine_distance_m(points[i - 1], points[i])
-        out.append(total)
-    return tuple(out)
+from src.domain.algorithms.map_matching import ShapeSegmentIndex, match_vehicles
+from src.domain.models.geo import BoundingBox, GeoPoint
+from src.domain.models.gtfs import (
+    BoardDeparture,
+    GtfsFeed,
+    GtfsRoute,
+    StopDepartureIndex,
+)
+from src.domain.models.realtime import (
+    RealtimeSnapshot,
+    RealtimeVehicle,
+    RealtimeVehicleChanges,
+    VehicleMatch,
+    VehicleTrail,
+)
+from src.domain.models.stop import Stop
+
+from .feed_cache import FeedScopedCache
+from .pseudo_realtime_index import pseudo_realtime_index_for
+from .route_index import route_index_for
+from .routing_helpers import stop_index_for
+from .shape_index import shape_index_for
+from .vehicle_tracks import VehicleTrackStore
 
 
 def _interpolate_along_polyline(
@@ -37,21 +47,79 @@ def _interpolate_along_polyline(
 
     d = max(0.0, min(float(distance_m), float(total_m)))
 
-    # Find segment containing d (linear scan is fine for demo scale).
-    for i in range(1, len(points)):
-        if cumulative_m[i] >= d:
-            d0 = cumulative_m[i - 1]
-            d1 = cumulative_m[i]
-            denom = max(1e-9, d1 - d0)
-            t = (d - d0) / denom
-            p0 = points[i - 1]
-            p1 = points[i]
-            return GeoPoint(
-                lat=p0.lat + (p1.lat - p0.lat) * t,
-                lon=p0.lon + (p1.lon - p0.lon) * t,
-            )
-
-    return points[-1]
+    # First vertex at or beyond d; the segment is (i - 1, i).
+    i = min(max(bisect_left(cumulative_m, d), 1), len(points) - 1)
+    d0 = cumulative_m[i - 1]
+    d1 = cumulative_m[i]
+    denom = max(1e-9, d1 - d0)
+    t = (d - d0) / denom
+    p0 = points[i - 1]
+    p1 = points[i]
+    return GeoPoint(
+        lat=p0.lat + (p1.lat - p0.lat) * t,
+        lon=p0.lon + (p1.lon - p0.lon) * t,
+    )
+
+
+# Departure boards: built once per feed version.
+_departure_indexes: FeedScopedCache[StopDepartureIndex] = FeedScopedCache(
+    lambda feed: build_departure_index(feed.connections)
+)
+
+# With realtime delays, departures scheduled up to this long ago may still be due.
+_DELAY_LOOKBACK_S = 30 * 60
+
+# Vehicles: rebuilt when the provider hands out a new vehicles tuple.
+_vehicle_grid: tuple[tuple[RealtimeVehicle, ...], BBoxGrid[RealtimeVehicle]] | None = (
+    None
+)
+
+
+def _vehicle_grid_for(
+    vehicles: tuple[RealtimeVehicle, ...],
+) -> BBoxGrid[RealtimeVehicle]:
+    global _vehicle_grid
+    cached = _vehicle_grid
+    if cached is not None and cached[0] is vehicles:
+        return cached[1]
+    grid = BBoxGrid.build(vehicles, lat_lon=lambda v: (v.lat, v.lon))
+    _vehicle_grid = (vehicles, grid)
+    return grid
+
+
+# Shape segments for map-matching: built once per feed version.
+_shape_segments: FeedScopedCache[ShapeSegmentIndex] = FeedScopedCache(
+    lambda feed: ShapeSegmentIndex.build(
+        feed.shapes_by_id,
+        cumulative_m_by_shape=shape_index_for(feed).cumulative_m_by_shape,
+    )
+)
+
+# Matches of the last full fleet snapshot (one batched projection per snapshot).
+_vehicle_matches: (
+    tuple[tuple[RealtimeVehicle, ...], ShapeSegmentIndex, tuple[VehicleMatch, ...]]
+    | None
+) = None
+
+
+def _matches_for(
+    vehicles: tuple[RealtimeVehicle, ...], feed: GtfsFeed
+) -> tuple[VehicleMatch, ...]:
+    global _vehicle_matches
+    segments = _shape_segments.get(feed)
+    cached = _vehicle_matches
+    if cached is not None and cached[0] is vehicles and cached[1] is segments:
+        return cached[2]
+    shapes_by_route = route_index_for(feed).shapes_by_route
+    matches = match_vehicles(
+        vehicles,
+        segments=segments,
+        trips_by_id=feed.trips_by_id,
+        shape_index=shape_index_for(feed),
+        shape_by_route={r: ids[0] for r, ids in shapes_by_route.items() if ids},
+    )
+    _vehicle_matches = (vehicles, segments, matches)
+    return matches
 
 
 @dataclass(slots=True)
@@ -65,6 +133,8 @@ class RealtimeViewService:
 
     gtfs_repository: IGtfsRepository
     vehicle_provider: IRealtimeVehicleProvider | None = None
+    # Records provider snapshots and fills in missing speed/bearing.
+    tracks: VehicleTrackStore | None = None
 
     def list_routes(self) -> tuple[GtfsRoute, ...]:
         feed = self.gtfs_repository.load_feed()
@@ -75,136 +145,204 @@ class RealtimeViewService:
     def route_shapes(
         self, *, route_id: str, max_shapes: int = 2
     ) -> tuple[tuple[str, tuple[GeoPoint, ...]], ...]:
-        feed = self.gtfs_repository.load_feed()
-
-        # Find the most common shape_id among trips for this route.
-        shape_counts: Counter[str] = Counter()
-        for trip in feed.trips_by_id.values():
-            if trip.route_id != route_id:
-                continue
-            if not trip.shape_id:
-                continue
-            if trip.shape_id not in feed.shapes_by_id:
-                continue
-            shape_counts[trip.shape_id] += 1
-
-        if not shape_counts:
-            return ()
-
-        chosen: list[tuple[str, tuple[GeoPoint, ...]]] = []
-        for shape_id, _ in shape_counts.most_common(max_shapes):
-            pts = feed.shapes_by_id.get(shape_id)
-            if not pts or len(pts) < 2:
-                continue
-            chosen.append((shape_id, pts))
+        """The most used shape polylines of a route, most common first."""
 
-        return tuple(chosen)
-
-    def route_stops(self, *, route_id: str) -> tuple[tuple[str, str, GeoPoint], ...]:
-        """Return unique stops used by trips of a route.
-
-        Ordering is not guaranteed; intended for map markers.
+        feed = self.gtfs_repository.load_feed()
+        shape_ids = route_index_for(feed).shapes_by_route.get(route_id, ())
+        return tuple(
+            (shape_id, feed.shapes_by_id[shape_id])
+            for shape_id in shape_ids[: max(0, max_shapes)]
+        )
+
+    def route_stops(
+        self,
+        *,
+        route_id: str,
+        direction_id: str | None = None,
+        bbox: BoundingBox | None = None,
+    ) -> tuple[tuple[str, str, GeoPoint], ...]:
+        """Return unique stops used by trips of a route, in travel order.
+
+        Without `direction_id` every direction is included (lowest
+        direction_id first); stops shared by both directions appear once.
+        `bbox` keeps only the stops inside the viewport.
         """
 
         feed = self.gtfs_repository.load_feed()
-
-        trip_ids: set[str] = set()
-        for trip in feed.trips_by_id.values():
-            if trip.route_id == route_id:
-                trip_ids.add(trip.trip_id)
-
-        if not trip_ids:
-            return ()
-
-        stop_ids: set[str] = set()
-        for c in feed.connections:
-            if c.trip_id not in trip_ids:
-                continue
-            stop_ids.add(c.dep_stop_id)
-            stop_ids.add(c.arr_stop_id)
-
+        stop_ids = route_index_for(feed).route_stop_ids(
+            route_id, direction_id=direction_id
+        )
         stops: list[tuple[str, str, GeoPoint]] = []
         for sid in stop_ids:
             s = feed.stops_by_id.get(sid)
             if s is None:
                 continue
+            if bbox is not None and not bbox.contains(s.location.lat, s.location.lon):
+                continue
             stops.append((s.id, s.name, s.location))
-
-        stops.sort(key=lambda x: (x[1], x[0]))
         return tuple(stops)
 
+    def stops_in_bbox(
+        self, *, bbox: BoundingBox, limit: int | None = None
+    ) -> tuple[tuple[str, str, GeoPoint], ...]:
+        """Stops inside a viewport, from the feed's shared stop index."""
+
+        feed = self.gtfs_repository.load_feed()
+        return tuple(
+            (s.id, s.name, s.location)
+            for s in stop_index_for(
+                feed.stops_by_id, feed_version=feed.version
+            ).in_bbox(bbox, limit=limit)
+        )
+
+    async def stop_departures(
+        self, *, stop_id: str, limit: int = 10, now: datetime | None = None
+    ) -> tuple[Stop, tuple[BoardDeparture, ...]] | None:
+        """The stop and its next departures, ordered by expected time.
+
+        Returns None for an unknown stop. Trip delays from the realtime
+        provider shift the expected time; trips of the previous service day
+        (GTFS times past 24:00) are included.
+        """
+
+        feed = self.gtfs_repository.load_feed()
+        stop = feed.stops_by_id.get(stop_id)
+        if stop is None:
+            return None
+        index = _departure_indexes.get(feed)
+
+        delays: dict[str, int] = {}
+        if self.vehicle_provider is not None:
+            delays = await self.vehicle_provider.trip_delays()
+
+        now = now or datetime.now()
+        midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        now_s = int((now - midnight).total_seconds())
+        lookback_s = _DELAY_LOOKBACK_S if delays else 0
+
+        rows: list[BoardDeparture] = []
+        for day_s in (0, 86400):
+            start_s = now_s + day_s - lookback_s
+            window = index.count_between(stop_id, start_s, now_s + day_s)
+            for dep in index.next_departures(
+                stop_id,
+                start_s,
+                limit + window,
+                connections=feed.connections,
+                trips_by_id=feed.trips_by_id,
+            ):
+                route = feed.routes_by_id.get(dep.route_id or "")
+                row = BoardDeparture(
+                    departure=dep,
+                    scheduled_at=midnight + timedelta(seconds=dep.dep_time_s - day_s),
+                    delay_s=delays.get(dep.trip_id),
+                    route_short_name=route.short_name if route else None,
+                )
+                if row.expected_at >= now:
+                    rows.append(row)
+
+        rows.sort(key=lambda r: r.expected_at)
+        return stop, tuple(rows[:limit])
+
     async def list_vehicles(
         self, *, route_ids: set[str] | None = None
     ) -> tuple[RealtimeVehicle, ...]:
+        return (await self.vehicle_snapshot(route_ids=route_ids)).vehicles
+
+    async def vehicle_snapshot(
+        self,
+        *,
+        route_ids: set[str] | None = None,
+        bbox: BoundingBox | None = None,
+    ) -> RealtimeSnapshot:
         # 1) Prefer realtime provider if configured.
         if self.vehicle_provider is not None:
-            vehicles = await self.vehicle_provider.list_vehicles()
+            snap = await self.vehicle_provider.snapshot()
+            vehicles = snap.vehicles
+            if self.tracks is not None:
+                vehicles = self.tracks.observe(vehicles)
+            if bbox is not None:
+                vehicles = tuple(_vehicle_grid_for(vehicles).query(bbox))
             if route_ids:
                 vehicles = tuple(
                     v for v in vehicles if v.route_id and v.route_id in route_ids
                 )
-            return vehicles
+            return (
+                snap if vehicles is snap.vehicles else replace(snap, vehicles=vehicles)
+            )
 
         # 2) Fallback: schedule-based "pseudo realtime" from GTFS connections.
-        feed = self.gtfs_repository.load_feed()
-        now = datetime.now()
-        now_s = now.hour * 3600 + now.minute * 60 + now.second
+        vehicles = self._pseudo_realtime_vehicles(route_ids)
+        if bbox is not None:
+            vehicles = tuple(v for v in vehicles if bbox.contains(v.lat, v.lon))
+        return RealtimeSnapshot(
+            vehicles=vehicles, fetched_at=datetime.now(tz=timezone.utc)
+        )
 
-        trip_route: dict[str, str | None] = {
-            t.trip_id: t.route_id for t in feed.trips_by_id.values()
-        }
+    async def vehicle_changes(self, *, since: int | None) -> RealtimeVehicleChanges:
+        """Vehicles changed after feed timestamp `since` (full set without a provider)."""
 
-        trip_shape_id: dict[str, str | None] = {
-            t.trip_id: t.shape_id for t in feed.trips_by_id.values()
-        }
-
-        # Cache per-shape geometry for interpolation.
-        shape_cache: dict[str, tuple[tuple[GeoPoint, ...], tuple[float, ...]]] = {}
+        if self.vehicle_provider is not None:
+            changes = await self.vehicle_provider.changes_since(since)
+            if self.tracks is not None and changes.upserted:
+                changes = replace(
+                    changes, upserted=self.tracks.observe_changes(changes.upserted)
+                )
+            return changes
+        snap = await self.vehicle_snapshot()
+        return RealtimeVehicleChanges(
+            feed_timestamp=None, upserted=snap.vehicles, full=True
+        )
 
-        # Cache nearest vertex lookup: (shape_id, stop_id) -> index
-        nearest_vertex_cache: dict[tuple[str, str], int] = {}
+    async def vehicle_matches(
+        self, *, route_ids: set[str] | None = None
+    ) -> tuple[RealtimeSnapshot, tuple[VehicleMatch, ...]]:
+        """Vehicles snapped onto their trip shapes, with progress between stops.
 
-        def get_shape(
-            shape_id: str,
-        ) -> tuple[tuple[GeoPoint, ...], tuple[float, ...]] | None:
-            cached = shape_cache.get(shape_id)
-            if cached is not None:
-                return cached
+        The whole fleet is matched once per snapshot and then filtered.
+        """
 
-            pts = feed.shapes_by_id.get(shape_id)
-            if not pts or len(pts) < 2:
-                return None
+        snap = await self.vehicle_snapshot()
+        matches = _matches_for(snap.vehicles, self.gtfs_repository.load_feed())
+        if route_ids:
+            matches = tuple(m for m in matches if m.route_id in route_ids)
+        return snap, matches
+
+    def vehicle_trails(
+        self, *, route_ids: set[str] | None = None, max_age_s: float | None = None
+    ) -> list[VehicleTrail]:
+        if self.tracks is None:
+            return []
+        return self.tracks.trails(route_ids=route_ids, max_age_s=max_age_s)
+
+    def _pseudo_realtime_vehicles(
+        self, route_ids: set[str] | None
+    ) -> tuple[RealtimeVehicle, ...]:
+        feed = self.gtfs_repository.load_feed()
+        now = datetime.now()
+        now_s = now.hour * 3600 + now.minute * 60 + now.second
 
-            cum = _build_cumulative_distances_m(pts)
-            shape_cache[shape_id] = (pts, cum)
-            return shape_cache[shape_id]
+        # Per-feed interval index + shape caches, reused across calls.
+        index = pseudo_realtime_index_for(feed)
+        trip_route = index.trip_route
 
-        def nearest_vertex_index(shape_id: str, stop_id: str) -> int | None:
-            key = (shape_id, stop_id)
-            if key in nearest_vertex_cache:
-                return nearest_vertex_cache[key]
+        # Stop positions along shapes (empty for ad-hoc feeds).
+        shape_index = shape_index_for(feed)
 
-            stop = feed.stops_by_id.get(stop_id)
-            geom = get_shape(shape_id)
-            if stop is None or geom is None:
+        def indexed_positions(
+            trip_id: str, seq: int | None
+        ) -> tuple[float, float] | None:
+            # Precomputed (per feed) positions of the two stops on the shape.
+            if seq is None:
+                return None
+            pa = shape_index.position(trip_id, seq)
+            pb = shape_index.position(trip_id, seq + 1)
+            if pa is None or pb is None:
                 return None
+            return pa.along_m, pb.along_m
 
-            pts, _ = geom
-            best_i = 0
-            best_d = float("inf")
-            for i, p in enumerate(pts):
-                d = haversine_distance_m(stop.location, p)
-                if d < best_d:
-                    best_d = d
-                    best_i = i
-
-            nearest_vertex_cache[key] = best_i
-            return best_i
-
-        active_by_trip: dict[str, tuple[str, str, int, int]] = {}
-        for c in feed.connections:
-            if not (c.dep_time_s <= now_s <= c.arr_time_s):
-                continue
+        active_by_trip: dict[str, tuple[str, str, int, int, int | None]] = {}
+        for c in index.active_at(now_s):
             rid = trip_route.get(c.trip_id)
             if route_ids and (rid is None or rid not in route_ids):
                 continue
@@ -215,10 +353,17 @@ class RealtimeViewService:
                     c.arr_stop_id,
                     c.dep_time_s,
                     c.arr_time_s,
+                    getattr(c, "seq_index", None),
                 )
 
         vehicles_out: list[RealtimeVehicle] = []
-        for trip_id, (a_stop, b_stop, dep_s, arr_s) in active_by_trip.items():
+        for trip_id, (
+            a_stop,
+            b_stop,
+            dep_s,
+            arr_s,
+            seq,
+        ) in active_by_trip.items():
             a = feed.stops_by_id.get(a_stop)
             b = feed.stops_by_id.get(b_stop)
             if a is None or b is None:
@@ -234,18 +379,21 @@ class RealtimeViewService:
             speed_mps = float(dist_m / denom) if denom > 0 else None
 
             # If this trip has a GTFS shape, interpolate along the polyline instead.
-            shape_id = trip_shape_id.get(trip_id)
+            shape_id = index.trip_shape_id.get(trip_id)
             if shape_id:
-                geom = get_shape(shape_id)
+                geom = index.shape(feed, shape_id)
                 if geom is not None:
                     pts, cum = geom
-                    ia = nearest_vertex_index(shape_id, a_stop)
-                    ib = nearest_vertex_index(shape_id, b_stop)
+                    along = indexed_positions(trip_id, seq)
+                    if along is None:
+                        ia = index.nearest_vertex(feed, shape_id, a_stop)
+                        ib = index.nearest_vertex(feed, shape_id, b_stop)
+                        if ia is not None and ib is not None:
+                            along = (cum[ia], cum[ib])
 
                     # Only use shape interpolation if stop order is consistent along polyline.
-                    if ia is not None and ib is not None and ia < ib:
-                        da = cum[ia]
-                        db = cum[ib]
+                    if along is not None and along[0] < along[1]:
+                        da, db = along
                         seg_m = max(0.0, db - da)
                         d_now = da + seg_m * t
                         p = _interpolate_along_polyline(pts, cum, d_now)
@@ -0,0 +1,266 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+
+from src.app.ports.output import IRouteCacheBackend
+from src.domain.models import GeoPoint, Route, RouteLeg, Stop, TransitLine, TravelMode
+
+logger = logging.getLogger(__name__)
+
+RouteCacheKey = tuple[str, str, Any, Any, int, int, str]
+
+
+def _point(p: GeoPoint) -> list[float]:
+    return [p.lat, p.lon]
+
+
+def _from_point(raw: list[float]) -> GeoPoint:
+    return GeoPoint(lat=float(raw[0]), lon=float(raw[1]))
+
+
+def _time(value: datetime | None) -> str | None:
+    return value.isoformat() if value else None
+
+
+def _from_time(raw: str | None) -> datetime | None:
+    return datetime.fromisoformat(raw) if raw else None
+
+
+def _route_to_dict(route: Route) -> dict[str, Any]:
+    """JSON-safe form of a route for the shared backend (no pickle)."""
+
+    return {
+        "origin": _point(route.origin),
+        "destination": _point(route.destination),
+        "legs": [
+            {
+                "mode": leg.mode.value,
+                "origin": _point(leg.origin),
+                "destination": _point(leg.destination),
+                "origin_name": leg.origin_name,
+                "destination_name": leg.destination_name,
+                "origin_stop_id": leg.origin_stop_id,
+                "destination_stop_id": leg.destination_stop_id,
+                "depart_at": _time(leg.depart_at),
+                "arrive_at": _time(leg.arrive_at),
+                "distance_m": leg.distance_m,
+                "duration_s": leg.duration_s,
+                "stops": [[s.id, s.name, *_point(s.location)] for s in leg.stops],
+                "path": [_point(p) for p in leg.path],
+                "line": (
+                    {
+                        "route_id": leg.line.route_id,
+                        "short_name": leg.line.short_name,
+                        "long_name": leg.line.long_name,
+                        "color": leg.line.color,
+                        "text_color": leg.line.text_color,
+                    }
+                    if leg.line
+                    else None
+                ),
+                "trip_id": leg.trip_id,
+            }
+            for leg in route.legs
+        ],
+    }
+
+
+def _route_from_dict(raw: dict[str, Any]) -> Route:
+    legs = tuple(
+        RouteLeg(
+            mode=TravelMode(leg["mode"]),
+            origin=_from_point(leg["origin"]),
+            destination=_from_point(leg["destination"]),
+            origin_name=leg.get("origin_name"),
+            destination_name=leg.get("destination_name"),
+            origin_stop_id=leg.get("origin_stop_id"),
+            destination_stop_id=leg.get("destination_stop_id"),
+            depart_at=_from_time(leg.get("depart_at")),
+            arrive_at=_from_time(leg.get("arrive_at")),
+            distance_m=leg.get("distance_m"),
+            duration_s=leg.get("duration_s"),
+            stops=tuple(
+                Stop(id=sid, name=name, location=GeoPoint(lat=lat, lon=lon))
+                for sid, name, lat, lon in leg.get("stops", ())
+            ),
+            path=tuple(_from_point(p) for p in leg.get("path", ())),
+            line=TransitLine(**leg["line"]) if leg.get("line") else None,
+            trip_id=leg.get("trip_id"),
+        )
+        for leg in raw["legs"]
+    )
+    return Route(
+        origin=_from_point(raw["origin"]),
+        destination=_from_point(raw["destination"]),
+        legs=legs,
+    )
+
+
+@dataclass(slots=True)
+class RouteCache:
+    """LRU + TTL cache of computed routes.
+
+    Keys are (feed_version, graph_version, origin_node, destination_node,
+    service day, departure bucket, preference): requests snapping to the
+    same street nodes within `bucket_s` seconds share a result. Requests
+    on an unversioned feed or graph are never cached. An optional shared
+    `backend` is consulted on local misses and written on every put, so
+    other processes reuse the result; shared entries are compressed JSON,
+    never pickles, so the backend cannot inject code. Thread-safe.
+    """
+
+    max_entries: int = 1024
+    ttl_s: float = 300.0
+    bucket_s: int = 60
+    backend: IRouteCacheBackend | None = None
+
+    hits: int = 0
+    shared_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    _entries: OrderedDict[RouteCacheKey, tuple[float, Route]] = field(
+        default_factory=OrderedDict, init=False, repr=False
+    )
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False
+    )
+
+    def key(
+        self,
+        *,
+        feed_version: str | None,
+        graph_version: str | None,
+        origin_node: Any,
+        destination_node: Any,
+        depart_at: datetime,
+        preference: str,
+    ) -> RouteCacheKey | None:
+        if not feed_version or not graph_version or self.max_entries <= 0:
+            return None
+        seconds = depart_at.hour * 3600 + depart_at.minute * 60 + depart_at.second
+        return (
+            feed_version,
+            graph_version,
+            origin_node,
+            destination_node,
+            depart_at.toordinal(),
+            seconds // max(1, self.bucket_s),
+            preference,
+        )
+
+    @staticmethod
+    def _shared_key(key: RouteCacheKey) -> str:
+        return hashlib.sha1(repr(key).encode()).hexdigest()
+
+    def get(self, key: RouteCacheKey) -> Route | None:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+                self.expirations += 1
+
+        route = self._get_shared(key)
+        with self._lock:
+            if route is None:
+                self.misses += 1
+                return None
+            self.shared_hits += 1
+            self._store(key, route, now)
+        return route
+
+    def put(self, key: RouteCacheKey, route: Route) -> None:
+        with self._lock:
+            self._store(key, route, time.monotonic())
+        if self.backend is not None:
+            try:
+                payload = json.dumps(_route_to_dict(route), separators=(",", ":"))
+                value = zlib.compress(payload.encode("utf-8"))
+                self.backend.put(self._shared_key(key), value, ttl_s=self.ttl_s)
+            except Exception:
+                logger.warning("Shared route cache write failed", exc_info=True)
+
+    def _get_shared(self, key: RouteCacheKey) -> Route | None:
+        if self.backend is None:
+            return None
+        try:
+            value = self.backend.get(self._shared_key(key))
+            if not value:
+                return None
+            return _route_from_dict(json.loads(zlib.decompress(value)))
+        except Exception:
+            # The shared cache is an optimization; a failure is a miss.
+            logger.warning("Shared route cache read failed", exc_info=True)
+            return None
+
+    def _store(self, key: RouteCacheKey, route: Route, now: float) -> None:
+        self._entries[key] = (now + self.ttl_s, route)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, float | int]:
+        with self._lock:
+            lookups = self.hits + self.shared_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": ((self.hits + self.shared_hits) / lookups)
+                if lookups
+                else 0.0,
+            }
+
+
+_shared: RouteCache | None = None
+_shared_lock = threading.Lock()
+
+
+def shared_route_cache(backend: IRouteCacheBackend | None = None) -> RouteCache:
+    """Process-wide route cache shared by the API and the worker.
+
+    `backend` is only used when the cache is first created.
+
+    Env vars:
+      - ROUTE_CACHE_MAX_ENTRIES: routes kept in memory (default 1024; 0 disables)
+      - ROUTE_CACHE_TTL_S: seconds a route stays valid (default 300)
+      - ROUTE_CACHE_BUCKET_S: departure time rounding in seconds (default 60)
+    """
+
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            entries = (os.getenv("ROUTE_CACHE_MAX_ENTRIES") or "").strip()
+            ttl = (os.getenv("ROUTE_CACHE_TTL_S") or "").strip()
+            bucket = (os.getenv("ROUTE_CACHE_BUCKET_S") or "").strip()
+            _shared = RouteCache(
+                max_entries=int(entries) if entries else 1024,
+                ttl_s=float(ttl) if ttl else 300.0,
+                bucket_s=int(bucket) if bucket else 60,
+                backend=backend,
+            )
+        return _shared
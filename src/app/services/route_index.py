@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+
+from src.app.services.feed_cache import FeedScopedCache
+from src.domain.models.gtfs import GtfsFeed
+
+
+def _merge_patterns(patterns: list[tuple[str, ...]]) -> tuple[str, ...]:
+    """Union of stop patterns, keeping the travel order of the first one.
+
+    Stops only served by later patterns are inserted right after the stop
+    that precedes them in that pattern (or appended when there is none).
+    """
+
+    merged: list[str] = []
+    seen: set[str] = set()
+    for pattern in patterns:
+        prev: str | None = None
+        for sid in pattern:
+            if sid not in seen:
+                pos = merged.index(prev) + 1 if prev is not None else len(merged)
+                merged.insert(pos, sid)
+                seen.add(sid)
+            prev = sid
+    return tuple(merged)
+
+
+@dataclass(slots=True)
+class RouteIndex:
+    """Per-feed route lookups for the realtime map endpoints.
+
+    - `trips_by_route`: trip ids per route_id.
+    - `shapes_by_route`: shape ids per route_id, most used first.
+    - `stops_by_route_direction`: stop ids in travel order per
+      (route_id, direction_id); the most common stop pattern of the direction
+      sets the order and less common variants are merged into it.
+    - `stops_by_route`: every direction concatenated (lowest direction_id
+      first) without repeating stops.
+    """
+
+    trips_by_route: dict[str, tuple[str, ...]] = field(default_factory=dict)
+    shapes_by_route: dict[str, tuple[str, ...]] = field(default_factory=dict)
+    stops_by_route_direction: dict[tuple[str, str | None], tuple[str, ...]] = field(
+        default_factory=dict
+    )
+    stops_by_route: dict[str, tuple[str, ...]] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, feed: GtfsFeed) -> RouteIndex:
+        trips: dict[str, list[str]] = defaultdict(list)
+        shape_counts: dict[str, Counter[str]] = defaultdict(Counter)
+        for trip in feed.trips_by_id.values():
+            if not trip.route_id:
+                continue
+            trips[trip.route_id].append(trip.trip_id)
+            shape_id = trip.shape_id
+            pts = feed.shapes_by_id.get(shape_id) if shape_id else None
+            if shape_id and pts and len(pts) >= 2:
+                shape_counts[trip.route_id][shape_id] += 1
+
+        # Stop sequence of every trip, from its connections in travel order.
+        hops: dict[str, list[tuple[int, int, str, str]]] = defaultdict(list)
+        for c in feed.connections:
+            order = c.seq_index if c.seq_index is not None else -1
+            hops[c.trip_id].append((order, c.dep_time_s, c.dep_stop_id, c.arr_stop_id))
+
+        patterns: dict[tuple[str, str | None], Counter[tuple[str, ...]]] = defaultdict(
+            Counter
+        )
+        for trip_id, trip_hops in hops.items():
+            hop_trip = feed.trips_by_id.get(trip_id)
+            if hop_trip is None or not hop_trip.route_id:
+                continue
+            trip_hops.sort()
+            stop_seq = [trip_hops[0][2]]
+            for _, _, dep, arr in trip_hops:
+                if stop_seq[-1] != dep:
+                    stop_seq.append(dep)
+                stop_seq.append(arr)
+            patterns[(hop_trip.route_id, hop_trip.direction_id)][tuple(stop_seq)] += 1
+
+        by_direction = {
+            key: _merge_patterns([p for p, _ in counts.most_common()])
+            for key, counts in patterns.items()
+        }
+        by_route: dict[str, list[str]] = defaultdict(list)
+        for route_id, direction_id in sorted(
+            by_direction, key=lambda k: (k[0], k[1] is None, k[1] or "")
+        ):
+            ordered = by_route[route_id]
+            for sid in by_direction[(route_id, direction_id)]:
+                if sid not in ordered:
+                    ordered.append(sid)
+
+        return cls(
+            trips_by_route={r: tuple(ids) for r, ids in trips.items()},
+            shapes_by_route={
+                r: tuple(sid for sid, _ in counts.most_common())
+                for r, counts in shape_counts.items()
+            },
+            stops_by_route_direction=by_direction,
+            stops_by_route={r: tuple(ids) for r, ids in by_route.items()},
+        )
+
+    def route_stop_ids(
+        self, route_id: str, *, direction_id: str | None = None
+    ) -> tuple[str, ...]:
+        """Stop ids of a route in travel order (one direction if given)."""
+
+        if direction_id is not None:
+            return self.stops_by_route_direction.get((route_id, direction_id), ())
+        return self.stops_by_route.get(route_id, ())
+
+
+_indexes: FeedScopedCache[RouteIndex] = FeedScopedCache(RouteIndex.build, slots=2)
+
+
+def route_index_for(feed: GtfsFeed) -> RouteIndex:
+    return _indexes.get(feed)
@@ -7,6 +7,7 @@ from uuid import uuid4
 
 from src.app.ports.output import IQueueService, IRouteResultRepository
 from src.app.services.multimodal_routing_service import Preference
+from src.domain.algorithms.polyline import GeometryFormat
 from src.domain.models import GeoPoint
 
 
@@ -22,6 +23,8 @@ class RouteJobsService:
         destination: GeoPoint,
         depart_at: datetime,
         preference: Preference,
+        geometry: GeometryFormat = "points",
+        simplify_m: float | None = None,
     ) -> str:
         request_id = str(uuid4())
 
@@ -30,6 +33,8 @@ class RouteJobsService:
             "destination": {"lat": destination.lat, "lon": destination.lon},
             "depart_at": depart_at.isoformat(),
             "preference": preference,
+            "geometry": geometry,
+            "simplify_m": simplify_m,
         }
 
         self.result_repository.put_pending(request_id=request_id, payload=payload)
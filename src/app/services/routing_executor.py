@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable
+
+from src.domain.exceptions import RoutingBusy, RoutingTimeout, RoutingUnavailable
+from src.domain.models import GeoPoint, Route
+
+from .multimodal_routing_service import MultimodalRoutingService, Preference
+
+RoutingServiceFactory = Callable[[], MultimodalRoutingService]
+
+# The routing service of a pool worker process, built once by the initializer.
+_worker_service: MultimodalRoutingService | None = None
+
+
+def _init_worker(factory: RoutingServiceFactory) -> None:
+    global _worker_service
+    _worker_service = factory()
+
+
+def _worker_pid() -> int:
+    return os.getpid()
+
+
+def _calculate(
+    origin: GeoPoint, destination: GeoPoint, depart_at: datetime, preference: Preference
+) -> Route:
+    assert _worker_service is not None  # set by _init_worker
+    return _worker_service.calculate_route(
+        origin=origin,
+        destination=destination,
+        depart_at=depart_at,
+        preference=preference,
+    )
+
+
+@dataclass(slots=True)
+class RoutingExecutor:
+    """Runs route calculations on a pool of warm worker processes.
+
+    Each worker builds its routing service once with `factory` (a
+    module-level function, so it can be pickled), which should load the
+    feed and street graph up front; requests then only pay for the search.
+    At most `workers + max_queue` calculations are admitted at a time,
+    beyond that `RoutingBusy` is raised instead of queueing without bound.
+    A calculation exceeding `timeout_s` raises `RoutingTimeout`; a queued
+    one is cancelled, a running one finishes in its worker but the caller
+    stops waiting. If a worker dies (OOM kill, native crash) the pool is
+    replaced and re-warmed, and the affected calls raise
+    `RoutingUnavailable`.
+    """
+
+    factory: RoutingServiceFactory
+    workers: int = 2
+    max_queue: int = 16
+    timeout_s: float = 30.0
+    # 'spawn' is safe with the API's threads; 'fork' / 'forkserver' also work.
+    start_method: str = "spawn"
+
+    completed: int = field(default=0, init=False)
+    rejected: int = field(default=0, init=False)
+    timeouts: int = field(default=0, init=False)
+    restarts: int = field(default=0, init=False)
+
+    _pool: ProcessPoolExecutor | None = field(default=None, init=False, repr=False)
+    _inflight: int = field(default=0, init=False, repr=False)
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False
+    )
+
+    def _ensure_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=max(1, self.workers),
+                    mp_context=multiprocessing.get_context(self.start_method),
+                    initializer=_init_worker,
+                    initargs=(self.factory,),
+                )
+            return self._pool
+
+    def _restart(self, broken: ProcessPoolExecutor) -> None:
+        """Replace a pool left broken by a dead worker and warm the new one."""
+
+        with self._lock:
+            if self._pool is not broken:
+                return  # already replaced by a concurrent caller
+            self._pool = None
+            self.restarts += 1
+        broken.shutdown(wait=False, cancel_futures=True)
+        pool = self._ensure_pool()
+        for _ in range(max(1, self.workers)):
+            pool.submit(_worker_pid)
+
+    async def start(self) -> set[int]:
+        """Spawn the workers now; returns the pids that answered a probe.
+
+        One probe per worker is submitted at once, so the pool starts all of
+        them and each runs the (slow) initializer before the first request
+        rather than during it.
+        """
+
+        pool = self._ensure_pool()
+        probes = [pool.submit(_worker_pid) for _ in range(max(1, self.workers))]
+        return set(await asyncio.gather(*(asyncio.wrap_future(f) for f in probes)))
+
+    def _admit(self) -> None:
+        with self._lock:
+            if self._inflight >= max(1, self.workers) + self.max_queue:
+                self.rejected += 1
+                raise RoutingBusy("Routing queue is full, retry later")
+            self._inflight += 1
+
+    def _release(self, future: Future) -> None:
+        with self._lock:
+            self._inflight -= 1
+            if not future.cancelled() and future.exception() is None:
+                self.completed += 1
+
+    async def calculate_route(
+        self,
+        *,
+        origin: GeoPoint,
+        destination: GeoPoint,
+        depart_at: datetime,
+        preference: Preference,
+    ) -> Route:
+        pool = self._ensure_pool()
+        self._admit()
+        try:
+            future = pool.submit(_calculate, origin, destination, depart_at, preference)
+        except BaseException as exc:
+            with self._lock:
+                self._inflight -= 1
+            if isinstance(exc, BrokenProcessPool):
+                self._restart(pool)
+                raise RoutingUnavailable("Routing workers restarting, retry") from exc
+            raise
+        # Released when the worker is really done, not when the caller gives up.
+        future.add_done_callback(self._release)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout_s)
+        except asyncio.TimeoutError:
+            future.cancel()
+            with self._lock:
+                self.timeouts += 1
+            raise RoutingTimeout(
+                f"Route calculation exceeded {self.timeout_s:g}s"
+            ) from None
+        except BrokenProcessPool as exc:
+            self._restart(pool)
+            raise RoutingUnavailable("Routing worker exited, retry") from exc
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict[str, float | int]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "inflight": self._inflight,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "timeouts": self.timeouts,
+                "restarts": self.restarts,
+            }
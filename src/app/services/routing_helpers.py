@@ -1,13 +1,33 @@
 from __future__ import annotations
 
+import heapq
+import itertools
+import threading
+import weakref
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Any
+from typing import Any, Callable, Iterable, Literal, Sequence
 
 import networkx as nx
-
-from src.domain.algorithms.geo_utils import haversine_distance_m
+import numpy as np
+
+from src.domain.algorithms.geo_utils import haversine_distance_m, haversine_m
+from src.domain.algorithms.geodesic import (
+    as_arrays,
+    consecutive_distances_m,
+    distances_from_m,
+)
+from src.domain.algorithms.polyline import simplify_mask
+from src.domain.algorithms.stop_index import StopSpatialIndex
 from src.domain.exceptions import NoPathFound
-from src.domain.models import GeoPoint, Stop
+from src.domain.models import GeoPoint, LandmarkTable, Stop, StopSnap, StopSnapTable
+
+from .walk_cache import WalkCache, WalkResult
+
+# "networkx" is the reference implementation; the others run walk_search.
+WalkMethod = Literal["networkx", "dijkstra", "astar", "alt"]
 
 
 def service_datetime_from_seconds(base: datetime, seconds: int) -> datetime:
@@ -26,17 +46,47 @@ def seconds_since_midnight(dt: datetime) -> int:
     return dt.hour * 3600 + dt.minute * 60 + dt.second
 
 
+# Stop indexes per feed (feeds are reloaded per request, so key by version).
+_STOP_INDEX_SLOTS = 4
+_stop_indexes: OrderedDict[Any, tuple[dict[str, Stop], StopSpatialIndex]] = (
+    OrderedDict()
+)
+_stop_indexes_lock = threading.Lock()
+
+
+def stop_index_for(
+    stops_by_id: dict[str, Stop], *, feed_version: str | None = None
+) -> StopSpatialIndex:
+    """Process-wide spatial index of a feed's stops, built once per version.
+
+    Unversioned (ad-hoc) feeds are cached by identity of `stops_by_id`.
+    """
+
+    key: Any = ("v", feed_version) if feed_version else ("id", id(stops_by_id))
+    with _stop_indexes_lock:
+        entry = _stop_indexes.get(key)
+        if entry is not None and (feed_version or entry[0] is stops_by_id):
+            _stop_indexes.move_to_end(key)
+            return entry[1]
+
+    index = StopSpatialIndex.build(stops_by_id.values())
+    with _stop_indexes_lock:
+        _stop_indexes[key] = (stops_by_id, index)
+        while len(_stop_indexes) > _STOP_INDEX_SLOTS:
+            _stop_indexes.popitem(last=False)
+    return index
+
+
 def candidate_stops(
-    stops_by_id: dict[str, Stop], *, point: GeoPoint, radius_m: float, max_count: int
+    stops_by_id: dict[str, Stop],
+    *,
+    point: GeoPoint,
+    radius_m: float,
+    max_count: int,
+    feed_version: str | None = None,
 ) -> list[Stop]:
-    scored: list[tuple[float, Stop]] = []
-    for stop in stops_by_id.values():
-        d = haversine_distance_m(point, stop.location)
-        if d <= radius_m:
-            scored.append((d, stop))
-
-    scored.sort(key=lambda x: x[0])
-    return [s for _, s in scored[:max_count]]
+    index = stop_index_for(stops_by_id, feed_version=feed_version)
+    return [s for _, s in index.within(point, radius_m, max_count=max_count)]
 
 
 def street_name_for_point(graph: Any, point: GeoPoint) -> str | None:
@@ -57,27 +107,28 @@ def street_name_for_point(graph: Any, point: GeoPoint) -> str | None:
             except TypeError:
                 data = graph.get_edge_data(u, v)
 
-        if not isinstance(data, dict):
-            return None
-
-        name = data.get("name")
-        if isinstance(name, (list, tuple)) and name:
-            name = name[0]
-        if isinstance(name, str):
-            name = name.strip()
-            return name or None
-        return None
+        return _edge_name(data)
     except Exception:
         return None
 
 
+def _edge_name(data: Any) -> str | None:
+    if not isinstance(data, dict):
+        return None
+
+    name = data.get("name")
+    if isinstance(name, (list, tuple)) and name:
+        name = name[0]
+    if isinstance(name, str):
+        name = name.strip()
+        return name or None
+    return None
+
+
 def polyline_distance_m(points: tuple[GeoPoint, ...]) -> float:
     if len(points) < 2:
         return 0.0
-    total = 0.0
-    for a, b in zip(points, points[1:]):
-        total += float(haversine_distance_m(a, b))
-    return float(total)
+    return float(consecutive_distances_m(*as_arrays(points)).sum())
 
 
 def slice_polyline_between_points(
@@ -92,15 +143,10 @@ def slice_polyline_between_points(
     if len(points) < 2:
         return (start, end)
 
+    lats, lons = as_arrays(points)
+
     def nearest_index(target: GeoPoint) -> int:
-        best_i = 0
-        best_d = float("inf")
-        for i, p in enumerate(points):
-            d = float(haversine_distance_m(p, target))
-            if d < best_d:
-                best_d = d
-                best_i = i
-        return best_i
+        return int(np.argmin(distances_from_m(target.lat, target.lon, lats, lons)))
 
     i0 = nearest_index(start)
     i1 = nearest_index(end)
@@ -161,39 +207,542 @@ def nearest_node(graph: Any, point: GeoPoint) -> Any:
     return best_node
 
 
-def walk_distance_m(graph: Any, a: GeoPoint, b: GeoPoint) -> float | None:
+def graph_version(graph: Any) -> str | None:
+    """Version tag set by map adapters on prebuilt graphs (None if unknown)."""
+
+    meta = getattr(graph, "graph", None)
+    if not isinstance(meta, dict):
+        return None
+    value = meta.get("graph_version")
+    return str(value) if value else None
+
+
+def nearest_nodes_many(graph: Any, points: list[GeoPoint]) -> list[Any]:
+    """Batch version of `nearest_node` (same metric), for preprocessing."""
+
+    if not points:
+        return []
+
+    try:
+        import osmnx as ox
+
+        return list(
+            ox.distance.nearest_nodes(
+                graph, X=[p.lon for p in points], Y=[p.lat for p in points]
+            )
+        )
+    except Exception:
+        pass
+
+    node_ids: list[Any] = []
+    coords: list[tuple[float, float]] = []
+    for node_id, data in iter_nodes(graph):
+        try:
+            coords.append((float(data["y"]), float(data["x"])))
+        except (KeyError, TypeError, ValueError):
+            continue
+        node_ids.append(node_id)
+
+    if not node_ids:
+        raise NoPathFound("Street graph contains no georeferenced nodes (missing x/y)")
+
+    node_xy = np.asarray(coords, dtype=np.float64)
+    query = np.asarray([(p.lat, p.lon) for p in points], dtype=np.float64)
+
+    out: list[Any] = []
+    # Chunk queries to bound the (chunk x nodes) distance matrix.
+    chunk = max(1, 2_000_000 // len(node_ids))
+    for i in range(0, len(query), chunk):
+        q = query[i : i + chunk]
+        d2 = ((q[:, None, :] - node_xy[None, :, :]) ** 2).sum(axis=2)
+        out.extend(node_ids[j] for j in d2.argmin(axis=1))
+    return out
+
+
+def _incident_edge_name(graph: Any, node: Any) -> str | None:
+    try:
+        edges = graph.edges(node, data=True)
+    except Exception:
+        return None
+    for edge in edges:
+        name = _edge_name(edge[-1])
+        if name:
+            return name
+    return None
+
+
+def build_stop_snap_table(
+    graph: Any,
+    stops_by_id: dict[str, Stop],
+    *,
+    feed_version: str,
+    graph_version: str,
+) -> StopSnapTable:
+    """Snap every stop to the street graph once (node, distance, street name)."""
+
+    stops = list(stops_by_id.values())
+    nodes = nearest_nodes_many(graph, [s.location for s in stops])
+
+    # Street names come from the nearest edge when OSMnx can index the graph;
+    # otherwise from a named edge incident to the snapped node.
+    edge_names: list[str | None] | None = None
+    try:
+        import osmnx as ox
+
+        edges = ox.distance.nearest_edges(
+            graph,
+            X=[s.location.lon for s in stops],
+            Y=[s.location.lat for s in stops],
+        )
+        edge_names = [_edge_name(graph.get_edge_data(u, v, k)) for u, v, k in edges]
+    except Exception:
+        edge_names = None
+
+    snaps: dict[str, StopSnap] = {}
+    for i, (stop, node) in enumerate(zip(stops, nodes)):
+        data = graph.nodes[node]
+        try:
+            node_point = GeoPoint(lat=float(data["y"]), lon=float(data["x"]))
+            dist_m = float(haversine_distance_m(stop.location, node_point))
+        except (KeyError, TypeError, ValueError):
+            dist_m = float("nan")
+
+        name = edge_names[i] if edge_names is not None else None
+        if name is None:
+            name = _incident_edge_name(graph, node)
+
+        snaps[stop.id] = StopSnap(
+            stop_id=stop.id, node=node, distance_m=dist_m, street_name=name
+        )
+
+    return StopSnapTable(
+        feed_version=feed_version,
+        graph_version=graph_version,
+        snaps_by_stop_id=snaps,
+    )
+
+
+def _edge_length_m(data: Any, *, multigraph: bool) -> float:
+    # Same semantics as networkx weight="length": missing -> 1, parallel -> min.
+    if multigraph:
+        if len(data) == 1:
+            (only,) = data.values()
+            return float(only.get("length", 1))
+        return min(float(d.get("length", 1)) for d in data.values())
+    return float(data.get("length", 1))
+
+
+@dataclass(frozen=True, slots=True)
+class WalkTree:
+    """Shortest-path tree of one bounded walking search.
+
+    A forward tree holds distances from `source`; a reverse tree holds
+    distances *to* `source` (e.g. from every candidate stop to a destination).
+    """
+
+    source: Any
+    dist_m: dict[Any, float]
+    pred: dict[Any, Any]
+    reverse: bool = False
+
+    def distance_m(self, node: Any) -> float | None:
+        d = self.dist_m.get(node)
+        return None if d is None else float(d)
+
+    def path_nodes(self, node: Any) -> list[Any] | None:
+        """Node sequence in walking direction, or None if `node` was not settled."""
+
+        if node not in self.dist_m:
+            return None
+        out = [node]
+        cur = node
+        while cur != self.source:
+            cur = self.pred[cur]
+            out.append(cur)
+        if not self.reverse:
+            out.reverse()
+        return out
+
+
+def walk_search(
+    graph: Any,
+    source: Any,
+    *,
+    targets: Iterable[Any] = (),
+    cutoff_m: float | None = None,
+    reverse: bool = False,
+    heuristic: Callable[[Any], float] | None = None,
+) -> WalkTree:
+    """Single-source Dijkstra over edge 'length', keeping the predecessor tree.
+
+    Stops as soon as every reachable node in `targets` is settled (or when
+    `cutoff_m` is exceeded), so one search serves all access/egress stops.
+    With `reverse=True` edges are followed backwards (one-to-many *to* source).
+
+    `heuristic` turns the search into A*: it must be an admissible, consistent
+    lower bound on the remaining distance to the (single) target.
+    """
+
+    if reverse and graph.is_directed():
+        adj = graph.pred
+    else:
+        adj = graph.adj
+    multigraph = graph.is_multigraph()
+
+    wanted = set(targets)
+    remaining = {t for t in wanted if t in adj}
+    bounded = bool(wanted)
+
+    dist: dict[Any, float] = {}
+    pred: dict[Any, Any] = {}
+    best: dict[Any, float] = {source: 0.0}
+    counter = itertools.count()
+    h0 = heuristic(source) if heuristic is not None else 0.0
+    # (priority, tie-breaker, distance, node)
+    heap: list[tuple[float, int, float, Any]] = [(h0, next(counter), 0.0, source)]
+    if bounded and not remaining:
+        heap.clear()
+
+    while heap:
+        _, _, d, u = heapq.heappop(heap)
+        if u in dist:
+            continue
+        dist[u] = d
+        if bounded:
+            remaining.discard(u)
+            if not remaining:
+                break
+
+        for v, data in adj[u].items():
+            if v in dist:
+                continue
+            nd = d + _edge_length_m(data, multigraph=multigraph)
+            if cutoff_m is not None and nd > cutoff_m:
+                continue
+            if nd < best.get(v, float("inf")):
+                best[v] = nd
+                pred[v] = u
+                prio = nd + heuristic(v) if heuristic is not None else nd
+                heapq.heappush(heap, (prio, next(counter), nd, v))
+
+    return WalkTree(
+        source=source,
+        dist_m=dist,
+        pred={n: pred[n] for n in dist if n in pred},
+        reverse=reverse,
+    )
+
+
+def haversine_heuristic(graph: Any, target: Any) -> Callable[[Any], float]:
+    """Straight-line lower bound to `target` (edge lengths are geodesic)."""
+
+    t = graph.nodes[target]
+    t_lat = float(t["y"])
+    t_lon = float(t["x"])
+    nodes = graph.nodes
+
+    def h(node: Any) -> float:
+        data = nodes[node]
+        try:
+            return haversine_m(float(data["y"]), float(data["x"]), t_lat, t_lon)
+        except (KeyError, TypeError, ValueError):
+            return 0.0
+
+    return h
+
+
+def alt_heuristic(
+    graph: Any, target: Any, landmarks: LandmarkTable
+) -> Callable[[Any], float]:
+    """ALT lower bound, tightened with the straight-line bound."""
+
+    straight = haversine_heuristic(graph, target)
+
+    def h(node: Any) -> float:
+        return max(landmarks.lower_bound_m(node, target), straight(node))
+
+    return h
+
+
+def shortest_walk(
+    graph: Any,
+    source: Any,
+    target: Any,
+    *,
+    method: WalkMethod = "astar",
+    landmarks: LandmarkTable | None = None,
+) -> WalkTree:
+    """Point-to-point walking search with the requested method.
+
+    "alt" silently degrades to "astar" when no landmark table is given.
+    "networkx" is not a tree-producing method; use walk_distance_m for it.
+    """
+
+    heuristic: Callable[[Any], float] | None = None
+    if method == "alt" and landmarks is not None:
+        heuristic = alt_heuristic(graph, target, landmarks)
+    elif method in {"astar", "alt"}:
+        heuristic = haversine_heuristic(graph, target)
+    return walk_search(graph, source, targets=(target,), heuristic=heuristic)
+
+
+def build_landmark_table(
+    graph: Any, *, graph_version: str, count: int = 8
+) -> LandmarkTable:
+    """Pick `count` landmarks by farthest-point selection and tabulate distances.
+
+    Intended for offline/one-off preprocessing: runs one full Dijkstra per
+    landmark (two on directed graphs).
+    """
+
+    node_ids = list(graph.nodes)
+    if not node_ids:
+        raise NoPathFound("Street graph is empty")
+    index_by_node = {n: i for i, n in enumerate(node_ids)}
+    inf = float("inf")
+
+    # Start from the node farthest from an arbitrary seed (periphery).
+    seed_tree = walk_search(graph, node_ids[0])
+    current = max(seed_tree.dist_m, key=seed_tree.dist_m.__getitem__)
+
+    landmarks: list[Any] = []
+    from_rows: list[dict[Any, float]] = []
+    to_rows: list[dict[Any, float]] = []
+    min_dist: dict[Any, float] = {}
+    while len(landmarks) < min(count, len(node_ids)):
+        landmarks.append(current)
+        fwd = walk_search(graph, current).dist_m
+        bwd = (
+            walk_search(graph, current, reverse=True).dist_m
+            if graph.is_directed()
+            else fwd
+        )
+        from_rows.append(fwd)
+        to_rows.append(bwd)
+
+        for n, d in fwd.items():
+            if d < min_dist.get(n, inf):
+                min_dist[n] = d
+        candidates = [n for n in min_dist if n not in landmarks]
+        if not candidates:
+            break
+        current = max(candidates, key=min_dist.__getitem__)
+
+    k = len(landmarks)
+    from_m = array("d", [inf]) * (len(node_ids) * k)
+    to_m = array("d", [inf]) * (len(node_ids) * k)
+    for j in range(k):
+        for n, d in from_rows[j].items():
+            from_m[index_by_node[n] * k + j] = d
+        for n, d in to_rows[j].items():
+            to_m[index_by_node[n] * k + j] = d
+
+    return LandmarkTable(
+        graph_version=graph_version,
+        landmarks=tuple(landmarks),
+        index_by_node=index_by_node,
+        from_landmark_m=from_m,
+        to_landmark_m=to_m,
+    )
+
+
+# Per-graph memo of edge geometries as interleaved (lat, lon) arrays, filled
+# lazily; weak keys so evicted graphs release their coordinates too. None
+# marks edges without stored geometry (a straight segment is exact).
+_edge_coords_by_graph: weakref.WeakKeyDictionary[
+    Any, dict[tuple[Any, Any], array | None]
+] = weakref.WeakKeyDictionary()
+
+
+def _node_lat_lon(graph: Any, node: Any) -> tuple[float, float] | None:
+    data = graph.nodes[node]
+    try:
+        return float(data["y"]), float(data["x"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _edge_coords(graph: Any, u: Any, v: Any) -> array | None:
+    """Interior + end points of the u->v edge geometry (lat, lon interleaved).
+
+    Uses the shortest parallel edge (as the searches do); None when the edge
+    has no stored geometry and a straight segment between nodes is exact.
+    """
+
+    try:
+        memo = _edge_coords_by_graph.setdefault(graph, {})
+    except TypeError:
+        memo = {}
+    key = (u, v)
+    if key in memo:
+        return memo[key]
+
+    data = graph.get_edge_data(u, v)
+    if data is not None and graph.is_multigraph():
+        data = min(data.values(), key=lambda d: float(d.get("length", 1)))
+    geom = data.get("geometry") if data else None
+    coords: array | None = None
+    if geom is not None:
+        xy = list(geom.coords)
+        start = _node_lat_lon(graph, u)
+        if start is not None and len(xy) >= 2:
+            # Stored geometries may run v->u on undirected graphs.
+            lat0, lon0 = start
+            d_first = (xy[0][1] - lat0) ** 2 + (xy[0][0] - lon0) ** 2
+            d_last = (xy[-1][1] - lat0) ** 2 + (xy[-1][0] - lon0) ** 2
+            if d_last < d_first:
+                xy.reverse()
+        coords = array("d")
+        for x, y in xy[1:]:
+            coords.append(float(y))
+            coords.append(float(x))
+    memo[key] = coords
+    return coords
+
+
+def path_coords_for_nodes(graph: Any, path_nodes: Sequence[Any]) -> array:
+    """Walking polyline along edge geometries, as interleaved (lat, lon)."""
+
+    coords = array("d")
+    prev: Any = None
+    for i, node in enumerate(path_nodes):
+        if i > 0:
+            geom = _edge_coords(graph, prev, node)
+            if geom:
+                coords.extend(geom)
+                prev = node
+                continue
+        point = _node_lat_lon(graph, node)
+        if point is not None:
+            coords.append(point[0])
+            coords.append(point[1])
+        prev = node
+    return coords
+
+
+def path_points_for_nodes(graph: Any, path_nodes: Sequence[Any]) -> list[GeoPoint]:
+    c = path_coords_for_nodes(graph, path_nodes)
+    return [GeoPoint(lat=c[i], lon=c[i + 1]) for i in range(0, len(c), 2)]
+
+
+def _walk_result(
+    graph: Any, distance_m: float, path_nodes: Sequence[Any], simplify_m: float | None
+) -> WalkResult:
+    coords = path_coords_for_nodes(graph, path_nodes)
+    if simplify_m and len(coords) > 4:
+        flat = np.frombuffer(coords, dtype=np.float64)
+        keep = simplify_mask(flat[0::2], flat[1::2], simplify_m)
+        coords = array("d")
+        coords.frombytes(flat.reshape(-1, 2)[keep].tobytes())
+    return WalkResult(distance_m=float(distance_m), coords=coords)
+
+
+def walk_result_from_tree(
+    graph: Any, tree: WalkTree, node: Any, *, simplify_m: float | None = None
+) -> WalkResult | None:
+    """Distance + geometry of a path settled in `tree`, or None if unreached."""
+
+    dist = tree.distance_m(node)
+    path_nodes = tree.path_nodes(node)
+    if dist is None or path_nodes is None:
+        return None
+    return _walk_result(graph, dist, path_nodes, simplify_m)
+
+
+def walk_leg(
+    graph: Any,
+    a_node: Any,
+    b_node: Any,
+    *,
+    method: WalkMethod = "networkx",
+    landmarks: LandmarkTable | None = None,
+    cache: WalkCache | None = None,
+    simplify_m: float | None = None,
+) -> WalkResult | None:
+    """Distance and geometry of one node-to-node walk (one search, cached).
+
+    Geometry follows the stored edge geometries; `simplify_m` applies a
+    Douglas-Peucker tolerance (meters) before the result is cached.
+    """
+
+    version = graph_version(graph) if cache is not None else None
+    if cache is not None:
+        hit = cache.get(version, a_node, b_node)
+        if hit is not None:
+            return hit
+
+    if method == "networkx":
+        length, path_nodes = nx.single_source_dijkstra(
+            graph, a_node, b_node, weight="length"
+        )
+        result = _walk_result(graph, length, path_nodes, simplify_m)
+    else:
+        tree = shortest_walk(graph, a_node, b_node, method=method, landmarks=landmarks)
+        found = walk_result_from_tree(graph, tree, b_node, simplify_m=simplify_m)
+        if found is None:
+            return None
+        result = found
+
+    if cache is not None:
+        cache.put(version, a_node, b_node, result)
+    return result
+
+
+def walk_distance_m(
+    graph: Any,
+    a: GeoPoint,
+    b: GeoPoint,
+    *,
+    method: WalkMethod = "networkx",
+    landmarks: LandmarkTable | None = None,
+    cache: WalkCache | None = None,
+    simplify_m: float | None = None,
+) -> float | None:
     try:
         a_node = nearest_node(graph, a)
         b_node = nearest_node(graph, b)
-        length = nx.shortest_path_length(graph, a_node, b_node, weight="length")
-        return float(length)
+        result = walk_leg(
+            graph,
+            a_node,
+            b_node,
+            method=method,
+            landmarks=landmarks,
+            cache=cache,
+            simplify_m=simplify_m,
+        )
+        return result.distance_m if result is not None else None
     except Exception:
         return None
 
 
-def walk_path_points(graph: Any, a: GeoPoint, b: GeoPoint) -> tuple[GeoPoint, ...]:
+def walk_path_points(
+    graph: Any,
+    a: GeoPoint,
+    b: GeoPoint,
+    *,
+    method: WalkMethod = "networkx",
+    landmarks: LandmarkTable | None = None,
+    cache: WalkCache | None = None,
+    simplify_m: float | None = None,
+) -> tuple[GeoPoint, ...]:
     """Return a polyline of the walking route as GeoPoints."""
 
     try:
         a_node = nearest_node(graph, a)
         b_node = nearest_node(graph, b)
-        path_nodes = nx.shortest_path(graph, a_node, b_node, weight="length")
-        pts: list[GeoPoint] = []
-        for node_id in path_nodes:
-            data = dict(graph.nodes[node_id])
-            x = data.get("x")
-            y = data.get("y")
-            if x is None or y is None:
-                continue
-            try:
-                lon = float(x)
-                lat = float(y)
-            except (TypeError, ValueError):
-                continue
-            pts.append(GeoPoint(lat=lat, lon=lon))
-
-        if len(pts) >= 2:
-            return tuple(pts)
+        result = walk_leg(
+            graph,
+            a_node,
+            b_node,
+            method=method,
+            landmarks=landmarks,
+            cache=cache,
+            simplify_m=simplify_m,
+        )
+        if result is not None:
+            pts = result.points()
+            if len(pts) >= 2:
+                return pts
     except Exception:
         pass
 
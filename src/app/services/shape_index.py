@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from src.app.services.feed_cache import FeedScopedCache
+from src.domain.algorithms.shape_projection import build_shape_index
+from src.domain.models.gtfs import GtfsFeed, ShapeIndex
+
+
+def _build(feed: GtfsFeed) -> ShapeIndex:
+    return build_shape_index(
+        trips_by_id=feed.trips_by_id,
+        shapes_by_id=feed.shapes_by_id,
+        stops_by_id=feed.stops_by_id,
+        stop_ids_by_trip=feed.stop_ids_by_trip,
+        shape_dist_by_shape=feed.shape_dist_by_shape,
+        stop_dist_by_trip=feed.stop_dist_by_trip,
+    )
+
+
+_indexes: FeedScopedCache[ShapeIndex] = FeedScopedCache(_build, slots=2)
+
+
+def shape_index_for(feed: GtfsFeed) -> ShapeIndex:
+    """Stop positions along shapes, built once per feed version."""
+
+    return _indexes.get(feed)
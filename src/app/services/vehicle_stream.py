@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Awaitable, Callable
+
+from src.domain.models.realtime import RealtimeVehicle, RealtimeVehicleChanges
+
+logger = logging.getLogger(__name__)
+
+ChangesSource = Callable[[int | None], Awaitable[RealtimeVehicleChanges]]
+
+
+def _vehicle_json(key: str, v: RealtimeVehicle) -> str:
+    """Compact wire form of a vehicle (serialized once per change)."""
+
+    data: dict[str, object] = {
+        "k": key,
+        "r": v.route_id,
+        "lat": round(v.lat, 6),
+        "lon": round(v.lon, 6),
+    }
+    if v.vehicle_id:
+        data["v"] = v.vehicle_id
+    if v.trip_id:
+        data["t"] = v.trip_id
+    if v.bearing is not None:
+        data["b"] = round(v.bearing, 1)
+    if v.speed_mps is not None:
+        data["s"] = round(v.speed_mps, 2)
+    if v.timestamp is not None:
+        data["ts"] = int(v.timestamp.timestamp())
+    if v.stop_id:
+        data["stop"] = v.stop_id
+    return json.dumps(data, separators=(",", ":"))
+
+
+@dataclass(frozen=True, slots=True)
+class _Change:
+    key: str
+    old_route: str | None
+    new_route: str | None
+    # None means the vehicle left the feed.
+    payload: str | None
+
+
+@dataclass(slots=True)
+class _Delta:
+    version: int
+    changes: tuple[_Change, ...]
+    _unfiltered: str | None = None
+
+    def frame(self, route_ids: frozenset[str] | None) -> str | None:
+        if route_ids is None and self._unfiltered is not None:
+            return self._unfiltered
+        upserted: list[str] = []
+        removed: list[str] = []
+        for c in self.changes:
+            if c.payload is not None and (
+                route_ids is None or c.new_route in route_ids
+            ):
+                upserted.append(c.payload)
+            elif route_ids is None or c.old_route in route_ids:
+                removed.append(json.dumps(c.key))
+        if not upserted and not removed:
+            return None
+        frame = _sse(
+            "delta",
+            f'{{"version":{self.version},"upserted":[{",".join(upserted)}],'
+            f'"removed":[{",".join(removed)}]}}',
+        )
+        if route_ids is None:
+            self._unfiltered = frame
+        return frame
+
+
+def _sse(event: str, data: str) -> str:
+    return f"event: {event}\ndata: {data}\n\n"
+
+
+@dataclass(eq=False, slots=True)
+class _Subscriber:
+    route_ids: frozenset[str] | None
+    queue: asyncio.Queue
+    resync: bool = False
+    # Version included in the last snapshot sent; older deltas are skipped.
+    version: int = 0
+
+
+@dataclass(slots=True)
+class VehicleStreamHub:
+    """Single producer behind every vehicle stream of the process.
+
+    One task polls `source` every `interval_s` (only while somebody listens),
+    keeps the current vehicles pre-serialized and fans out compact deltas.
+    Each subscriber gets a full snapshot on connect and then only the changes
+    for its route_ids. Slow subscribers are resynced with a new snapshot
+    instead of buffering without bound.
+    """
+
+    source: ChangesSource
+    interval_s: float = 5.0
+    keepalive_s: float = 15.0
+    queue_size: int = 8
+
+    version: int = field(default=0, init=False)
+    _vehicles: dict[str, tuple[str | None, str]] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    _since: int | None = field(default=None, init=False, repr=False)
+    _subscribers: set[_Subscriber] = field(default_factory=set, init=False, repr=False)
+    _task: asyncio.Task | None = field(default=None, init=False, repr=False)
+    _ready: asyncio.Event | None = field(default=None, init=False, repr=False)
+
+    def _merge(self, changes: RealtimeVehicleChanges) -> list[_Change]:
+        out: list[_Change] = []
+        seen: set[str] = set()
+        for v in changes.upserted:
+            key = v.key
+            if key is None or key in seen:
+                continue
+            seen.add(key)
+            payload = _vehicle_json(key, v)
+            old = self._vehicles.get(key)
+            if old is not None and old[1] == payload:
+                continue
+            self._vehicles[key] = (v.route_id, payload)
+            out.append(_Change(key, old[0] if old else None, v.route_id, payload))
+
+        gone = (
+            [k for k in self._vehicles if k not in seen]
+            if changes.full
+            else [k for k in changes.removed if k in self._vehicles]
+        )
+        for key in gone:
+            route_id, _ = self._vehicles.pop(key)
+            out.append(_Change(key, route_id, None, None))
+        return out
+
+    async def poll_once(self) -> None:
+        changes = await self.source(self._since)
+        self._since = changes.feed_timestamp
+        merged = self._merge(changes)
+        if self._ready is not None:
+            self._ready.set()
+        if not merged:
+            return
+        self.version += 1
+        delta = _Delta(self.version, tuple(merged))
+        for sub in list(self._subscribers):
+            if sub.resync:
+                continue
+            try:
+                sub.queue.put_nowait(delta)
+            except asyncio.QueueFull:
+                sub.resync = True
+
+    async def _run(self) -> None:
+        while self._subscribers:
+            try:
+                await self.poll_once()
+            except Exception:
+                logger.warning("Vehicle stream poll failed", exc_info=True)
+            await asyncio.sleep(self.interval_s)
+
+    def _snapshot_frame(self, route_ids: frozenset[str] | None) -> str:
+        payloads = [
+            payload
+            for route_id, payload in self._vehicles.values()
+            if route_ids is None or route_id in route_ids
+        ]
+        return _sse(
+            "snapshot",
+            f'{{"version":{self.version},"vehicles":[{",".join(payloads)}]}}',
+        )
+
+    def _ensure_running(self) -> None:
+        if self._task is None or self._task.done():
+            self._ready = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stream(self, route_ids: set[str] | None = None) -> AsyncIterator[str]:
+        """Server-Sent Events frames for one client."""
+
+        sub = _Subscriber(
+            route_ids=frozenset(route_ids) if route_ids else None,
+            queue=asyncio.Queue(maxsize=self.queue_size),
+        )
+        self._subscribers.add(sub)
+        self._ensure_running()
+        try:
+            if self._ready is not None and not self._ready.is_set():
+                try:
+                    await asyncio.wait_for(self._ready.wait(), self.keepalive_s)
+                except asyncio.TimeoutError:
+                    pass
+            sub.version = self.version
+            yield self._snapshot_frame(sub.route_ids)
+            while True:
+                if sub.resync:
+                    while not sub.queue.empty():
+                        sub.queue.get_nowait()
+                    sub.resync = False
+                    sub.version = self.version
+                    yield self._snapshot_frame(sub.route_ids)
+                try:
+                    delta = await asyncio.wait_for(sub.queue.get(), self.keepalive_s)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if delta.version <= sub.version:
+                    continue
+                frame = delta.frame(sub.route_ids)
+                if frame is not None:
+                    yield frame
+        finally:
+            self._subscribers.discard(sub)
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+    async def aclose(self) -> None:
+        self._subscribers.clear()
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
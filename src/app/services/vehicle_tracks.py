@@ -0,0 +1,273 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from dataclasses import dataclass, field, replace
+from typing import Iterable
+
+import numpy as np
+
+from src.domain.algorithms.geodesic import haversine_pairwise_m, initial_bearing_deg
+from src.domain.models.realtime import RealtimeVehicle, VehicleTrail
+
+# Below this displacement the bearing is noise (GPS jitter at a stop).
+_MIN_BEARING_MOVE_M = 5.0
+
+
+@dataclass(slots=True)
+class VehicleTrackStore:
+    """Recent (timestamp, lat, lon) samples per vehicle in fixed NumPy rings.
+
+    Storage is three (max_vehicles, samples) float64 arrays plus per-slot
+    head/count, allocated once; no per-sample objects are kept. When every
+    slot is taken the vehicle seen least recently is evicted.
+    """
+
+    max_vehicles: int = 4096
+    samples: int = 32
+    # Samples further apart than this are too stale to estimate motion from.
+    max_gap_s: float = 300.0
+
+    _ts: np.ndarray = field(init=False, repr=False)
+    _lat: np.ndarray = field(init=False, repr=False)
+    _lon: np.ndarray = field(init=False, repr=False)
+    _head: np.ndarray = field(init=False, repr=False)
+    _count: np.ndarray = field(init=False, repr=False)
+    _seen: np.ndarray = field(init=False, repr=False)
+    _slots: dict[str, int] = field(default_factory=dict, init=False, repr=False)
+    _keys: list[str | None] = field(default_factory=list, init=False, repr=False)
+    _routes: list[str | None] = field(default_factory=list, init=False, repr=False)
+    _free: list[int] = field(default_factory=list, init=False, repr=False)
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False
+    )
+    _observed: (
+        tuple[tuple[RealtimeVehicle, ...], tuple[RealtimeVehicle, ...]] | None
+    ) = field(default=None, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        shape = (max(1, self.max_vehicles), max(2, self.samples))
+        self.max_vehicles, self.samples = shape
+        self._ts = np.zeros(shape, dtype=np.float64)
+        self._lat = np.zeros(shape, dtype=np.float64)
+        self._lon = np.zeros(shape, dtype=np.float64)
+        self._head = np.zeros(shape[0], dtype=np.int32)
+        self._count = np.zeros(shape[0], dtype=np.int32)
+        self._seen = np.full(shape[0], -np.inf)
+        self._keys = [None] * shape[0]
+        self._routes = [None] * shape[0]
+        self._free = list(range(shape[0] - 1, -1, -1))
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def _slot(self, key: str) -> int:
+        slot = self._slots.get(key)
+        if slot is not None:
+            return slot
+        if self._free:
+            slot = self._free.pop()
+        else:
+            slot = int(np.argmin(self._seen))
+            del self._slots[self._keys[slot]]  # type: ignore[arg-type]
+        self._slots[key] = slot
+        self._keys[slot] = key
+        self._head[slot] = 0
+        self._count[slot] = 0
+        return slot
+
+    def record(
+        self, vehicles: Iterable[RealtimeVehicle], *, now_s: float | None = None
+    ) -> int:
+        """Append one sample per vehicle if it is newer; returns samples added.
+
+        Vehicles without a timestamp are stamped `now_s` and only recorded
+        when they moved, so re-reading the same snapshot adds nothing.
+        """
+
+        now_s = time.time() if now_s is None else float(now_s)
+        slots: list[int] = []
+        ts: list[float] = []
+        lats: list[float] = []
+        lons: list[float] = []
+        stamped: list[bool] = []
+        with self._lock:
+            batch: set[str] = set()
+            for v in vehicles:
+                key = v.key
+                if key is None or key in batch:
+                    continue
+                if len(batch) >= self.max_vehicles:
+                    break
+                batch.add(key)
+                slot = self._slot(key)
+                # Pin slots of this batch so later allocations cannot evict them.
+                self._seen[slot] = np.inf
+                self._routes[slot] = v.route_id
+                slots.append(slot)
+                ts.append(v.timestamp.timestamp() if v.timestamp else now_s)
+                lats.append(v.lat)
+                lons.append(v.lon)
+                stamped.append(v.timestamp is not None)
+            if not slots:
+                return 0
+
+            s = np.asarray(slots, dtype=np.intp)
+            t = np.asarray(ts)
+            la = np.asarray(lats)
+            lo = np.asarray(lons)
+            last = (self._head[s] - 1) % self.samples
+            empty = self._count[s] == 0
+            moved = (self._lat[s, last] != la) | (self._lon[s, last] != lo)
+            fresh = empty | ((t > self._ts[s, last]) & (np.asarray(stamped) | moved))
+
+            w = s[fresh]
+            heads = self._head[w]
+            self._ts[w, heads] = t[fresh]
+            self._lat[w, heads] = la[fresh]
+            self._lon[w, heads] = lo[fresh]
+            self._head[w] = (heads + 1) % self.samples
+            self._count[w] = np.minimum(self._count[w] + 1, self.samples)
+            self._seen[s] = self._ts[s, (self._head[s] - 1) % self.samples]
+            return int(fresh.sum())
+
+    def motion(
+        self, keys: Iterable[str | None]
+    ) -> list[tuple[float | None, float | None]]:
+        """(speed_mps, bearing_deg) from the last two samples of each key."""
+
+        keys = list(keys)
+        out: list[tuple[float | None, float | None]] = [(None, None)] * len(keys)
+        with self._lock:
+            idx = [
+                (i, self._slots[k])
+                for i, k in enumerate(keys)
+                if k is not None and k in self._slots
+            ]
+            idx = [(i, slot) for i, slot in idx if self._count[slot] >= 2]
+            if not idx:
+                return out
+            pos = np.fromiter((i for i, _ in idx), dtype=np.intp, count=len(idx))
+            s = np.fromiter((slot for _, slot in idx), dtype=np.intp, count=len(idx))
+            b = (self._head[s] - 1) % self.samples
+            a = (self._head[s] - 2) % self.samples
+            dt = self._ts[s, b] - self._ts[s, a]
+            dist = haversine_pairwise_m(
+                self._lat[s, a], self._lon[s, a], self._lat[s, b], self._lon[s, b]
+            )
+            bearing = initial_bearing_deg(
+                self._lat[s, a], self._lon[s, a], self._lat[s, b], self._lon[s, b]
+            )
+
+        ok = (dt > 0) & (dt <= self.max_gap_s)
+        for i, good, d, t, brg in zip(
+            pos.tolist(), ok.tolist(), dist.tolist(), dt.tolist(), bearing.tolist()
+        ):
+            if good:
+                out[i] = (d / t, brg if d >= _MIN_BEARING_MOVE_M else None)
+        return out
+
+    def observe(
+        self, vehicles: tuple[RealtimeVehicle, ...]
+    ) -> tuple[RealtimeVehicle, ...]:
+        """Record a snapshot and fill in missing speed/bearing from the tracks.
+
+        Memoized on the identity of the last tuple, so repeated reads of an
+        unchanged snapshot cost nothing (and keep returning the same tuple).
+        """
+
+        cached = self._observed
+        if cached is not None and cached[0] is vehicles:
+            return cached[1]
+
+        enriched = self.observe_changes(vehicles)
+        self._observed = (vehicles, enriched)
+        return enriched
+
+    def observe_changes(
+        self, vehicles: tuple[RealtimeVehicle, ...]
+    ) -> tuple[RealtimeVehicle, ...]:
+        """Like `observe` for a delta of changed vehicles, without the memo.
+
+        Stream polls feed deltas through here so they do not evict the memo
+        of the full snapshot that `observe` serves.
+        """
+
+        self.record(vehicles)
+        missing = [
+            i
+            for i, v in enumerate(vehicles)
+            if v.speed_mps is None or v.bearing is None
+        ]
+        enriched = vehicles
+        if missing:
+            estimates = self.motion(vehicles[i].key for i in missing)
+            out = list(vehicles)
+            for i, (speed, bearing) in zip(missing, estimates):
+                v = out[i]
+                if (v.speed_mps is None and speed is not None) or (
+                    v.bearing is None and bearing is not None
+                ):
+                    out[i] = replace(
+                        v,
+                        speed_mps=v.speed_mps if v.speed_mps is not None else speed,
+                        bearing=v.bearing if v.bearing is not None else bearing,
+                    )
+            enriched = tuple(out)
+        return enriched
+
+    def trails(
+        self,
+        *,
+        route_ids: set[str] | None = None,
+        max_age_s: float | None = None,
+        now_s: float | None = None,
+    ) -> list[VehicleTrail]:
+        now_s = time.time() if now_s is None else float(now_s)
+        cutoff = -np.inf if max_age_s is None else now_s - max_age_s
+        out: list[VehicleTrail] = []
+        with self._lock:
+            for key, slot in self._slots.items():
+                if route_ids and self._routes[slot] not in route_ids:
+                    continue
+                n = int(self._count[slot])
+                order = (self._head[slot] - n + np.arange(n)) % self.samples
+                ts = self._ts[slot, order]
+                keep = ts >= cutoff
+                if not keep.any():
+                    continue
+                out.append(
+                    VehicleTrail(
+                        key=key,
+                        route_id=self._routes[slot],
+                        timestamps=tuple(ts[keep].tolist()),
+                        lats=tuple(self._lat[slot, order][keep].tolist()),
+                        lons=tuple(self._lon[slot, order][keep].tolist()),
+                    )
+                )
+        return out
+
+
+_shared: VehicleTrackStore | None = None
+_shared_lock = threading.Lock()
+
+
+def shared_vehicle_tracks() -> VehicleTrackStore:
+    """Process-wide track store.
+
+    Env vars:
+      - VEHICLE_TRACK_SAMPLES: samples kept per vehicle (default 32)
+      - VEHICLE_TRACK_MAX_VEHICLES: vehicles tracked at once (default 4096)
+    """
+
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            samples = (os.getenv("VEHICLE_TRACK_SAMPLES") or "").strip()
+            vehicles = (os.getenv("VEHICLE_TRACK_MAX_VEHICLES") or "").strip()
+            _shared = VehicleTrackStore(
+                max_vehicles=int(vehicles) if vehicles else 4096,
+                samples=int(samples) if samples else 32,
+            )
+        return _shared
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import os
+import threading
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any
+
+from src.domain.models import GeoPoint
+
+# Rough per-entry overhead (key tuple, OrderedDict node, result object).
+_ENTRY_OVERHEAD_BYTES = 256
+
+
+@dataclass(frozen=True, slots=True)
+class WalkResult:
+    """Walking distance plus compact node-path geometry (lat, lon interleaved)."""
+
+    distance_m: float
+    coords: array = field(default_factory=lambda: array("d"))
+
+    @classmethod
+    def from_points(cls, distance_m: float, points: list[GeoPoint]) -> WalkResult:
+        coords = array("d")
+        for p in points:
+            coords.append(p.lat)
+            coords.append(p.lon)
+        return cls(distance_m=float(distance_m), coords=coords)
+
+    def points(self) -> tuple[GeoPoint, ...]:
+        c = self.coords
+        return tuple(GeoPoint(lat=c[i], lon=c[i + 1]) for i in range(0, len(c), 2))
+
+    def size_bytes(self) -> int:
+        return _ENTRY_OVERHEAD_BYTES + self.coords.itemsize * len(self.coords)
+
+
+@dataclass(slots=True)
+class WalkCache:
+    """Memory-bounded LRU of walking results keyed by snapped node pairs.
+
+    Keys are (graph_version, source_node, target_node); graphs without a
+    version are never cached. Thread-safe (the sync API runs in a threadpool).
+    """
+
+    max_bytes: int = 32 * 1024 * 1024
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    _bytes: int = 0
+    _entries: OrderedDict[tuple[str, Any, Any], WalkResult] = field(
+        default_factory=OrderedDict, init=False, repr=False
+    )
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False
+    )
+
+    def get(
+        self, graph_version: str | None, source: Any, target: Any
+    ) -> WalkResult | None:
+        if not graph_version:
+            return None
+        key = (graph_version, source, target)
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(
+        self, graph_version: str | None, source: Any, target: Any, result: WalkResult
+    ) -> None:
+        if not graph_version:
+            return
+        size = result.size_bytes()
+        if size > self.max_bytes:
+            return
+        key = (graph_version, source, target)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.size_bytes()
+            self._entries[key] = result
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size_bytes()
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict[str, float | int]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            }
+
+
+_shared: WalkCache | None = None
+_shared_lock = threading.Lock()
+
+
+def shared_walk_cache() -> WalkCache:
+    """Process-wide walk cache shared by the API, the worker and fallbacks.
+
+    Env vars:
+      - WALK_CACHE_MAX_MB: memory budget in MiB (default 32; 0 disables)
+    """
+
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            raw = (os.getenv("WALK_CACHE_MAX_MB") or "").strip()
+            max_mb = float(raw) if raw else 32.0
+            _shared = WalkCache(max_bytes=int(max_mb * 1024 * 1024))
+        return _shared
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from typing import Callable, Generic, Iterable, TypeVar
+
+from src.domain.models.geo import BoundingBox
+
+T = TypeVar("T")
+
+
+@dataclass(slots=True)
+class BBoxGrid(Generic[T]):
+    """Uniform lat/lon grid answering viewport (bounding box) queries.
+
+    Cells fully inside the box are taken wholesale; only items in the border
+    cells are tested. Results keep build order within each cell.
+    """
+
+    cell_deg: float = 0.01
+    _cells: dict[tuple[int, int], list[tuple[float, float, T]]] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    _size: int = field(default=0, init=False, repr=False)
+
+    @classmethod
+    def build(
+        cls,
+        items: Iterable[T],
+        *,
+        lat_lon: Callable[[T], tuple[float, float]],
+        cell_deg: float = 0.01,
+    ) -> BBoxGrid[T]:
+        grid: BBoxGrid[T] = cls(cell_deg=float(cell_deg))
+        for item in items:
+            lat, lon = lat_lon(item)
+            grid._cells.setdefault(grid._cell(lat, lon), []).append((lat, lon, item))
+            grid._size += 1
+        return grid
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _cell(self, lat: float, lon: float) -> tuple[int, int]:
+        return math.floor(lat / self.cell_deg), math.floor(lon / self.cell_deg)
+
+    def query(self, bbox: BoundingBox, *, limit: int | None = None) -> list[T]:
+        y0, x0 = self._cell(bbox.min_lat, bbox.min_lon)
+        y1, x1 = self._cell(bbox.max_lat, bbox.max_lon)
+
+        span = (y1 - y0 + 1) * (x1 - x0 + 1)
+        if span <= len(self._cells):
+            cells = [
+                (cy, cx)
+                for cy in range(y0, y1 + 1)
+                for cx in range(x0, x1 + 1)
+                if (cy, cx) in self._cells
+            ]
+        else:
+            # Zoomed out: cheaper to scan the occupied cells.
+            cells = [
+                (cy, cx) for cy, cx in self._cells if y0 <= cy <= y1 and x0 <= cx <= x1
+            ]
+
+        out: list[T] = []
+        for cy, cx in cells:
+            bucket = self._cells[(cy, cx)]
+            if y0 < cy < y1 and x0 < cx < x1:
+                out.extend(item for _, _, item in bucket)
+            else:
+                out.extend(item for lat, lon, item in bucket if bbox.contains(lat, lon))
+            if limit is not None and len(out) >= limit:
+                return out[:limit]
+        return out
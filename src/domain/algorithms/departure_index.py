@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from array import array
+from typing import Sequence
+
+from src.domain.models.gtfs import Connection, StopDepartureIndex
+
+
+def build_departure_index(connections: Sequence[Connection]) -> StopDepartureIndex:
+    """Group connection positions by departure stop, ordered by departure time.
+
+    `connections` is normally already sorted by departure time (as the loader
+    produces it), in which case each stop's list comes out sorted as is.
+    """
+
+    ids: dict[str, array] = {}
+    times: dict[str, array] = {}
+    unsorted: set[str] = set()
+    for i, c in enumerate(connections):
+        stop_times = times.get(c.dep_stop_id)
+        if stop_times is None:
+            stop_times = times[c.dep_stop_id] = array("i")
+            ids[c.dep_stop_id] = array("i")
+        elif stop_times[-1] > c.dep_time_s:
+            unsorted.add(c.dep_stop_id)
+        stop_times.append(c.dep_time_s)
+        ids[c.dep_stop_id].append(i)
+
+    for stop_id in unsorted:
+        pairs = sorted(zip(times[stop_id], ids[stop_id]))
+        times[stop_id] = array("i", (t for t, _ in pairs))
+        ids[stop_id] = array("i", (ci for _, ci in pairs))
+
+    return StopDepartureIndex(connection_ids_by_stop=ids, dep_times_by_stop=times)
@@ -8,11 +8,17 @@ from src.domain.models import GeoPoint
 def haversine_distance_m(a: GeoPoint, b: GeoPoint) -> float:
     """Great-circle distance in meters."""
 
+    return haversine_m(a.lat, a.lon, b.lat, b.lon)
+
+
+def haversine_m(lat_a: float, lon_a: float, lat_b: float, lon_b: float) -> float:
+    """Great-circle distance in meters between raw (lat, lon) pairs."""
+
     r = 6371000.0
-    lat1 = math.radians(a.lat)
-    lon1 = math.radians(a.lon)
-    lat2 = math.radians(b.lat)
-    lon2 = math.radians(b.lon)
+    lat1 = math.radians(lat_a)
+    lon1 = math.radians(lon_a)
+    lat2 = math.radians(lat_b)
+    lon2 = math.radians(lon_b)
 
     dlat = lat2 - lat1
     dlon = lon2 - lon1
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterable
+
+import numpy as np
+
+from src.domain.models import GeoPoint
+
+EARTH_RADIUS_M = 6371000.0
+
+
+def as_arrays(points: Iterable[GeoPoint]) -> tuple[np.ndarray, np.ndarray]:
+    """(lats, lons) float64 arrays for a sequence of points."""
+
+    pts = list(points)
+    lats = np.fromiter((p.lat for p in pts), dtype=np.float64, count=len(pts))
+    lons = np.fromiter((p.lon for p in pts), dtype=np.float64, count=len(pts))
+    return lats, lons
+
+
+def haversine_pairwise_m(
+    lat_a: np.ndarray | float,
+    lon_a: np.ndarray | float,
+    lat_b: np.ndarray | float,
+    lon_b: np.ndarray | float,
+) -> np.ndarray:
+    """Element-wise great-circle distances in meters (NumPy broadcasting).
+
+    Scalar inputs give a 0-d array; wrap it in float() for a plain number.
+    """
+
+    lat1 = np.radians(lat_a)
+    lat2 = np.radians(lat_b)
+    dlat = lat2 - lat1
+    dlon = np.radians(lon_b) - np.radians(lon_a)
+    s = np.sin(dlat / 2.0) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2.0) ** 2
+    return np.asarray(2.0 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(s, 1.0))))
+
+
+def initial_bearing_deg(
+    lat_a: np.ndarray | float,
+    lon_a: np.ndarray | float,
+    lat_b: np.ndarray | float,
+    lon_b: np.ndarray | float,
+) -> np.ndarray:
+    """Element-wise initial great-circle bearing a -> b, degrees in [0, 360)."""
+
+    lat1 = np.radians(lat_a)
+    lat2 = np.radians(lat_b)
+    dlon = np.radians(lon_b) - np.radians(lon_a)
+    y = np.sin(dlon) * np.cos(lat2)
+    x = np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * np.cos(lat2) * np.cos(dlon)
+    return np.asarray(np.degrees(np.arctan2(y, x)) % 360.0)
+
+
+def distances_from_m(
+    lat: float, lon: float, lats: np.ndarray, lons: np.ndarray
+) -> np.ndarray:
+    """Distances in meters from one point to many."""
+
+    return haversine_pairwise_m(lat, lon, lats, lons)
+
+
+def consecutive_distances_m(lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Segment lengths of a polyline (length n - 1)."""
+
+    if len(lats) < 2:
+        return np.zeros(0, dtype=np.float64)
+    return haversine_pairwise_m(lats[:-1], lons[:-1], lats[1:], lons[1:])
+
+
+def cumulative_distances_m(lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Distance along a polyline at each vertex (length n, starting at 0)."""
+
+    out = np.zeros(len(lats), dtype=np.float64)
+    if len(lats) > 1:
+        np.cumsum(consecutive_distances_m(lats, lons), out=out[1:])
+    return out
+
+
+@dataclass(frozen=True, slots=True)
+class PolylineProjection:
+    """Closest point on a polyline: segment `index` (vertex i -> i + 1) at `t`."""
+
+    index: int
+    t: float
+    lat: float
+    lon: float
+    distance_m: float
+    along_m: float
+
+
+def project_onto_polyline(
+    lat: float,
+    lon: float,
+    lats: np.ndarray,
+    lons: np.ndarray,
+    *,
+    cumulative_m: np.ndarray | None = None,
+) -> PolylineProjection | None:
+    """Project a point onto the nearest segment of a polyline.
+
+    Segments are compared in a local equirectangular frame centered on the
+    point (accurate at street scale); the reported distances are geodesic.
+    Returns None for an empty polyline.
+    """
+
+    n = len(lats)
+    if n == 0:
+        return None
+    if n == 1:
+        d = float(distances_from_m(lat, lon, lats, lons)[0])
+        along = float(cumulative_m[0]) if cumulative_m is not None else 0.0
+        return PolylineProjection(0, 0.0, float(lats[0]), float(lons[0]), d, along)
+
+    k = np.radians(1.0) * EARTH_RADIUS_M
+    cos_lat = np.cos(np.radians(lat))
+    x = (lons - lon) * k * cos_lat
+    y = (lats - lat) * k
+    x0, y0, dx, dy = x[:-1], y[:-1], np.diff(x), np.diff(y)
+    seg_sq = dx * dx + dy * dy
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t = np.where(seg_sq > 0.0, -(x0 * dx + y0 * dy) / seg_sq, 0.0)
+    t = np.clip(t, 0.0, 1.0)
+    px = x0 + t * dx
+    py = y0 + t * dy
+    i = int(np.argmin(px * px + py * py))
+
+    ti = float(t[i])
+    plat = float(lats[i] + (lats[i + 1] - lats[i]) * ti)
+    plon = float(lons[i] + (lons[i + 1] - lons[i]) * ti)
+    if cumulative_m is None:
+        cumulative_m = cumulative_distances_m(lats, lons)
+    seg_m = float(cumulative_m[i + 1] - cumulative_m[i])
+    return PolylineProjection(
+        index=i,
+        t=ti,
+        lat=plat,
+        lon=plon,
+        distance_m=float(haversine_pairwise_m(lat, lon, plat, plon)),
+        along_m=float(cumulative_m[i]) + seg_m * ti,
+    )
@@ -0,0 +1,297 @@
+from __future__ import annotations
+
+import math
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Mapping, Sequence
+
+import numpy as np
+
+from src.domain.algorithms.geodesic import (
+    EARTH_RADIUS_M,
+    as_arrays,
+    cumulative_distances_m,
+    haversine_pairwise_m,
+)
+from src.domain.models import GeoPoint
+from src.domain.models.gtfs import GtfsTrip, ShapeIndex
+from src.domain.models.realtime import RealtimeVehicle, VehicleMatch
+
+_M_PER_DEG = math.radians(1.0) * EARTH_RADIUS_M
+
+
+@dataclass(frozen=True, slots=True)
+class SegmentProjections:
+    """Batched `ShapeSegmentIndex.project` result; `segment` is -1 if unmatched."""
+
+    segment: np.ndarray
+    t: np.ndarray
+    lat: np.ndarray
+    lon: np.ndarray
+    distance_m: np.ndarray
+    along_m: np.ndarray
+
+
+@dataclass(frozen=True, slots=True)
+class ShapeSegmentIndex:
+    """Every shape segment in flat arrays, bucketed per (shape, grid cell).
+
+    Segment `i` goes from (lat0[i], lon0[i]) to (lat0[i] + dlat[i],
+    lon0[i] + dlon[i]) and starts `along0_m[i]` meters into its shape. A
+    segment is listed in every cell its bounding box touches, so a point
+    only has to be tested against the segments of the cells around it.
+    """
+
+    lat0: np.ndarray
+    lon0: np.ndarray
+    dlat: np.ndarray
+    dlon: np.ndarray
+    along0_m: np.ndarray
+    length_m: np.ndarray
+    shape_ids: tuple[str, ...]
+    shape_pos: dict[str, int]
+    shape_length_m: np.ndarray
+    cells: dict[tuple[int, int, int], np.ndarray]
+    cell_deg: float
+
+    @classmethod
+    def build(
+        cls,
+        shapes_by_id: Mapping[str, tuple[GeoPoint, ...]],
+        *,
+        cumulative_m_by_shape: Mapping[str, Sequence[float]] | None = None,
+        cell_deg: float = 0.005,
+    ) -> ShapeSegmentIndex:
+        cumulative_m_by_shape = cumulative_m_by_shape or {}
+        parts: list[tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+        shape_ids: list[str] = []
+        for shape_id, points in shapes_by_id.items():
+            if len(points) < 2:
+                continue
+            lats, lons = as_arrays(points)
+            cum = cumulative_m_by_shape.get(shape_id)
+            cum_arr = (
+                np.asarray(cum, dtype=np.float64)
+                if cum is not None and len(cum) == len(points)
+                else cumulative_distances_m(lats, lons)
+            )
+            parts.append((lats, lons, cum_arr))
+            shape_ids.append(shape_id)
+
+        def cat(arrays: list[np.ndarray]) -> np.ndarray:
+            return np.concatenate(arrays) if arrays else np.zeros(0)
+
+        lat0 = cat([la[:-1] for la, _, _ in parts])
+        lon0 = cat([lo[:-1] for _, lo, _ in parts])
+        lat1 = cat([la[1:] for la, _, _ in parts])
+        lon1 = cat([lo[1:] for _, lo, _ in parts])
+        along0 = cat([c[:-1] for _, _, c in parts])
+        length = cat([np.diff(c) for _, _, c in parts])
+        shape_of = np.repeat(
+            np.arange(len(parts), dtype=np.int32),
+            [len(la) - 1 for la, _, _ in parts],
+        )
+
+        cy0 = np.floor(np.minimum(lat0, lat1) / cell_deg).astype(np.int64)
+        cy1 = np.floor(np.maximum(lat0, lat1) / cell_deg).astype(np.int64)
+        cx0 = np.floor(np.minimum(lon0, lon1) / cell_deg).astype(np.int64)
+        cx1 = np.floor(np.maximum(lon0, lon1) / cell_deg).astype(np.int64)
+        buckets: dict[tuple[int, int, int], list[int]] = {}
+        for i, (s, ya, yb, xa, xb) in enumerate(
+            zip(
+                shape_of.tolist(),
+                cy0.tolist(),
+                cy1.tolist(),
+                cx0.tolist(),
+                cx1.tolist(),
+            )
+        ):
+            for cy in range(ya, yb + 1):
+                for cx in range(xa, xb + 1):
+                    buckets.setdefault((s, cy, cx), []).append(i)
+
+        return cls(
+            lat0=lat0,
+            lon0=lon0,
+            dlat=lat1 - lat0,
+            dlon=lon1 - lon0,
+            along0_m=along0,
+            length_m=length,
+            shape_ids=tuple(shape_ids),
+            shape_pos={sid: i for i, sid in enumerate(shape_ids)},
+            shape_length_m=np.asarray(
+                [float(c[-1]) for _, _, c in parts], dtype=np.float64
+            ),
+            cells={k: np.asarray(v, dtype=np.int64) for k, v in buckets.items()},
+            cell_deg=float(cell_deg),
+        )
+
+    def __len__(self) -> int:
+        return len(self.lat0)
+
+    def project(
+        self,
+        shape_ids: Sequence[str | None],
+        lats: np.ndarray,
+        lons: np.ndarray,
+        *,
+        max_distance_m: float = 75.0,
+    ) -> SegmentProjections:
+        """Snap point `i` onto shape `shape_ids[i]`, all points at once.
+
+        Candidate segments come from the cells within `max_distance_m`;
+        the nearest is chosen in a local equirectangular frame per point.
+        Points farther than `max_distance_m` from their shape (or without a
+        known shape) get segment -1.
+        """
+
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        n = len(lats)
+        out = SegmentProjections(
+            segment=np.full(n, -1, dtype=np.int64),
+            t=np.zeros(n),
+            lat=lats.copy(),
+            lon=lons.copy(),
+            distance_m=np.full(n, np.inf),
+            along_m=np.full(n, np.nan),
+        )
+
+        cos_lat = np.maximum(np.cos(np.radians(lats)), 1e-6)
+        ry = math.ceil(max_distance_m / _M_PER_DEG / self.cell_deg)
+        rx = np.ceil(max_distance_m / (_M_PER_DEG * cos_lat) / self.cell_deg)
+        cy = np.floor(lats / self.cell_deg).astype(np.int64)
+        cx = np.floor(lons / self.cell_deg).astype(np.int64)
+
+        chunks: list[np.ndarray] = []
+        counts = np.zeros(n, dtype=np.int64)
+        for i, shape_id in enumerate(shape_ids):
+            s = self.shape_pos.get(shape_id) if shape_id else None
+            if s is None:
+                continue
+            y, x, r = int(cy[i]), int(cx[i]), int(rx[i])
+            for yy in range(y - ry, y + ry + 1):
+                for xx in range(x - r, x + r + 1):
+                    seg = self.cells.get((s, yy, xx))
+                    if seg is not None:
+                        chunks.append(seg)
+                        counts[i] += len(seg)
+        if not chunks:
+            return out
+
+        cand = np.concatenate(chunks)
+        owner = np.repeat(np.arange(n), counts)
+        k = _M_PER_DEG * cos_lat[owner]
+        x0 = (self.lon0[cand] - lons[owner]) * k
+        y0 = (self.lat0[cand] - lats[owner]) * _M_PER_DEG
+        dx = self.dlon[cand] * k
+        dy = self.dlat[cand] * _M_PER_DEG
+        seg_sq = dx * dx + dy * dy
+        with np.errstate(invalid="ignore", divide="ignore"):
+            t = np.where(seg_sq > 0.0, -(x0 * dx + y0 * dy) / seg_sq, 0.0)
+        t = np.clip(t, 0.0, 1.0)
+        px = x0 + t * dx
+        py = y0 + t * dy
+        d2 = px * px + py * py
+
+        # Nearest candidate per owner: sort by (owner, d2), keep each first.
+        order = np.lexsort((d2, owner))
+        owners, first = np.unique(owner[order], return_index=True)
+        best = order[first]
+        seg = cand[best]
+        tb = t[best]
+        plat = self.lat0[seg] + self.dlat[seg] * tb
+        plon = self.lon0[seg] + self.dlon[seg] * tb
+        dist = haversine_pairwise_m(lats[owners], lons[owners], plat, plon)
+        ok = dist <= max_distance_m
+
+        hit = owners[ok]
+        out.segment[hit] = seg[ok]
+        out.t[hit] = tb[ok]
+        out.lat[hit] = plat[ok]
+        out.lon[hit] = plon[ok]
+        out.distance_m[hit] = dist[ok]
+        out.along_m[hit] = self.along0_m[seg[ok]] + self.length_m[seg[ok]] * tb[ok]
+        return out
+
+
+def match_vehicles(
+    vehicles: Sequence[RealtimeVehicle],
+    *,
+    segments: ShapeSegmentIndex,
+    trips_by_id: Mapping[str, GtfsTrip],
+    shape_index: ShapeIndex | None = None,
+    shape_by_route: Mapping[str, str] | None = None,
+    max_distance_m: float = 75.0,
+) -> tuple[VehicleMatch, ...]:
+    """Snap a fleet onto the shapes of their trips in one batched projection.
+
+    The shape comes from the vehicle's trip, else from `shape_by_route`
+    (typically the route's most used shape). Stop progress needs the trip's
+    stop pattern from `shape_index` and is left empty otherwise. Vehicles
+    without a shape or too far from it are omitted.
+    """
+
+    shape_by_route = shape_by_route or {}
+    shape_ids: list[str | None] = []
+    for v in vehicles:
+        trip = trips_by_id.get(v.trip_id) if v.trip_id else None
+        shape_id = trip.shape_id if trip else None
+        if shape_id is None and v.route_id:
+            shape_id = shape_by_route.get(v.route_id)
+        shape_ids.append(shape_id)
+
+    lats = np.fromiter((v.lat for v in vehicles), dtype=np.float64, count=len(vehicles))
+    lons = np.fromiter((v.lon for v in vehicles), dtype=np.float64, count=len(vehicles))
+    proj = segments.project(shape_ids, lats, lons, max_distance_m=max_distance_m)
+
+    alongs_by_pattern: dict[int, list[float]] = {}
+    out: list[VehicleMatch] = []
+    for i in np.flatnonzero(proj.segment >= 0).tolist():
+        v = vehicles[i]
+        shape_id = shape_ids[i]
+        assert shape_id is not None  # matched implies a shape
+        along = float(proj.along_m[i])
+
+        prev_stop = next_stop = None
+        progress = None
+        pattern_i = (
+            shape_index.pattern_by_trip.get(v.trip_id)
+            if shape_index is not None and v.trip_id
+            else None
+        )
+        if pattern_i is not None:
+            pattern = shape_index.patterns[pattern_i]  # type: ignore[union-attr]
+            if pattern.shape_id == shape_id and pattern.stop_ids:
+                alongs = alongs_by_pattern.get(pattern_i)
+                if alongs is None:
+                    alongs = [p.along_m for p in pattern.positions]
+                    alongs_by_pattern[pattern_i] = alongs
+                j = bisect_right(alongs, along)
+                if j > 0:
+                    prev_stop = pattern.stop_ids[j - 1]
+                if j < len(alongs):
+                    next_stop = pattern.stop_ids[j]
+                if 0 < j < len(alongs):
+                    span = alongs[j] - alongs[j - 1]
+                    progress = (along - alongs[j - 1]) / span if span > 0 else 0.0
+
+        out.append(
+            VehicleMatch(
+                key=v.key,
+                trip_id=v.trip_id,
+                route_id=v.route_id,
+                shape_id=shape_id,
+                lat=float(proj.lat[i]),
+                lon=float(proj.lon[i]),
+                offset_m=float(proj.distance_m[i]),
+                along_m=along,
+                shape_length_m=float(
+                    segments.shape_length_m[segments.shape_pos[shape_id]]
+                ),
+                prev_stop_id=prev_stop,
+                next_stop_id=next_stop,
+                stop_progress=progress,
+            )
+        )
+    return tuple(out)
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+from typing import Literal, Sequence
+
+import numpy as np
+
+from src.domain.algorithms.geodesic import EARTH_RADIUS_M, as_arrays
+from src.domain.models import GeoPoint
+
+# Leg geometry in API/worker responses: [{lat, lon}, ...] or an encoded string.
+GeometryFormat = Literal["points", "polyline"]
+
+
+def _encode_value(value: int, out: list[str]) -> None:
+    value = ~(value << 1) if value < 0 else value << 1
+    while value >= 0x20:
+        out.append(chr((0x20 | (value & 0x1F)) + 63))
+        value >>= 5
+    out.append(chr(value + 63))
+
+
+def encode_polyline(points: Sequence[GeoPoint], *, precision: int = 5) -> str:
+    """Google encoded polyline (lat, lon order; 1e-5 degrees by default)."""
+
+    factor = 10**precision
+    out: list[str] = []
+    prev_lat = prev_lon = 0
+    for p in points:
+        lat = round(p.lat * factor)
+        lon = round(p.lon * factor)
+        _encode_value(lat - prev_lat, out)
+        _encode_value(lon - prev_lon, out)
+        prev_lat, prev_lon = lat, lon
+    return "".join(out)
+
+
+def decode_polyline(encoded: str, *, precision: int = 5) -> list[GeoPoint]:
+    """Inverse of `encode_polyline`."""
+
+    factor = float(10**precision)
+    coords: list[int] = []
+    value = shift = 0
+    for ch in encoded:
+        b = ord(ch) - 63
+        value |= (b & 0x1F) << shift
+        shift += 5
+        if b < 0x20:
+            coords.append(~(value >> 1) if value & 1 else value >> 1)
+            value = shift = 0
+
+    points: list[GeoPoint] = []
+    lat = lon = 0
+    for i in range(0, len(coords) - 1, 2):
+        lat += coords[i]
+        lon += coords[i + 1]
+        points.append(GeoPoint(lat=lat / factor, lon=lon / factor))
+    return points
+
+
+def simplify_mask(lats: np.ndarray, lons: np.ndarray, tolerance_m: float) -> np.ndarray:
+    """Douglas-Peucker keep-mask for a polyline, tolerance in meters.
+
+    Distances are measured in a local equirectangular frame (street scale).
+    The first and last points are always kept.
+    """
+
+    n = len(lats)
+    keep = np.ones(n, dtype=bool)
+    if n < 3 or tolerance_m <= 0:
+        return keep
+
+    k = np.radians(1.0) * EARTH_RADIUS_M
+    x = (lons - lons[0]) * k * np.cos(np.radians(lats.mean()))
+    y = (lats - lats[0]) * k
+
+    keep[1:-1] = False
+    stack = [(0, n - 1)]
+    while stack:
+        a, b = stack.pop()
+        if b - a < 2:
+            continue
+        dx, dy = x[b] - x[a], y[b] - y[a]
+        px, py = x[a + 1 : b] - x[a], y[a + 1 : b] - y[a]
+        seg_sq = dx * dx + dy * dy
+        if seg_sq > 0.0:
+            t = np.clip((px * dx + py * dy) / seg_sq, 0.0, 1.0)
+            ex, ey = px - t * dx, py - t * dy
+        else:
+            ex, ey = px, py
+        dist_sq = ex * ex + ey * ey
+        i = int(np.argmax(dist_sq))
+        if dist_sq[i] > tolerance_m * tolerance_m:
+            mid = a + 1 + i
+            keep[mid] = True
+            stack.append((a, mid))
+            stack.append((mid, b))
+    return keep
+
+
+def simplify_polyline(
+    points: Sequence[GeoPoint], tolerance_m: float
+) -> tuple[GeoPoint, ...]:
+    """Douglas-Peucker simplification of GeoPoints (see `simplify_mask`)."""
+
+    pts = tuple(points)
+    if len(pts) < 3 or tolerance_m <= 0:
+        return pts
+    keep = simplify_mask(*as_arrays(pts), tolerance_m)
+    return tuple(p for p, kept in zip(pts, keep.tolist()) if kept)
+
+
+def path_for_response(
+    path: Sequence[GeoPoint],
+    *,
+    geometry: GeometryFormat = "points",
+    simplify_m: float | None = None,
+) -> tuple[tuple[GeoPoint, ...] | None, str | None]:
+    """(points, encoded) for a leg path; exactly one is set for non-empty paths."""
+
+    if not path:
+        return None, None
+    pts = simplify_polyline(path, simplify_m) if simplify_m else tuple(path)
+    if geometry == "polyline":
+        return None, encode_polyline(pts)
+    return pts, None
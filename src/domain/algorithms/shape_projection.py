@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+from bisect import bisect_right
+from typing import Mapping, Sequence
+
+import numpy as np
+
+from src.domain.algorithms.geodesic import (
+    as_arrays,
+    cumulative_distances_m,
+    project_onto_polyline,
+)
+from src.domain.models import GeoPoint, Stop
+from src.domain.models.gtfs import (
+    GtfsTrip,
+    ShapeIndex,
+    ShapePattern,
+    ShapeStopPosition,
+)
+
+
+def _positions_from_dist(
+    stop_dists: Sequence[float],
+    shape_dists: Sequence[float],
+    cumulative_m: np.ndarray,
+) -> list[ShapeStopPosition]:
+    """Map GTFS `shape_dist_traveled` values (any unit) onto the shape."""
+
+    last = len(shape_dists) - 2
+    out: list[ShapeStopPosition] = []
+    for d in stop_dists:
+        i = min(max(bisect_right(shape_dists, d) - 1, 0), last)
+        span = shape_dists[i + 1] - shape_dists[i]
+        t = min(max((d - shape_dists[i]) / span, 0.0), 1.0) if span > 0 else 0.0
+        along = cumulative_m[i] + (cumulative_m[i + 1] - cumulative_m[i]) * t
+        out.append(ShapeStopPosition(segment=i, along_m=float(along)))
+    return out
+
+
+def _positions_from_geometry(
+    stops: Sequence[Stop | None],
+    lats: np.ndarray,
+    lons: np.ndarray,
+    cumulative_m: np.ndarray,
+) -> list[ShapeStopPosition]:
+    """Project stops in order, never moving backwards along the shape."""
+
+    start = 0
+    out: list[ShapeStopPosition] = []
+    for stop in stops:
+        proj = None
+        if stop is not None:
+            proj = project_onto_polyline(
+                stop.location.lat,
+                stop.location.lon,
+                lats[start:],
+                lons[start:],
+                cumulative_m=cumulative_m[start:],
+            )
+        if proj is None:
+            # Unknown stop: keep it at the previous position.
+            prev = out[-1] if out else ShapeStopPosition(segment=0, along_m=0.0)
+            out.append(prev)
+            continue
+        segment = min(start + proj.index, len(lats) - 2)
+        out.append(ShapeStopPosition(segment=segment, along_m=proj.along_m))
+        start = segment
+    return out
+
+
+def build_shape_index(
+    *,
+    trips_by_id: Mapping[str, GtfsTrip],
+    shapes_by_id: Mapping[str, tuple[GeoPoint, ...]],
+    stops_by_id: Mapping[str, Stop],
+    stop_ids_by_trip: Mapping[str, Sequence[str]],
+    shape_dist_by_shape: Mapping[str, Sequence[float]] | None = None,
+    stop_dist_by_trip: Mapping[str, Sequence[float | None]] | None = None,
+) -> ShapeIndex:
+    """Locate every trip pattern's stops on its shape, once per pattern.
+
+    Uses `shape_dist_traveled` when both shapes.txt and stop_times.txt carry
+    it for the trip, and geometric projection otherwise.
+    """
+
+    shape_dist_by_shape = shape_dist_by_shape or {}
+    stop_dist_by_trip = stop_dist_by_trip or {}
+
+    patterns: list[ShapePattern] = []
+    pattern_by_trip: dict[str, int] = {}
+    pattern_ids: dict[tuple, int] = {}
+    arrays: dict[str, tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+
+    for trip_id, stop_ids in stop_ids_by_trip.items():
+        trip = trips_by_id.get(trip_id)
+        shape_id = trip.shape_id if trip else None
+        points = shapes_by_id.get(shape_id) if shape_id else None
+        if not shape_id or not points or len(points) < 2 or not stop_ids:
+            continue
+
+        shape_dists = shape_dist_by_shape.get(shape_id)
+        stop_dists = stop_dist_by_trip.get(trip_id)
+        # shape_dist_traveled is only trusted when both sides are complete.
+        known_dists: list[float] | None = None
+        if (
+            shape_dists is not None
+            and len(shape_dists) == len(points)
+            and stop_dists is not None
+            and len(stop_dists) == len(stop_ids)
+        ):
+            present = [float(d) for d in stop_dists if d is not None]
+            if len(present) == len(stop_ids):
+                known_dists = present
+        key = (
+            shape_id,
+            tuple(stop_ids),
+            tuple(known_dists) if known_dists is not None else None,
+        )
+        existing = pattern_ids.get(key)
+        if existing is not None:
+            pattern_by_trip[trip_id] = existing
+            continue
+
+        if shape_id not in arrays:
+            lats, lons = as_arrays(points)
+            arrays[shape_id] = (lats, lons, cumulative_distances_m(lats, lons))
+        lats, lons, cum = arrays[shape_id]
+
+        if known_dists is not None and shape_dists is not None:
+            positions = _positions_from_dist(known_dists, list(shape_dists), cum)
+        else:
+            positions = _positions_from_geometry(
+                [stops_by_id.get(sid) for sid in stop_ids], lats, lons, cum
+            )
+
+        pattern_ids[key] = len(patterns)
+        pattern_by_trip[trip_id] = len(patterns)
+        patterns.append(
+            ShapePattern(
+                shape_id=shape_id,
+                stop_ids=tuple(stop_ids),
+                positions=tuple(positions),
+            )
+        )
+
+    return ShapeIndex(
+        patterns=tuple(patterns),
+        pattern_by_trip=pattern_by_trip,
+        cumulative_m_by_shape={
+            sid: tuple(cum.tolist()) for sid, (_, _, cum) in arrays.items()
+        },
+    )
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import heapq
+import math
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Iterable
+
+import numpy as np
+
+from src.domain.algorithms.geodesic import as_arrays, distances_from_m
+from src.domain.models import BoundingBox, GeoPoint, Stop
+
+# Meters per degree of latitude (local equirectangular projection).
+_M_PER_DEG = 111_320.0
+
+
+@dataclass(slots=True)
+class StopSpatialIndex:
+    """Uniform grid over stops on locally projected (equirectangular) meters.
+
+    Built once per feed; radius and k-nearest queries only visit the cells
+    around the query point and rank hits by exact haversine distance (one
+    NumPy batch per query). Viewport (bounding box) queries take interior
+    cells wholesale and only test stops in the border cells.
+    """
+
+    cell_m: float = 250.0
+    _ref_cos: float = field(default=1.0, init=False, repr=False)
+    _cells: dict[tuple[int, int], list[Stop]] = field(
+        default_factory=lambda: defaultdict(list), init=False, repr=False
+    )
+    _coords: dict[tuple[int, int], tuple[np.ndarray, np.ndarray]] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    _size: int = field(default=0, init=False, repr=False)
+    _bounds: tuple[int, int, int, int] = field(
+        default=(0, 0, 0, 0), init=False, repr=False
+    )
+
+    @classmethod
+    def build(cls, stops: Iterable[Stop], *, cell_m: float = 250.0) -> StopSpatialIndex:
+        stops = list(stops)
+        index = cls(cell_m=float(cell_m))
+        if stops:
+            mean_lat = sum(s.location.lat for s in stops) / len(stops)
+            index._ref_cos = max(0.01, math.cos(math.radians(mean_lat)))
+        for stop in stops:
+            index._cells[index._cell(stop.location)].append(stop)
+        index._size = len(stops)
+        index._coords = {
+            cell: as_arrays(s.location for s in bucket)
+            for cell, bucket in index._cells.items()
+        }
+        if index._cells:
+            xs = [cx for cx, _ in index._cells]
+            ys = [cy for _, cy in index._cells]
+            index._bounds = (min(xs), min(ys), max(xs), max(ys))
+        return index
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _cell(self, point: GeoPoint) -> tuple[int, int]:
+        return self._cell_at(point.lat, point.lon)
+
+    def _cell_at(self, lat: float, lon: float) -> tuple[int, int]:
+        x = lon * _M_PER_DEG * self._ref_cos
+        y = lat * _M_PER_DEG
+        return math.floor(x / self.cell_m), math.floor(y / self.cell_m)
+
+    def _ring(self, center: tuple[int, int], r: int) -> list[tuple[int, int]]:
+        """Non-empty cells at Chebyshev distance exactly `r` from `center`."""
+
+        cx, cy = center
+        if r == 0:
+            cells = [(cx, cy)]
+        else:
+            cells = [(cx + dx, cy + dy) for dx in range(-r, r + 1) for dy in (-r, r)]
+            cells += [(cx + dx, cy + dy) for dx in (-r, r) for dy in range(-r + 1, r)]
+        return [cell for cell in cells if cell in self._cells]
+
+    def _distances(
+        self, point: GeoPoint, cells: list[tuple[int, int]]
+    ) -> tuple[list[Stop], np.ndarray]:
+        """Stops in `cells` and their haversine distances to `point` (batched)."""
+
+        if not cells:
+            return [], np.zeros(0)
+        stops = [stop for cell in cells for stop in self._cells[cell]]
+        lats = np.concatenate([self._coords[cell][0] for cell in cells])
+        lons = np.concatenate([self._coords[cell][1] for cell in cells])
+        return stops, distances_from_m(point.lat, point.lon, lats, lons)
+
+    def within(
+        self, point: GeoPoint, radius_m: float, *, max_count: int | None = None
+    ) -> list[tuple[float, Stop]]:
+        """(distance_m, stop) pairs within `radius_m`, nearest first."""
+
+        cx, cy = self._cell(point)
+        # Extra cell absorbs the projection error towards the grid edges.
+        reach = math.ceil(float(radius_m) / self.cell_m) + 1
+        cells = [
+            (cx + dx, cy + dy)
+            for dx in range(-reach, reach + 1)
+            for dy in range(-reach, reach + 1)
+            if (cx + dx, cy + dy) in self._cells
+        ]
+        stops, dist = self._distances(point, cells)
+        if not stops:
+            return []
+
+        order = np.argsort(dist, kind="stable")
+        hits = [(float(dist[i]), stops[i]) for i in order if dist[i] <= radius_m]
+        return hits if max_count is None else hits[:max_count]
+
+    def nearest(
+        self, point: GeoPoint, k: int = 1, *, max_radius_m: float | None = None
+    ) -> list[tuple[float, Stop]]:
+        """The `k` nearest stops (optionally capped by distance), nearest first."""
+
+        if k <= 0 or not self._size:
+            return []
+
+        center = self._cell(point)
+        x0, y0, x1, y1 = self._bounds
+        max_rings = max(
+            abs(center[0] - x0),
+            abs(center[0] - x1),
+            abs(center[1] - y0),
+            abs(center[1] - y1),
+        )
+        best: list[tuple[float, int, Stop]] = []  # max-heap via negated distance
+        seq = 0
+        for r in range(max_rings + 1):
+            # Stops in ring r or further out are at least (r - 1) cells away;
+            # stop once the k-th best is already closer than that.
+            if len(best) >= k and -best[0][0] <= (r - 1) * self.cell_m:
+                break
+            if max_radius_m is not None and (r - 1) * self.cell_m > max_radius_m:
+                break
+            stops, dist = self._distances(point, self._ring(center, r))
+            for stop, d in zip(stops, dist.tolist()):
+                if max_radius_m is not None and d > max_radius_m:
+                    continue
+                seq += 1
+                if len(best) < k:
+                    heapq.heappush(best, (-d, seq, stop))
+                elif d < -best[0][0]:
+                    heapq.heapreplace(best, (-d, seq, stop))
+
+        return sorted(((-nd, stop) for nd, _, stop in best), key=lambda x: x[0])
+
+    def in_bbox(self, bbox: BoundingBox, *, limit: int | None = None) -> list[Stop]:
+        """Stops inside `bbox`, in build order within each cell."""
+
+        x0, y0 = self._cell_at(bbox.min_lat, bbox.min_lon)
+        x1, y1 = self._cell_at(bbox.max_lat, bbox.max_lon)
+
+        span = (x1 - x0 + 1) * (y1 - y0 + 1)
+        if span <= len(self._cells):
+            cells = [
+                (cx, cy)
+                for cx in range(x0, x1 + 1)
+                for cy in range(y0, y1 + 1)
+                if (cx, cy) in self._cells
+            ]
+        else:
+            # Zoomed out: cheaper to scan the occupied cells.
+            cells = [
+                (cx, cy) for cx, cy in self._cells if x0 <= cx <= x1 and y0 <= cy <= y1
+            ]
+
+        out: list[Stop] = []
+        for cx, cy in cells:
+            bucket = self._cells[(cx, cy)]
+            if x0 < cx < x1 and y0 < cy < y1:
+                out.extend(bucket)
+            else:
+                out.extend(
+                    s for s in bucket if bbox.contains(s.location.lat, s.location.lon)
+                )
+            if limit is not None and len(out) >= limit:
+                return out[:limit]
+        return out
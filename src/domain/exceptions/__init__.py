@@ -1,6 +1,15 @@
-from .routing import NoPathFound, RoutingError
+from .routing import (
+    NoPathFound,
+    RoutingBusy,
+    RoutingError,
+    RoutingTimeout,
+    RoutingUnavailable,
+)
 
 __all__ = [
     "RoutingError",
     "NoPathFound",
+    "RoutingBusy",
+    "RoutingTimeout",
+    "RoutingUnavailable",
 ]
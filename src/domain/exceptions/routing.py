@@ -4,3 +4,15 @@ class RoutingError(Exception):
 
 class NoPathFound(RoutingError):
     """Raised when no feasible path exists for the given request."""
+
+
+class RoutingBusy(RoutingError):
+    """Raised when the routing executor's queue is full."""
+
+
+class RoutingTimeout(RoutingError):
+    """Raised when a route calculation exceeds its time budget."""
+
+
+class RoutingUnavailable(RoutingError):
+    """Raised when a routing worker process died mid-calculation."""
@@ -1,14 +1,30 @@
-from .geo import GeoPoint
-from .realtime import RealtimeVehicle
+from .geo import BoundingBox, GeoPoint
+from .landmarks import LandmarkTable
+from .realtime import (
+    RealtimeSnapshot,
+    RealtimeVehicle,
+    RealtimeVehicleChanges,
+    VehicleMatch,
+    VehicleTrail,
+)
 from .route import Route, RouteLeg, TransitLine, TravelMode
 from .stop import Stop
+from .stop_snap import StopSnap, StopSnapTable
 
 __all__ = [
+    "BoundingBox",
     "GeoPoint",
+    "LandmarkTable",
+    "RealtimeSnapshot",
     "RealtimeVehicle",
+    "RealtimeVehicleChanges",
     "Stop",
+    "StopSnap",
+    "StopSnapTable",
     "Route",
     "RouteLeg",
     "TransitLine",
     "TravelMode",
+    "VehicleMatch",
+    "VehicleTrail",
 ]
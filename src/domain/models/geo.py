@@ -13,3 +13,22 @@ class GeoPoint:
             raise ValueError(f"Invalid latitude: {self.lat}")
         if not (-180.0 <= self.lon <= 180.0):
             raise ValueError(f"Invalid longitude: {self.lon}")
+
+
+@dataclass(frozen=True, slots=True)
+class BoundingBox:
+    """Axis-aligned lat/lon box (no antimeridian wrap)."""
+
+    min_lat: float
+    min_lon: float
+    max_lat: float
+    max_lon: float
+
+    def __post_init__(self) -> None:
+        if self.min_lat > self.max_lat or self.min_lon > self.max_lon:
+            raise ValueError(f"Invalid bounding box: {self}")
+
+    def contains(self, lat: float, lon: float) -> bool:
+        return (
+            self.min_lat <= lat <= self.max_lat and self.min_lon <= lon <= self.max_lon
+        )
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
 
 from src.domain.models import Stop
 from src.domain.models.geo import GeoPoint
@@ -18,6 +21,8 @@ class Connection:
     dep_time_s: int
     arr_time_s: int
     trip_id: str
+    # Position of dep_stop_id in the trip's stop order (arr stop is +1).
+    seq_index: int | None = None
 
 
 @dataclass(frozen=True, slots=True)
@@ -34,6 +39,146 @@ class GtfsTrip:
     trip_id: str
     route_id: str | None = None
     shape_id: str | None = None
+    direction_id: str | None = None
+    headsign: str | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class ShapeStopPosition:
+    """Where a stop sits on its trip's shape.
+
+    The stop projects onto the shape segment `segment -> segment + 1`, at
+    `along_m` meters from the start of the shape.
+    """
+
+    segment: int
+    along_m: float
+
+
+@dataclass(frozen=True, slots=True)
+class ShapePattern:
+    """Stops of a trip pattern (shape + stop sequence) located on the shape."""
+
+    shape_id: str
+    stop_ids: tuple[str, ...]
+    positions: tuple[ShapeStopPosition, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class ShapeIndex:
+    """Stop -> shape positions, shared by every trip of a pattern."""
+
+    patterns: tuple[ShapePattern, ...] = ()
+    pattern_by_trip: dict[str, int] = field(default_factory=dict)
+    cumulative_m_by_shape: dict[str, tuple[float, ...]] = field(default_factory=dict)
+
+    def pattern_for(self, trip_id: str) -> ShapePattern | None:
+        i = self.pattern_by_trip.get(trip_id)
+        return self.patterns[i] if i is not None else None
+
+    def position(self, trip_id: str, seq_index: int) -> ShapeStopPosition | None:
+        pattern = self.pattern_for(trip_id)
+        if pattern is None or not 0 <= seq_index < len(pattern.positions):
+            return None
+        return pattern.positions[seq_index]
+
+    def slice(
+        self,
+        trip_id: str,
+        dep_index: int,
+        arr_index: int,
+        points: tuple[GeoPoint, ...],
+        *,
+        start: GeoPoint,
+        end: GeoPoint,
+    ) -> tuple[GeoPoint, ...] | None:
+        """Shape geometry between two stops of a trip, without any search.
+
+        Returns None when the trip has no pattern or the stops are not in
+        increasing order along the shape.
+        """
+
+        a = self.position(trip_id, dep_index)
+        b = self.position(trip_id, arr_index)
+        if a is None or b is None or b.along_m < a.along_m:
+            return None
+        return (start, *points[a.segment + 1 : b.segment + 1], end)
+
+
+@dataclass(frozen=True, slots=True)
+class StopDeparture:
+    stop_id: str
+    dep_time_s: int
+    trip_id: str
+    route_id: str | None = None
+    headsign: str | None = None
+    seq_index: int | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class BoardDeparture:
+    """A departure-board row: schedule plus the realtime delay when known."""
+
+    departure: StopDeparture
+    scheduled_at: datetime
+    delay_s: int | None = None
+    route_short_name: str | None = None
+
+    @property
+    def expected_at(self) -> datetime:
+        if self.delay_s is None:
+            return self.scheduled_at
+        return self.scheduled_at + timedelta(seconds=self.delay_s)
+
+
+@dataclass(frozen=True, slots=True)
+class StopDepartureIndex:
+    """Departures per stop, sorted by time, for departure boards.
+
+    Each stop keeps the positions of its connections in the feed's
+    time-sorted `connections` plus a parallel array of departure times, so
+    "next N after t" is a binary search and a slice.
+    """
+
+    connection_ids_by_stop: dict[str, array]
+    dep_times_by_stop: dict[str, array]
+
+    def count_between(self, stop_id: str, start_s: int, end_s: int) -> int:
+        """Departures with start_s <= dep_time_s < end_s."""
+
+        times = self.dep_times_by_stop.get(stop_id)
+        if times is None:
+            return 0
+        return max(0, bisect_left(times, end_s) - bisect_left(times, start_s))
+
+    def next_departures(
+        self,
+        stop_id: str,
+        after_s: int,
+        limit: int,
+        *,
+        connections: tuple[Connection, ...],
+        trips_by_id: dict[str, GtfsTrip],
+    ) -> tuple[StopDeparture, ...]:
+        times = self.dep_times_by_stop.get(stop_id)
+        if times is None or limit <= 0:
+            return ()
+        start = bisect_left(times, after_s)
+        out: list[StopDeparture] = []
+        for ci in self.connection_ids_by_stop[stop_id][start : start + limit]:
+            c = connections[ci]
+            trip = trips_by_id.get(c.trip_id)
+            out.append(
+                StopDeparture(
+                    stop_id=stop_id,
+                    dep_time_s=c.dep_time_s,
+                    trip_id=c.trip_id,
+                    route_id=trip.route_id if trip else None,
+                    headsign=trip.headsign if trip else None,
+                    seq_index=c.seq_index,
+                )
+            )
+        return tuple(out)
 
 
 @dataclass(frozen=True, slots=True)
@@ -45,3 +190,10 @@ class GtfsFeed:
     routes_by_id: dict[str, GtfsRoute]
     trips_by_id: dict[str, GtfsTrip]
     shapes_by_id: dict[str, tuple[GeoPoint, ...]]
+    # Opaque fingerprint of the source files; None for ad-hoc feeds.
+    version: str | None = None
+    # Stop pattern and shape_dist_traveled per trip / shape, in stop_times
+    # order; inputs of the per-feed shape index (empty for ad-hoc feeds).
+    stop_ids_by_trip: dict[str, tuple[str, ...]] = field(default_factory=dict)
+    stop_dist_by_trip: dict[str, tuple[float | None, ...]] = field(default_factory=dict)
+    shape_dist_by_shape: dict[str, tuple[float, ...]] = field(default_factory=dict)
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass
+from typing import Any
+
+_INF = float("inf")
+
+
+@dataclass(frozen=True, slots=True)
+class LandmarkTable:
+    """Landmark distance tables for ALT (A*, Landmarks, Triangle inequality).
+
+    Distances are stored flat, row-major by node: entry `i * k + j` is the
+    distance for node index i and landmark j (inf when unreachable).
+    """
+
+    graph_version: str
+    landmarks: tuple[Any, ...]
+    index_by_node: dict[Any, int]
+    from_landmark_m: array  # d(L_j, v)
+    to_landmark_m: array  # d(v, L_j)
+
+    def lower_bound_m(self, node: Any, target: Any) -> float:
+        """Admissible lower bound on d(node, target) via the triangle inequality."""
+
+        i = self.index_by_node.get(node)
+        t = self.index_by_node.get(target)
+        if i is None or t is None:
+            return 0.0
+
+        k = len(self.landmarks)
+        best = 0.0
+        fr = self.from_landmark_m
+        to = self.to_landmark_m
+        for j in range(k):
+            # d(v, t) >= d(L, t) - d(L, v)
+            lt = fr[t * k + j]
+            lv = fr[i * k + j]
+            if lt != _INF and lv != _INF and lt - lv > best:
+                best = lt - lv
+            # d(v, t) >= d(v, L) - d(t, L)
+            vl = to[i * k + j]
+            tl = to[t * k + j]
+            if vl != _INF and tl != _INF and vl - tl > best:
+                best = vl - tl
+        return best
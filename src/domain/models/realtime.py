@@ -15,3 +15,73 @@ class RealtimeVehicle:
     speed_mps: float | None = None
     timestamp: datetime | None = None
     stop_id: str | None = None
+
+    @property
+    def key(self) -> str | None:
+        """Stable identity across feeds: vehicle_id, else trip_id."""
+
+        return self.vehicle_id or self.trip_id
+
+
+@dataclass(frozen=True, slots=True)
+class RealtimeSnapshot:
+    """Vehicles as served to a caller.
+
+    `fetched_at` is when the data was obtained (upstream fetch or schedule
+    evaluation); `is_cached` is True when it was not produced by this call.
+    """
+
+    vehicles: tuple[RealtimeVehicle, ...]
+    fetched_at: datetime | None = None
+    is_cached: bool = False
+    feed_timestamp: int | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class RealtimeVehicleChanges:
+    """Vehicles changed since a feed timestamp.
+
+    `removed` holds the keys of vehicles that left the feed. When `full` is
+    True the caller's timestamp was too old (or missing) and `upserted` is
+    the whole current set, replacing whatever the caller had.
+    """
+
+    feed_timestamp: int | None
+    upserted: tuple[RealtimeVehicle, ...]
+    removed: tuple[str, ...] = ()
+    full: bool = False
+
+
+@dataclass(frozen=True, slots=True)
+class VehicleTrail:
+    """Recent positions of one vehicle, oldest first (epoch seconds)."""
+
+    key: str
+    route_id: str | None
+    timestamps: tuple[float, ...]
+    lats: tuple[float, ...]
+    lons: tuple[float, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class VehicleMatch:
+    """A vehicle snapped onto its trip's shape.
+
+    (`lat`, `lon`) is the snapped point, `offset_m` the distance from the raw
+    GPS fix and `along_m` the distance from the start of the shape. When the
+    trip's stop pattern is known, the vehicle is between `prev_stop_id` and
+    `next_stop_id`, `stop_progress` (0..1) of the way.
+    """
+
+    key: str | None
+    trip_id: str | None
+    route_id: str | None
+    shape_id: str
+    lat: float
+    lon: float
+    offset_m: float
+    along_m: float
+    shape_length_m: float
+    prev_stop_id: str | None = None
+    next_stop_id: str | None = None
+    stop_progress: float | None = None
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any
+
+
+@dataclass(frozen=True, slots=True)
+class StopSnap:
+    """A GTFS stop snapped onto the street graph."""
+
+    stop_id: str
+    node: Any
+    distance_m: float
+    street_name: str | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class StopSnapTable:
+    """Precomputed stop -> street node table for one (feed, graph) pair."""
+
+    feed_version: str
+    graph_version: str
+    snaps_by_stop_id: dict[str, StopSnap] = field(default_factory=dict)
+
+    def matches(self, *, feed_version: str, graph_version: str) -> bool:
+        return self.feed_version == feed_version and self.graph_version == graph_version
+
+    def node_for(self, stop_id: str) -> Any | None:
+        snap = self.snaps_by_stop_id.get(stop_id)
+        return snap.node if snap is not None else None
@@ -2,14 +2,57 @@ from __future__ import annotations
 
 import logging
 import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
 
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 
 from src.adapters.api.controllers.realtime import router as realtime_router
 from src.adapters.api.controllers.routes import router as routes_router
+from src.adapters.api.dependencies import (
+    get_routing_executor,
+    peek_routing_executor,
+    peek_vehicle_stream_hub,
+)
+from src.app.services.route_cache import shared_route_cache
+from src.app.services.walk_cache import shared_walk_cache
 
-app = FastAPI(title="UrbanPath")
+
+def _realtime_provider():
+    if not os.getenv("GTFS_RT_VEHICLE_POSITIONS_URL"):
+        return None
+    from src.adapters.realtime.http_gtfs_realtime_vehicle_provider import (
+        shared_http_vehicle_provider,
+    )
+
+    return shared_http_vehicle_provider()
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    # Keep the GTFS-RT snapshot warm so /realtime/vehicles never waits on upstream.
+    provider = _realtime_provider()
+    refresh_raw = (os.getenv("GTFS_RT_BACKGROUND_REFRESH") or "").strip().lower()
+    if provider is not None and refresh_raw not in {"0", "false", "no", "off"}:
+        await provider.start()
+    # Spawn routing workers now so their feed/graph loading is not on a request.
+    executor = get_routing_executor()
+    if executor is not None:
+        await executor.start()
+    try:
+        yield
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        hub = peek_vehicle_stream_hub()
+        if hub is not None:
+            await hub.aclose()
+        if provider is not None:
+            await provider.aclose()
+
+
+app = FastAPI(title="UrbanPath", lifespan=lifespan)
 app.include_router(routes_router)
 app.include_router(realtime_router)
 
@@ -44,3 +87,23 @@ async def unhandled_exception_handler(request: Request, exc: Exception) -> JSONR
 @app.get("/health")
 def health() -> dict[str, str]:
     return {"status": "ok"}
+
+
+@app.get("/metrics")
+def metrics() -> dict[str, dict[str, float | int]]:
+    """Per-process cache statistics (hits/misses/evictions)."""
+
+    out = {
+        "walk_cache": shared_walk_cache().stats(),
+        "route_cache": shared_route_cache().stats(),
+    }
+    provider = _realtime_provider()
+    if provider is not None:
+        out["gtfs_rt"] = provider.stats()
+    hub = peek_vehicle_stream_hub()
+    if hub is not None:
+        out["vehicle_stream"] = {"subscribers": hub.subscribers, "version": hub.version}
+    executor = peek_routing_executor()
+    if executor is not None:
+        out["routing_executor"] = executor.stats()
+    return out
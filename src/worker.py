@@ -4,20 +4,33 @@ import os
 import time
 from datetime import datetime
 
-from src.adapters.maps.osmnx_map_adapter import OSMnxMapAdapter
-from src.adapters.maps.s3_cached_map_adapter import S3CachedMapAdapter
 from src.adapters.messaging.sqs_queue_adapter import SQSQueueAdapter
 from src.adapters.persistence.dynamodb_route_result_repository import (
     DynamoDbRouteResultRepository,
 )
 from src.adapters.persistence.local_gtfs_repository import LocalGtfsRepository
-from src.app.ports.output import IMapProvider
-from src.app.services.multimodal_routing_service import MultimodalRoutingService
+from src.adapters.routing_factory import build_routing_service
+from src.domain.algorithms.polyline import GeometryFormat, path_for_response
 from src.domain.models import GeoPoint
-from src.domain.models.route import Route
+from src.domain.models.route import Route, RouteLeg
 
 
-def _route_to_dict(route: Route) -> dict:
+def _leg_path(
+    leg: RouteLeg, geometry: GeometryFormat, simplify_m: float | None
+) -> tuple[list[dict] | None, str | None]:
+    pts, encoded = path_for_response(leg.path, geometry=geometry, simplify_m=simplify_m)
+    if pts is None:
+        return None, encoded
+    return [{"lat": p.lat, "lon": p.lon} for p in pts], None
+
+
+def _route_to_dict(
+    route: Route,
+    *,
+    geometry: GeometryFormat = "points",
+    simplify_m: float | None = None,
+) -> dict:
+    legs = [(leg, *_leg_path(leg, geometry, simplify_m)) for leg in route.legs]
     return {
         "origin": {"lat": route.origin.lat, "lon": route.origin.lon},
         "destination": {"lat": route.destination.lat, "lon": route.destination.lon},
@@ -34,11 +47,8 @@ def _route_to_dict(route: Route) -> dict:
                 "arrive_at": leg.arrive_at.isoformat() if leg.arrive_at else None,
                 "distance_m": leg.distance_m,
                 "duration_s": leg.duration_s,
-                "path": (
-                    [{"lat": p.lat, "lon": p.lon} for p in leg.path]
-                    if leg.path
-                    else None
-                ),
+                "path": path,
+                "path_polyline": path_polyline,
                 "line": (
                     {
                         "route_id": leg.line.route_id,
@@ -52,7 +62,7 @@ def _route_to_dict(route: Route) -> dict:
                 ),
                 "trip_id": leg.trip_id,
             }
-            for leg in route.legs
+            for leg, path, path_polyline in legs
         ],
         "total_distance_m": route.total_distance_m,
         "total_duration_s": route.total_duration_s,
@@ -63,16 +73,8 @@ def main() -> None:
     queue = SQSQueueAdapter()
     results = DynamoDbRouteResultRepository()
 
-    base_provider: IMapProvider = OSMnxMapAdapter(network_type="walk")
-    map_provider: IMapProvider = base_provider
-    if os.getenv("STREET_GRAPH_BUCKET"):
-        map_provider = S3CachedMapAdapter(upstream=base_provider)
-
-    router = MultimodalRoutingService(
-        gtfs_repository=LocalGtfsRepository(),
-        map_provider=map_provider,
-        queue_service=None,
-    )
+    # The worker never enqueues: it is the queue consumer.
+    router = build_routing_service(LocalGtfsRepository())
 
     loop = os.getenv("WORKER_LOOP", "1").strip().lower() not in {"0", "false", "no"}
 
@@ -110,7 +112,18 @@ def main() -> None:
                     preference=preference,
                 )
 
-                results.put_success(request_id=request_id, result=_route_to_dict(route))
+                geometry: GeometryFormat = (
+                    "polyline" if msg.get("geometry") == "polyline" else "points"
+                )
+                simplify_raw = msg.get("simplify_m")
+                results.put_success(
+                    request_id=request_id,
+                    result=_route_to_dict(
+                        route,
+                        geometry=geometry,
+                        simplify_m=float(simplify_raw) if simplify_raw else None,
+                    ),
+                )
             except Exception as exc:
                 # Best-effort: record error; message already deleted by adapter.
                 try:
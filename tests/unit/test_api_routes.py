@@ -5,7 +5,12 @@ from datetime import datetime
 import httpx
 import pytest
 
-from src.adapters.api.dependencies import get_route_jobs_service, get_routing_service
+from src.adapters.api.dependencies import (
+    get_route_jobs_service,
+    get_routing_executor,
+    get_threadpool_routing_service,
+)
+from src.domain.algorithms.polyline import decode_polyline
 from src.domain.models import GeoPoint, Route, RouteLeg, TravelMode
 from src.main import app
 
@@ -26,6 +31,7 @@ class _FakeMultimodalRoutingService:
             distance_m=123.0,
             duration_s=456.0,
             stops=(),
+            path=(origin, destination),
         )
         return Route(origin=origin, destination=destination, legs=(leg,))
 
@@ -48,6 +54,8 @@ class _FakeJobsService:
         destination: GeoPoint,
         depart_at: datetime,
         preference: str,
+        geometry: str = "points",
+        simplify_m: float | None = None,
     ) -> str:
         raise RuntimeError("Queue service not configured")
 
@@ -58,7 +66,7 @@ async def test_post_routes_returns_route() -> None:
     def _override():
         return _FakeMultimodalRoutingService()
 
-    app.dependency_overrides[get_routing_service] = _override
+    app.dependency_overrides[get_threadpool_routing_service] = _override
 
     transport = httpx.ASGITransport(app=app)
     async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
@@ -79,6 +87,58 @@ async def test_post_routes_returns_route() -> None:
     assert payload["legs"][0]["mode"] == "walk"
 
 
+@pytest.mark.unit
+@pytest.mark.anyio
+async def test_post_routes_can_return_encoded_polylines() -> None:
+    def _override():
+        return _FakeMultimodalRoutingService()
+
+    app.dependency_overrides[get_threadpool_routing_service] = _override
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.post(
+            "/routes",
+            json={
+                "origin": {"lat": 28.12, "lon": -15.43},
+                "destination": {"lat": 28.121, "lon": -15.431},
+                "geometry": "polyline",
+                "simplify_m": 2.0,
+            },
+        )
+
+    app.dependency_overrides.clear()
+
+    assert resp.status_code == 200
+    leg = resp.json()["legs"][0]
+    assert leg["path"] is None
+    assert decode_polyline(leg["path_polyline"]) == [
+        GeoPoint(lat=28.12, lon=-15.43),
+        GeoPoint(lat=28.121, lon=-15.431),
+    ]
+
+
+@pytest.mark.unit
+@pytest.mark.anyio
+async def test_post_routes_is_503_without_a_service_or_pool() -> None:
+    app.dependency_overrides[get_threadpool_routing_service] = lambda: None
+    app.dependency_overrides[get_routing_executor] = lambda: None
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.post(
+            "/routes",
+            json={
+                "origin": {"lat": 28.12, "lon": -15.43},
+                "destination": {"lat": 28.121, "lon": -15.431},
+            },
+        )
+
+    app.dependency_overrides.clear()
+
+    assert resp.status_code == 503
+
+
 @pytest.mark.unit
 @pytest.mark.anyio
 async def test_post_routes_async_requires_queue_configured() -> None:
@@ -114,6 +174,8 @@ async def test_post_routes_async_returns_request_id_when_configured() -> None:
             destination: GeoPoint,
             depart_at: datetime,
             preference: str,
+            geometry: str = "points",
+            simplify_m: float | None = None,
         ) -> str:
             return "req-123"
 
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from src.domain.algorithms.bbox_grid import BBoxGrid
+from src.domain.models.geo import BoundingBox
+
+
+def test_query_matches_a_full_scan() -> None:
+    rng = random.Random(11)
+    points = [
+        (28.0 + rng.random() * 0.2, -15.6 + rng.random() * 0.3) for _ in range(2000)
+    ]
+    grid = BBoxGrid.build(
+        range(len(points)), lat_lon=points.__getitem__, cell_deg=0.005
+    )
+
+    for _ in range(50):
+        lat0, lon0 = 28.0 + rng.random() * 0.2, -15.6 + rng.random() * 0.3
+        box = BoundingBox(
+            min_lat=lat0,
+            min_lon=lon0,
+            max_lat=lat0 + rng.random() * 0.1,
+            max_lon=lon0 + rng.random() * 0.1,
+        )
+        expected = {i for i, (lat, lon) in enumerate(points) if box.contains(lat, lon)}
+        assert set(grid.query(box)) == expected
+
+    world = BoundingBox(min_lat=-90.0, min_lon=-180.0, max_lat=90.0, max_lon=180.0)
+    assert len(grid.query(world)) == len(points)
+    assert len(grid.query(world, limit=10)) == 10
+
+
+def test_invalid_bbox_is_rejected() -> None:
+    with pytest.raises(ValueError):
+        BoundingBox(min_lat=1.0, min_lon=0.0, max_lat=0.0, max_lon=1.0)
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import asyncio
+import random
+from dataclasses import dataclass
+from datetime import datetime
+
+from src.app.ports.output import IRealtimeVehicleProvider
+from src.app.services.realtime_view_service import RealtimeViewService
+from src.domain.algorithms.departure_index import build_departure_index
+from src.domain.models import GeoPoint, Stop
+from src.domain.models.gtfs import Connection, GtfsFeed, GtfsRoute, GtfsTrip
+from src.domain.models.realtime import RealtimeVehicle
+
+
+@dataclass(slots=True)
+class FakeGtfsRepository:
+    feed: GtfsFeed
+
+    def load_feed(self) -> GtfsFeed:
+        return self.feed
+
+
+@dataclass(slots=True)
+class FakeDelayProvider(IRealtimeVehicleProvider):
+    delays: dict[str, int]
+
+    async def list_vehicles(self) -> tuple[RealtimeVehicle, ...]:
+        return ()
+
+    async def trip_delays(self) -> dict[str, int]:
+        return self.delays
+
+
+def _conn(stop: str, dep_s: int, trip_id: str) -> Connection:
+    return Connection(
+        dep_stop_id=stop,
+        arr_stop_id="Z",
+        dep_time_s=dep_s,
+        arr_time_s=dep_s + 60,
+        trip_id=trip_id,
+        seq_index=0,
+    )
+
+
+def test_next_departures_match_a_full_scan() -> None:
+    rng = random.Random(3)
+    conns = tuple(
+        _conn(rng.choice("ABC"), rng.randrange(0, 30 * 3600), f"T{i}")
+        for i in range(500)
+    )  # deliberately unsorted
+    trips = {c.trip_id: GtfsTrip(c.trip_id, route_id="R", headsign="H") for c in conns}
+    index = build_departure_index(conns)
+
+    for _ in range(30):
+        t = rng.randrange(0, 30 * 3600)
+        got = index.next_departures("B", t, 5, connections=conns, trips_by_id=trips)
+        expected = sorted(
+            c.dep_time_s for c in conns if c.dep_stop_id == "B" and c.dep_time_s >= t
+        )
+        assert [d.dep_time_s for d in got] == expected[:5]
+        assert all(d.route_id == "R" and d.headsign == "H" for d in got)
+
+
+def _feed() -> GtfsFeed:
+    conns = (
+        _conn("A", 7 * 3600 + 50 * 60, "late"),  # 07:50, runs 15 min late
+        _conn("A", 8 * 3600 + 5 * 60, "on_time"),  # 08:05
+        _conn("A", 24 * 3600 + 8 * 3600 + 10 * 60, "overnight"),  # previous day
+        _conn("A", 9 * 3600, "later"),
+    )
+    return GtfsFeed(
+        stops_by_id={
+            "A": Stop(id="A", name="Alpha", location=GeoPoint(lat=0.0, lon=0.0)),
+            "Z": Stop(id="Z", name="Zeta", location=GeoPoint(lat=0.0, lon=0.1)),
+        },
+        connections=tuple(sorted(conns, key=lambda c: c.dep_time_s)),
+        routes_by_id={"R1": GtfsRoute(route_id="R1", short_name="12")},
+        trips_by_id={
+            t: GtfsTrip(t, route_id="R1", headsign="Teror")
+            for t in ("late", "on_time", "overnight", "later")
+        },
+        shapes_by_id={},
+    )
+
+
+def test_stop_departures_merge_delays_and_overnight_trips() -> None:
+    svc = RealtimeViewService(
+        gtfs_repository=FakeGtfsRepository(_feed()),
+        vehicle_provider=FakeDelayProvider({"late": 15 * 60}),
+    )
+    now = datetime(2026, 1, 8, 8, 0, 0)
+
+    stop, rows = asyncio.run(svc.stop_departures(stop_id="A", limit=3, now=now))
+
+    assert stop.name == "Alpha"
+    assert [r.departure.trip_id for r in rows] == ["late", "on_time", "overnight"]
+    assert rows[0].expected_at == datetime(2026, 1, 8, 8, 5, 0)
+    assert rows[0].delay_s == 900 and rows[1].delay_s is None
+    assert rows[2].scheduled_at == datetime(2026, 1, 8, 8, 10, 0)
+    assert rows[0].route_short_name == "12"
+    assert asyncio.run(svc.stop_departures(stop_id="missing", now=now)) is None
+
+
+def test_stop_departures_without_realtime_use_the_schedule() -> None:
+    svc = RealtimeViewService(gtfs_repository=FakeGtfsRepository(_feed()))
+    now = datetime(2026, 1, 8, 8, 0, 0)
+
+    _, rows = asyncio.run(svc.stop_departures(stop_id="A", limit=10, now=now))
+
+    # The 32:10 trip runs twice: yesterday's service today, today's tomorrow.
+    assert [r.departure.trip_id for r in rows] == [
+        "on_time",
+        "overnight",
+        "later",
+        "overnight",
+    ]
+    assert rows[-1].scheduled_at == datetime(2026, 1, 9, 8, 10, 0)
+
+
+def test_departure_index_is_built_once_per_feed_version(monkeypatch) -> None:
+    from dataclasses import replace
+
+    from src.app.services import realtime_view_service as rvs
+
+    builds: list[int] = []
+
+    def _counting_build(connections):
+        builds.append(len(connections))
+        return build_departure_index(connections)
+
+    monkeypatch.setattr(rvs, "build_departure_index", _counting_build)
+    rvs._departure_indexes.clear()
+
+    class ReloadingRepository:
+        # Like LocalGtfsRepository: a fresh feed object per call, same version.
+        def load_feed(self) -> GtfsFeed:
+            return replace(_feed(), version="feed-1")
+
+    svc = RealtimeViewService(gtfs_repository=ReloadingRepository())
+    now = datetime(2026, 1, 8, 8, 0, 0)
+    for _ in range(3):
+        asyncio.run(svc.stop_departures(stop_id="A", now=now))
+
+    assert builds == [4]
+    rvs._departure_indexes.clear()
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from src.domain.algorithms.geo_utils import haversine_m
+from src.domain.algorithms.geodesic import (
+    as_arrays,
+    consecutive_distances_m,
+    cumulative_distances_m,
+    distances_from_m,
+    project_onto_polyline,
+)
+from src.domain.models import GeoPoint
+
+
+def _polyline() -> list[GeoPoint]:
+    return [
+        GeoPoint(lat=28.100, lon=-15.430),
+        GeoPoint(lat=28.100, lon=-15.420),
+        GeoPoint(lat=28.110, lon=-15.420),
+        GeoPoint(lat=28.110, lon=-15.410),
+    ]
+
+
+def test_batch_distances_match_scalar_haversine() -> None:
+    pts = _polyline()
+    lats, lons = as_arrays(pts)
+
+    segs = consecutive_distances_m(lats, lons)
+    expected = [haversine_m(a.lat, a.lon, b.lat, b.lon) for a, b in zip(pts, pts[1:])]
+    assert segs.tolist() == pytest.approx(expected)
+    assert cumulative_distances_m(lats, lons).tolist() == pytest.approx(
+        np.concatenate([[0.0], np.cumsum(expected)]).tolist()
+    )
+    assert distances_from_m(pts[0].lat, pts[0].lon, lats, lons)[2] == pytest.approx(
+        haversine_m(pts[0].lat, pts[0].lon, pts[2].lat, pts[2].lon)
+    )
+    assert cumulative_distances_m(*as_arrays([])).tolist() == []
+
+
+def test_project_onto_polyline_finds_the_closest_segment() -> None:
+    lats, lons = as_arrays(_polyline())
+    cum = cumulative_distances_m(lats, lons)
+
+    # Just east of the middle of the second (northbound) segment.
+    proj = project_onto_polyline(28.105, -15.4198, lats, lons)
+
+    assert proj is not None
+    assert proj.index == 1
+    assert proj.t == pytest.approx(0.5, abs=1e-6)
+    assert proj.lon == pytest.approx(-15.42)
+    assert proj.distance_m == pytest.approx(19.6, abs=0.5)
+    assert proj.along_m == pytest.approx(cum[1] + (cum[2] - cum[1]) / 2)
+
+    # Beyond the end clamps to the last vertex.
+    end = project_onto_polyline(28.11, -15.40, lats, lons)
+    assert end is not None and (end.index, end.t) == (2, 1.0)
+    assert project_onto_polyline(0.0, 0.0, *as_arrays([])) is None
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import networkx as nx
+import pytest
+
+from src.adapters.maps.graph_preprocessing import preprocess_walk_graph
+
+
+def _two_way(g: nx.MultiDiGraph, a: int, b: int, length: float, **attrs) -> None:
+    g.add_edge(a, b, length=length, **attrs)
+    g.add_edge(b, a, length=length, **attrs)
+
+
+def _street_graph() -> nx.MultiDiGraph:
+    # Junction 1 with three branches; 2-3 is a degree-2 chain towards 4,
+    # 5 is a dead end, and 8-9 is an island unreachable from the rest.
+    g = nx.MultiDiGraph(crs="epsg:4326")
+    coords = {1: (0, 0), 2: (1, 0), 3: (2, 0), 4: (3, 0), 5: (0, 1), 6: (0, -1)}
+    coords.update({8: (9, 9), 9: (9, 10)})
+    for n, (x, y) in coords.items():
+        g.add_node(n, x=x * 0.001, y=y * 0.001, street_count=2)
+    _two_way(g, 1, 2, 100.0, name="Calle A", osmid=11, highway="footway")
+    _two_way(g, 2, 3, 100.0, name="Calle A", osmid=12)
+    _two_way(g, 3, 4, 150.0, name="Calle B", osmid=13)
+    _two_way(g, 4, 1, 500.0, name="Calle C")
+    _two_way(g, 1, 5, 80.0)
+    _two_way(g, 1, 6, 80.0)
+    _two_way(g, 8, 9, 50.0)
+    return g
+
+
+def test_preprocess_keeps_largest_component_and_strips_attributes() -> None:
+    g = _street_graph()
+
+    out, stats = preprocess_walk_graph(g, contract=False)
+
+    assert 8 not in out and 9 not in out
+    assert stats.components_dropped == 1
+    assert stats.nodes_pruned == 2
+    assert all(set(d) <= {"x", "y"} for _, d in out.nodes(data=True))
+    assert all(
+        set(d) <= {"length", "name", "geometry"} for *_, d in out.edges(data=True)
+    )
+    # The input graph is left untouched.
+    assert g.nodes[1]["street_count"] == 2
+
+
+def test_preprocess_contracts_chains_with_geometry_and_lengths() -> None:
+    g = _street_graph()
+    expected = nx.shortest_path_length(g, 1, 4, weight="length")
+
+    out, stats = preprocess_walk_graph(g)
+
+    assert 2 not in out and 3 not in out
+    assert stats.nodes_contracted >= 2
+    assert nx.shortest_path_length(out, 1, 4, weight="length") == pytest.approx(
+        expected
+    )
+    data = min(out[1][4].values(), key=lambda d: d["length"])
+    xs = [x for x, _ in data["geometry"].coords]
+    assert xs == pytest.approx([0.0, 0.001, 0.002, 0.003])
+    assert data["name"] == "Calle A"
+    # The reverse shortcut follows the street backwards.
+    back = min(out[4][1].values(), key=lambda d: d["length"])
+    assert [x for x, _ in back["geometry"].coords] == pytest.approx(xs[::-1])
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import pytest
+
+from src.adapters.realtime.http_gtfs_realtime_vehicle_provider import (
+    HttpGtfsRealtimeVehicleProvider,
+)
+
+gtfs_realtime_pb2 = pytest.importorskip("google.transit.gtfs_realtime_pb2")
+
+
+def _feed_bytes(n: int) -> bytes:
+    feed = gtfs_realtime_pb2.FeedMessage()
+    feed.header.gtfs_realtime_version = "2.0"
+    for i in range(n):
+        ent = feed.entity.add(id=f"e{i}")
+        ent.vehicle.vehicle.id = f"v{i}"
+        ent.vehicle.trip.route_id = "R1"
+        ent.vehicle.position.latitude = 28.1 + i * 0.001
+        ent.vehicle.position.longitude = -15.4
+    return feed.SerializeToString()
+
+
+def _provider(handler, **kwargs) -> HttpGtfsRealtimeVehicleProvider:
+    return HttpGtfsRealtimeVehicleProvider(
+        url="http://rt.test/vehicles",
+        headers_raw="",
+        transport=httpx.MockTransport(handler),
+        **kwargs,
+    )
+
+
+def test_conditional_get_skips_parsing_on_304() -> None:
+    seen: list[str | None] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.headers.get("if-none-match"))
+        if request.headers.get("if-none-match") == '"a"':
+            return httpx.Response(304)
+        return httpx.Response(200, content=_feed_bytes(3), headers={"ETag": '"a"'})
+
+    async def run():
+        provider = _provider(handler, cache_ttl_s=0.0, max_stale_s=0.0)
+        first = await provider.snapshot()
+        second = await provider.snapshot()
+        await provider.aclose()
+        return provider, first, second
+
+    provider, first, second = asyncio.run(run())
+
+    assert seen == [None, '"a"']
+    assert len(first.vehicles) == 3 and not first.is_cached
+    assert second.vehicles is first.vehicles
+    assert (provider.fetches, provider.not_modified) == (2, 1)
+
+
+def test_stale_snapshot_is_served_while_revalidating() -> None:
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        return httpx.Response(200, content=_feed_bytes(calls))
+
+    async def run():
+        provider = _provider(handler, cache_ttl_s=0.0, max_stale_s=60.0)
+        cold = await provider.snapshot()
+        stale = await provider.snapshot()
+        await provider._revalidate_task
+        fresh = provider._snapshot
+        await provider.aclose()
+        return cold, stale, fresh
+
+    cold, stale, fresh = asyncio.run(run())
+
+    assert not cold.is_cached and len(cold.vehicles) == 1
+    assert stale.is_cached and len(stale.vehicles) == 1
+    assert fresh is not None and len(fresh.vehicles) == 2
+
+
+def test_upstream_error_keeps_last_snapshot() -> None:
+    responses = [httpx.Response(200, content=_feed_bytes(2)), httpx.Response(503)]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return responses.pop(0)
+
+    async def run():
+        provider = _provider(handler, cache_ttl_s=0.0, max_stale_s=0.0)
+        await provider.snapshot()
+        snap = await provider.snapshot()
+        await provider.aclose()
+        return provider, snap
+
+    provider, snap = asyncio.run(run())
+
+    assert snap.is_cached and len(snap.vehicles) == 2
+    assert provider.errors == 1
+
+
+def test_changes_since_returns_only_moved_vehicles() -> None:
+    bodies = [_feed_bytes(3), _feed_bytes(3)]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = bodies.pop(0)
+        if not bodies:
+            feed = gtfs_realtime_pb2.FeedMessage()
+            feed.ParseFromString(body)
+            feed.header.timestamp = 2000
+            feed.entity[1].vehicle.position.latitude = 28.5
+            body = feed.SerializeToString()
+        return httpx.Response(200, content=body)
+
+    async def run():
+        provider = _provider(handler, cache_ttl_s=0.0, max_stale_s=0.0)
+        first = await provider.snapshot()
+        delta = await provider.changes_since(first.feed_timestamp)
+        await provider.aclose()
+        return first, delta
+
+    first, delta = asyncio.run(run())
+
+    assert delta.feed_timestamp == 2000 and not delta.full
+    assert [v.vehicle_id for v in delta.upserted] == ["v1"]
+    assert delta.removed == ()
+
+
+def test_trip_delays_from_trip_updates() -> None:
+    feed = gtfs_realtime_pb2.FeedMessage()
+    feed.header.gtfs_realtime_version = "2.0"
+    a = feed.entity.add(id="a").trip_update
+    a.trip.trip_id = "T1"
+    a.delay = 120
+    b = feed.entity.add(id="b").trip_update
+    b.trip.trip_id = "T2"
+    b.stop_time_update.add(stop_sequence=4).arrival.delay = -30
+    body = feed.SerializeToString()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.url.path == "/trip-updates"
+        return httpx.Response(200, content=body)
+
+    async def run():
+        provider = _provider(handler)
+        provider.trip_updates_url = "http://rt.test/trip-updates"
+        delays = await provider.trip_delays()
+        await provider.aclose()
+        return delays
+
+    assert asyncio.run(run()) == {"T1": 120, "T2": -30}
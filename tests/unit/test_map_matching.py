@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+from src.domain.algorithms.map_matching import ShapeSegmentIndex, match_vehicles
+from src.domain.algorithms.shape_projection import build_shape_index
+from src.domain.models import GeoPoint, RealtimeVehicle, Stop
+from src.domain.models.gtfs import GtfsTrip
+
+# East along lat 0 for ~1.1 km, 11 vertices; a parallel shape 0.01 deg north.
+_EAST = tuple(GeoPoint(lat=0.0, lon=i * 0.001) for i in range(11))
+_NORTH = tuple(GeoPoint(lat=0.01, lon=i * 0.001) for i in range(11))
+_M_PER_DEG = math.radians(1.0) * 6371000.0
+
+
+def _vehicle(key: str, lat: float, lon: float, *, trip="T1", route="R1"):
+    return RealtimeVehicle(
+        vehicle_id=key, trip_id=trip, route_id=route, lat=lat, lon=lon
+    )
+
+
+def test_project_batch_snaps_each_point_onto_its_own_shape() -> None:
+    index = ShapeSegmentIndex.build({"E": _EAST, "N": _NORTH}, cell_deg=0.002)
+    assert len(index) == 20
+
+    proj = index.project(
+        ["E", "N", "E", None],
+        np.array([0.0002, 0.0098, 0.01, 0.0]),
+        np.array([0.0035, 0.0051, 0.005, 0.005]),
+        max_distance_m=50.0,
+    )
+
+    assert proj.segment.tolist()[:2] == [3, 15]
+    assert proj.lat[0] == 0.0 and abs(proj.lon[0] - 0.0035) < 1e-12
+    assert abs(proj.distance_m[0] - 0.0002 * _M_PER_DEG) < 0.1
+    assert abs(proj.along_m[0] - 0.0035 * _M_PER_DEG) < 0.5
+    assert abs(proj.along_m[1] - 0.0051 * _M_PER_DEG * math.cos(math.radians(0.01))) < 1
+    # Too far from its shape, and no shape at all.
+    assert proj.segment.tolist()[2:] == [-1, -1]
+
+
+def test_match_vehicles_reports_progress_between_stops() -> None:
+    stops = {
+        sid: Stop(id=sid, name=sid, location=GeoPoint(lat=0.0, lon=lon))
+        for sid, lon in {"A": 0.0, "B": 0.004, "C": 0.01}.items()
+    }
+    trips = {"T1": GtfsTrip(trip_id="T1", route_id="R1", shape_id="E")}
+    shape_index = build_shape_index(
+        trips_by_id=trips,
+        shapes_by_id={"E": _EAST},
+        stops_by_id=stops,
+        stop_ids_by_trip={"T1": ("A", "B", "C")},
+    )
+    segments = ShapeSegmentIndex.build(
+        {"E": _EAST}, cumulative_m_by_shape=shape_index.cumulative_m_by_shape
+    )
+
+    matches = match_vehicles(
+        [
+            _vehicle("v1", 0.0001, 0.007),
+            _vehicle("v2", 0.0001, 0.002, trip="unknown"),
+            _vehicle("v3", 0.05, 0.002),
+        ],
+        segments=segments,
+        trips_by_id=trips,
+        shape_index=shape_index,
+        shape_by_route={"R1": "E"},
+    )
+
+    v1, v2 = matches
+    assert (v1.key, v1.shape_id) == ("v1", "E")
+    assert (v1.prev_stop_id, v1.next_stop_id) == ("B", "C")
+    assert abs(v1.stop_progress - 0.5) < 1e-6
+    assert abs(v1.shape_length_m - 0.01 * _M_PER_DEG) < 1
+    # Route fallback gives the shape but no stop pattern.
+    assert v2.shape_id == "E" and v2.stop_progress is None
@@ -6,7 +6,7 @@ from datetime import datetime, timedelta
 import networkx as nx
 
 from src.app.services.multimodal_routing_service import MultimodalRoutingService
-from src.domain.models import GeoPoint, Stop
+from src.domain.models import GeoPoint, LandmarkTable, Stop, StopSnapTable
 from src.domain.models.gtfs import Connection, GtfsFeed, GtfsRoute, GtfsTrip
 
 
@@ -197,3 +197,435 @@ def test_service_datetime_from_seconds_rolls_over_24h() -> None:
     assert dt.hour == 1
     assert dt.minute == 0
     assert dt.second == 10
+
+
+def test_calculate_route_runs_one_walk_search_per_side(monkeypatch) -> None:
+    from src.app.services import multimodal_routing_service as mrs
+
+    calls: list[bool] = []
+    real_walk_search = mrs.walk_search
+
+    def _counting_walk_search(graph, source, **kwargs):
+        calls.append(bool(kwargs.get("reverse")))
+        return real_walk_search(graph, source, **kwargs)
+
+    monkeypatch.setattr(mrs, "walk_search", _counting_walk_search)
+
+    origin = GeoPoint(lat=0.0, lon=0.0)
+    destination = GeoPoint(lat=0.02, lon=0.0)
+    depart_s = 8 * 3600
+    stops = {
+        sid: Stop(id=sid, name=sid, location=GeoPoint(lat=lat, lon=0.0))
+        for sid, lat in (("A", 0.0), ("A2", 0.001), ("B", 0.02), ("B2", 0.019))
+    }
+    feed = GtfsFeed(
+        stops_by_id=stops,
+        connections=(
+            Connection(
+                dep_stop_id="A",
+                arr_stop_id="B",
+                dep_time_s=depart_s + 300,
+                arr_time_s=depart_s + 900,
+                trip_id="T1",
+            ),
+        ),
+        routes_by_id={},
+        trips_by_id={"T1": GtfsTrip(trip_id="T1")},
+        shapes_by_id={},
+    )
+
+    service = MultimodalRoutingService(
+        gtfs_repository=FakeGtfsRepository(feed),
+        map_provider=FakeMapProvider(_tiny_graph()),
+    )
+    route = service.calculate_route(
+        origin=origin,
+        destination=destination,
+        depart_at=datetime(2026, 1, 8, 8, 0, 0),
+        preference="fastest",
+    )
+
+    assert [leg.mode.value for leg in route.legs] == ["walk", "bus", "walk"]
+    assert calls == [False, True]
+
+
+def test_access_search_is_bounded_when_a_candidate_is_unreachable(
+    monkeypatch,
+) -> None:
+    from src.app.services import multimodal_routing_service as mrs
+
+    settled: list[set] = []
+    real_walk_search = mrs.walk_search
+
+    def _recording_walk_search(graph, source, **kwargs):
+        tree = real_walk_search(graph, source, **kwargs)
+        settled.append(set(tree.dist_m))
+        return tree
+
+    monkeypatch.setattr(mrs, "walk_search", _recording_walk_search)
+
+    graph = _tiny_graph()
+    # Stop X snaps to an island; a long tail hangs off the reachable part.
+    graph.add_node(9, x=0.001, y=0.001)
+    for node, prev in ((10, 3), (11, 10), (12, 11)):
+        graph.add_node(node, x=float(node), y=1.0)
+        graph.add_edge(prev, node, length=5000.0)
+    stops = {
+        "A": Stop(id="A", name="A", location=GeoPoint(lat=0.0, lon=0.0)),
+        "X": Stop(id="X", name="X", location=GeoPoint(lat=0.001, lon=0.001)),
+    }
+    feed = GtfsFeed(
+        stops_by_id=stops,
+        connections=(),
+        routes_by_id={},
+        trips_by_id={},
+        shapes_by_id={},
+    )
+    service = MultimodalRoutingService(
+        gtfs_repository=FakeGtfsRepository(feed),
+        map_provider=FakeMapProvider(graph),
+    )
+
+    walks = service._access_walks(
+        graph, GeoPoint(lat=0.0, lon=0.0), list(stops.values()), reverse=False
+    )
+
+    assert set(walks) == {"A"}
+    assert settled == [{1, 2, 3}]
+
+
+@dataclass(slots=True)
+class FakeStopSnapRepository:
+    table: StopSnapTable | None = None
+    saves: int = 0
+
+    def load(self) -> StopSnapTable | None:
+        return self.table
+
+    def save(self, table: StopSnapTable) -> None:
+        self.table = table
+        self.saves += 1
+
+
+def test_stop_snap_table_is_prepared_once_and_only_loaded_per_request(
+    monkeypatch,
+) -> None:
+    from src.app.services import multimodal_routing_service as mrs
+
+    origin = GeoPoint(lat=0.0, lon=0.0)
+    destination = GeoPoint(lat=0.02, lon=0.0)
+    depart_s = 8 * 3600
+    feed = GtfsFeed(
+        stops_by_id={
+            "A": Stop(id="A", name="A", location=origin),
+            "B": Stop(id="B", name="B", location=destination),
+        },
+        connections=(
+            Connection(
+                dep_stop_id="A",
+                arr_stop_id="B",
+                dep_time_s=depart_s + 300,
+                arr_time_s=depart_s + 900,
+                trip_id="T1",
+            ),
+        ),
+        routes_by_id={},
+        trips_by_id={"T1": GtfsTrip(trip_id="T1")},
+        shapes_by_id={},
+        version="feed-1",
+    )
+    graph = _tiny_graph()
+    graph.graph["graph_version"] = "graph-1"
+    repo = FakeStopSnapRepository()
+    service = MultimodalRoutingService(
+        gtfs_repository=FakeGtfsRepository(feed),
+        map_provider=FakeMapProvider(graph),
+        stop_snap_repository=repo,
+    )
+
+    def _route():
+        return service.calculate_route(
+            origin=origin,
+            destination=destination,
+            depart_at=datetime(2026, 1, 8, 8, 0, 0),
+            preference="fastest",
+        )
+
+    # Without a table requests snap stops themselves and never build one.
+    assert len(_route().legs) == 3
+    assert repo.saves == 0
+
+    table = service.prepare_stop_snaps(graph)
+    assert repo.saves == 1
+    assert table is repo.table and table.node_for("B") == 3
+    assert service.prepare_stop_snaps(graph) is table
+    assert repo.saves == 1
+
+    # With a valid table only origin/destination are snapped per request.
+    snapped: list[GeoPoint] = []
+    real_nearest_node = mrs.nearest_node
+
+    def _counting_nearest_node(g, point):
+        snapped.append(point)
+        return real_nearest_node(g, point)
+
+    monkeypatch.setattr(mrs, "nearest_node", _counting_nearest_node)
+    assert len(_route().legs) == 3
+    assert snapped == [origin, destination]
+
+    # A new graph version makes the stored table stale: stops are snapped
+    # per request again until it is prepared anew.
+    graph.graph["graph_version"] = "graph-2"
+    snapped.clear()
+    assert len(_route().legs) == 3
+    assert repo.saves == 1
+    assert len(snapped) > 2
+    service.prepare_stop_snaps(graph)
+    assert repo.saves == 2
+    assert repo.table.graph_version == "graph-2"
+
+
+def test_repeated_request_reuses_cached_walks(monkeypatch) -> None:
+    from src.app.services import multimodal_routing_service as mrs
+    from src.app.services.walk_cache import WalkCache
+
+    calls: list[bool] = []
+    real_walk_search = mrs.walk_search
+
+    def _counting_walk_search(graph, source, **kwargs):
+        calls.append(bool(kwargs.get("reverse")))
+        return real_walk_search(graph, source, **kwargs)
+
+    monkeypatch.setattr(mrs, "walk_search", _counting_walk_search)
+
+    origin = GeoPoint(lat=0.0, lon=0.0)
+    destination = GeoPoint(lat=0.02, lon=0.0)
+    depart_s = 8 * 3600
+    feed = GtfsFeed(
+        stops_by_id={
+            "A": Stop(id="A", name="A", location=GeoPoint(lat=0.001, lon=0.0)),
+            "B": Stop(id="B", name="B", location=GeoPoint(lat=0.019, lon=0.0)),
+        },
+        connections=(
+            Connection(
+                dep_stop_id="A",
+                arr_stop_id="B",
+                dep_time_s=depart_s + 300,
+                arr_time_s=depart_s + 900,
+                trip_id="T1",
+            ),
+        ),
+        routes_by_id={},
+        trips_by_id={"T1": GtfsTrip(trip_id="T1")},
+        shapes_by_id={},
+    )
+    graph = _tiny_graph()
+    graph.graph["graph_version"] = "graph-1"
+    cache = WalkCache()
+    service = MultimodalRoutingService(
+        gtfs_repository=FakeGtfsRepository(feed),
+        map_provider=FakeMapProvider(graph),
+        walk_cache=cache,
+    )
+
+    def _route():
+        return service.calculate_route(
+            origin=origin,
+            destination=destination,
+            depart_at=datetime(2026, 1, 8, 8, 0, 0),
+            preference="fastest",
+        )
+
+    first = _route()
+    assert calls == [False, True]
+    second = _route()
+    assert calls == [False, True]
+    assert cache.stats()["hits"] >= 2
+    assert len(second.legs) == 3
+    assert first.legs[0].path == second.legs[0].path
+    assert first.legs[2].distance_m == second.legs[2].distance_m
+
+
+def _bucket_service(monkeypatch, *, bucket_s: int, early_bus: bool = False):
+    from src.app.services import multimodal_routing_service as mrs
+    from src.app.services.route_cache import RouteCache
+    from src.app.services.walk_cache import WalkCache
+
+    searches: list[int] = []
+    real_earliest_arrival = mrs.earliest_arrival
+
+    def _counting_earliest_arrival(feed, **kwargs):
+        searches.append(1)
+        return real_earliest_arrival(feed, **kwargs)
+
+    monkeypatch.setattr(mrs, "earliest_arrival", _counting_earliest_arrival)
+
+    depart_s = 8 * 3600
+    feed = GtfsFeed(
+        stops_by_id={
+            "A": Stop(id="A", name="A", location=GeoPoint(lat=0.001, lon=0.0)),
+            "B": Stop(id="B", name="B", location=GeoPoint(lat=0.019, lon=0.0)),
+        },
+        connections=(
+            *(
+                (
+                    Connection(
+                        dep_stop_id="A",
+                        arr_stop_id="B",
+                        dep_time_s=depart_s + 120,
+                        arr_time_s=depart_s + 720,
+                        trip_id="T0",
+                    ),
+                )
+                if early_bus
+                else ()
+            ),
+            Connection(
+                dep_stop_id="A",
+                arr_stop_id="B",
+                dep_time_s=depart_s + 300,
+                arr_time_s=depart_s + 900,
+                trip_id="T1",
+            ),
+        ),
+        routes_by_id={},
+        trips_by_id={"T0": GtfsTrip(trip_id="T0"), "T1": GtfsTrip(trip_id="T1")},
+        shapes_by_id={},
+        version="feed-1",
+    )
+    graph = _tiny_graph()
+    graph.graph["graph_version"] = "graph-1"
+    cache = RouteCache(bucket_s=bucket_s)
+    service = MultimodalRoutingService(
+        gtfs_repository=FakeGtfsRepository(feed),
+        map_provider=FakeMapProvider(graph),
+        route_cache=cache,
+        walk_cache=WalkCache(),
+    )
+
+    def _route(origin: GeoPoint, minute: int):
+        return service.calculate_route(
+            origin=origin,
+            destination=GeoPoint(lat=0.02, lon=0.0),
+            depart_at=datetime(2026, 1, 8, 8, minute, 0),
+            preference="fastest",
+        )
+
+    return _route, searches, cache
+
+
+def test_route_cache_serves_requests_in_the_same_departure_bucket(monkeypatch) -> None:
+    route, searches, cache = _bucket_service(monkeypatch, bucket_s=300)
+
+    first = route(GeoPoint(lat=0.0, lon=0.0), 0)
+    assert len(searches) == 1
+
+    # Same snapped nodes, same 5-minute bucket: the transit search is reused,
+    # the endpoint walks follow the request.
+    nearby = GeoPoint(lat=0.0001, lon=0.0001)
+    second = route(nearby, 4)
+    assert len(searches) == 1
+    assert second.origin == nearby and second.legs[0].origin == nearby
+    assert second.legs[1] == first.legs[1]
+    access = second.legs[0]
+    assert access.depart_at == datetime(2026, 1, 8, 8, 4, 0)
+    assert access.distance_m == first.legs[0].distance_m
+    assert access.arrive_at == access.depart_at + timedelta(seconds=access.duration_s)
+    assert second.legs[-1].depart_at == second.legs[1].arrive_at
+
+    route(nearby, 5)
+    assert len(searches) == 2
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 2)
+
+
+def test_cached_route_is_not_reused_once_its_bus_has_left(monkeypatch) -> None:
+    route, searches, _ = _bucket_service(monkeypatch, bucket_s=600)
+
+    first = route(GeoPoint(lat=0.0, lon=0.0), 0)
+    assert [leg.mode.value for leg in first.legs] == ["walk", "bus", "walk"]
+
+    # Same 10-minute bucket, but the 08:05 bus is gone at 08:06.
+    late = route(GeoPoint(lat=0.0, lon=0.0), 6)
+    assert len(searches) == 2
+    assert [leg.mode.value for leg in late.legs] == ["walk"]
+
+    # The walking fallback was not cached: 08:00 still gets the bus.
+    again = route(GeoPoint(lat=0.0, lon=0.0), 0)
+    assert [leg.mode.value for leg in again.legs] == ["walk", "bus", "walk"]
+
+
+def test_earlier_request_in_the_bucket_is_not_given_a_later_plan(
+    monkeypatch,
+) -> None:
+    route, searches, cache = _bucket_service(monkeypatch, bucket_s=600, early_bus=True)
+    origin = GeoPoint(lat=0.0, lon=0.0)
+
+    late = route(origin, 3)
+    assert late.legs[1].trip_id == "T1"
+
+    # Leaving at 08:01 catches the 08:02 bus the cached 08:03 plan skipped.
+    early = route(origin, 1)
+    assert len(searches) == 2
+    assert early.legs[1].trip_id == "T0"
+
+    # Later requests reuse the earlier plan while its bus is catchable.
+    reused = route(origin, 2)
+    assert len(searches) == 2
+    assert reused.legs[1] == early.legs[1]
+    assert cache.stats()["hits"] == 2
+
+
+@dataclass(slots=True)
+class FakeLandmarkRepository:
+    table: LandmarkTable | None = None
+    saves: int = 0
+
+    def load(self) -> LandmarkTable | None:
+        return self.table
+
+    def save(self, table: LandmarkTable) -> None:
+        self.table = table
+        self.saves += 1
+
+
+def test_landmarks_are_prepared_offline_and_never_built_per_request() -> None:
+    graph = _tiny_graph()
+    graph.graph["graph_version"] = "graph-1"
+    repo = FakeLandmarkRepository()
+    service = MultimodalRoutingService(
+        gtfs_repository=FakeGtfsRepository(
+            GtfsFeed(
+                stops_by_id={},
+                connections=(),
+                routes_by_id={},
+                trips_by_id={},
+                shapes_by_id={},
+            )
+        ),
+        map_provider=FakeMapProvider(graph),
+        landmark_repository=repo,
+        walk_method="alt",
+        landmark_count=2,
+    )
+
+    def _walk():
+        return service.calculate_route(
+            origin=GeoPoint(lat=0.0, lon=0.0),
+            destination=GeoPoint(lat=0.02, lon=0.0),
+            depart_at=datetime(2026, 1, 8, 8, 0, 0),
+            preference="fastest",
+        )
+
+    # Missing table: ALT runs as plain A*, nothing is built.
+    assert _walk().legs[0].distance_m == 300.0
+    assert repo.saves == 0
+
+    table = service.prepare_landmarks(graph)
+    assert repo.saves == 1 and table is repo.table
+    assert service.prepare_landmarks(graph) is table
+    assert _walk().legs[0].distance_m == 300.0
+
+    # A stale table is ignored rather than rebuilt.
+    graph.graph["graph_version"] = "graph-2"
+    assert _walk().legs[0].distance_m == 300.0
+    assert repo.saves == 1
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import pytest
+
+from src.domain.algorithms.polyline import (
+    decode_polyline,
+    encode_polyline,
+    path_for_response,
+    simplify_polyline,
+)
+from src.domain.models import GeoPoint
+
+
+def test_encode_matches_reference_and_round_trips() -> None:
+    # Reference example from the encoded polyline format documentation.
+    pts = [
+        GeoPoint(lat=38.5, lon=-120.2),
+        GeoPoint(lat=40.7, lon=-120.95),
+        GeoPoint(lat=43.252, lon=-126.453),
+    ]
+
+    encoded = encode_polyline(pts)
+
+    assert encoded == "_p~iF~ps|U_ulLnnqC_mqNvxq`@"
+    decoded = decode_polyline(encoded)
+    assert [(p.lat, p.lon) for p in decoded] == pytest.approx(
+        [(p.lat, p.lon) for p in pts]
+    )
+
+
+def test_simplify_drops_points_within_tolerance() -> None:
+    # Nearly straight line (~1 m wiggle) with one real corner.
+    pts = [
+        GeoPoint(lat=28.1 + (i % 2) * 0.00001, lon=-15.43 + i * 0.001) for i in range(6)
+    ]
+    pts.append(GeoPoint(lat=28.11, lon=-15.425))
+
+    simplified = simplify_polyline(pts, 5.0)
+
+    assert simplified == (pts[0], pts[5], pts[6])
+    assert simplify_polyline(pts, 0.0) == tuple(pts)
+
+
+def test_path_for_response_returns_one_representation() -> None:
+    pts = (GeoPoint(lat=28.1, lon=-15.43), GeoPoint(lat=28.11, lon=-15.42))
+
+    assert path_for_response(pts) == (pts, None)
+    points, encoded = path_for_response(pts, geometry="polyline")
+    assert points is None and decode_polyline(encoded) == list(pts)
+    assert path_for_response((), geometry="polyline") == (None, None)
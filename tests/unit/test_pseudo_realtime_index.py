@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import random
+
+from src.app.services.pseudo_realtime_index import (
+    PseudoRealtimeIndex,
+    pseudo_realtime_index_for,
+)
+from src.app.services.realtime_view_service import _interpolate_along_polyline
+from src.domain.models import GeoPoint
+from src.domain.models.gtfs import Connection, GtfsFeed
+
+
+def _feed(version: str | None = None) -> GtfsFeed:
+    rng = random.Random(5)
+    conns = []
+    for i in range(300):
+        dep = rng.randrange(6 * 3600, 10 * 3600)
+        conns.append(
+            Connection(
+                dep_stop_id="A",
+                arr_stop_id="B",
+                dep_time_s=dep,
+                arr_time_s=dep + rng.randrange(0, 900),
+                trip_id=f"T{i % 40}",
+            )
+        )
+    conns.sort(key=lambda c: (c.dep_time_s, c.arr_time_s))
+    return GtfsFeed(
+        stops_by_id={},
+        connections=tuple(conns),
+        routes_by_id={},
+        trips_by_id={},
+        shapes_by_id={},
+        version=version,
+    )
+
+
+def test_active_at_matches_a_full_scan() -> None:
+    feed = _feed()
+    index = PseudoRealtimeIndex.build(feed)
+
+    for now_s in range(6 * 3600, 10 * 3600 + 900, 97):
+        expected = [
+            c for c in feed.connections if c.dep_time_s <= now_s <= c.arr_time_s
+        ]
+        assert index.active_at(now_s) == expected
+
+
+def test_index_is_reused_per_feed_version() -> None:
+    first = pseudo_realtime_index_for(_feed(version="v1"))
+
+    assert pseudo_realtime_index_for(_feed(version="v1")) is first
+    assert pseudo_realtime_index_for(_feed(version="v2")) is not first
+
+
+def test_interpolation_picks_the_segment_by_bisect() -> None:
+    pts = (
+        GeoPoint(lat=0.0, lon=0.0),
+        GeoPoint(lat=0.0, lon=1.0),
+        GeoPoint(lat=0.0, lon=3.0),
+    )
+    cum = (0.0, 10.0, 30.0)
+
+    assert _interpolate_along_polyline(pts, cum, 5.0).lon == 0.5
+    assert _interpolate_along_polyline(pts, cum, 10.0).lon == 1.0
+    assert _interpolate_along_polyline(pts, cum, 20.0).lon == 2.0
+    assert _interpolate_along_polyline(pts, cum, 99.0).lon == 3.0
+    assert _interpolate_along_polyline(pts, cum, -1.0).lon == 0.0
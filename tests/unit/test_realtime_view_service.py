@@ -4,6 +4,7 @@ import asyncio
 from dataclasses import dataclass
 from datetime import datetime
 
+from src.app.ports.output import IRealtimeVehicleProvider
 from src.app.services.realtime_view_service import RealtimeViewService
 from src.domain.models.geo import GeoPoint
 from src.domain.models.gtfs import Connection, GtfsFeed, GtfsRoute, GtfsTrip
@@ -20,7 +21,7 @@ class FakeGtfsRepository:
 
 
 @dataclass(slots=True)
-class FakeVehicleProvider:
+class FakeVehicleProvider(IRealtimeVehicleProvider):
     vehicles: tuple[RealtimeVehicle, ...]
 
     async def list_vehicles(self) -> tuple[RealtimeVehicle, ...]:
@@ -131,8 +132,8 @@ def test_list_vehicles_uses_provider_and_filters_by_route_id() -> None:
 def test_list_vehicles_fallback_generates_pseudo_realtime(monkeypatch) -> None:
     class _FakeDateTime(datetime):
         @classmethod
-        def now(cls):
-            return datetime(2026, 1, 8, 8, 0, 30)
+        def now(cls, tz=None):
+            return datetime(2026, 1, 8, 8, 0, 30, tzinfo=tz)
 
     from src.app.services import realtime_view_service as rvs
 
@@ -178,3 +179,33 @@ def test_list_vehicles_fallback_generates_pseudo_realtime(monkeypatch) -> None:
     # Should be somewhere between stop A and stop B.
     assert 0.0 <= v.lon <= 0.02
     assert v.timestamp is not None
+
+
+def test_viewport_filters_vehicles_and_stops() -> None:
+    from src.domain.models.geo import BoundingBox
+
+    inside = RealtimeVehicle(
+        vehicle_id="in", trip_id=None, route_id="R1", lat=0.5, lon=0.5
+    )
+    outside = RealtimeVehicle(
+        vehicle_id="out", trip_id=None, route_id="R1", lat=2.0, lon=2.0
+    )
+    stop_in = Stop(id="S1", name="In", location=GeoPoint(lat=0.2, lon=0.2))
+    stop_out = Stop(id="S2", name="Out", location=GeoPoint(lat=3.0, lon=3.0))
+    feed = GtfsFeed(
+        stops_by_id={"S1": stop_in, "S2": stop_out},
+        connections=(),
+        routes_by_id={},
+        trips_by_id={},
+        shapes_by_id={},
+    )
+    svc = RealtimeViewService(
+        gtfs_repository=FakeGtfsRepository(feed),
+        vehicle_provider=FakeVehicleProvider((inside, outside)),
+    )
+    box = BoundingBox(min_lat=0.0, min_lon=0.0, max_lat=1.0, max_lon=1.0)
+
+    snap = asyncio.run(svc.vehicle_snapshot(route_ids={"R1"}, bbox=box))
+
+    assert [v.vehicle_id for v in snap.vehicles] == ["in"]
+    assert svc.stops_in_bbox(bbox=box) == (("S1", "In", stop_in.location),)
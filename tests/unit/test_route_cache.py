@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import pickle
+import zlib
+from datetime import datetime
+
+from src.app.ports.output import IRouteCacheBackend
+from src.app.services import route_cache as rc
+from src.app.services.route_cache import RouteCache
+from src.domain.models import (
+    GeoPoint,
+    Route,
+    RouteLeg,
+    Stop,
+    TransitLine,
+    TravelMode,
+)
+
+
+@dataclass(slots=True)
+class FakeBackend(IRouteCacheBackend):
+    items: dict[str, bytes] = field(default_factory=dict)
+
+    def get(self, key: str) -> bytes | None:
+        return self.items.get(key)
+
+    def put(self, key: str, value: bytes, *, ttl_s: float) -> None:
+        self.items[key] = value
+
+
+def _route(lat: float = 0.0) -> Route:
+    a, b = GeoPoint(lat=lat, lon=0.0), GeoPoint(lat=0.02, lon=0.0)
+    leg = RouteLeg(mode=TravelMode.WALK, origin=a, destination=b, path=(a, b))
+    return Route(origin=a, destination=b, legs=(leg,))
+
+
+def _key(cache: RouteCache, minute: int = 0, *, node: int = 1, day: int = 8):
+    return cache.key(
+        feed_version="f1",
+        graph_version="g1",
+        origin_node=node,
+        destination_node=2,
+        depart_at=datetime(2026, 1, day, 8, minute, 30),
+        preference="fastest",
+    )
+
+
+def test_key_buckets_departures_and_requires_versions() -> None:
+    cache = RouteCache(bucket_s=600)
+    assert _key(cache, 0) == _key(cache, 9)
+    assert _key(cache, 0) != _key(cache, 10)
+    assert _key(cache, 0) != _key(cache, 0, day=9)
+    assert (
+        cache.key(
+            feed_version=None,
+            graph_version="g1",
+            origin_node=1,
+            destination_node=2,
+            depart_at=datetime(2026, 1, 8),
+            preference="fastest",
+        )
+        is None
+    )
+
+
+def test_lru_and_ttl_eviction(monkeypatch) -> None:
+    now = [100.0]
+    monkeypatch.setattr(rc.time, "monotonic", lambda: now[0])
+    cache = RouteCache(max_entries=2, ttl_s=60.0)
+
+    for node in (1, 2):
+        cache.put(_key(cache, node=node), _route())
+    assert cache.get(_key(cache, node=1)) is not None
+    cache.put(_key(cache, node=3), _route())
+    # Node 2 was least recently used.
+    assert cache.get(_key(cache, node=2)) is None
+
+    now[0] += 61.0
+    assert cache.get(_key(cache, node=1)) is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+    assert (stats["evictions"], stats["expirations"]) == (1, 1)
+
+
+def test_shared_entries_round_trip_as_json_and_never_unpickle() -> None:
+    a, b = GeoPoint(lat=28.1, lon=-15.4), GeoPoint(lat=28.2, lon=-15.5)
+    bus = RouteLeg(
+        mode=TravelMode.BUS,
+        origin=a,
+        destination=b,
+        origin_stop_id="A",
+        destination_stop_id="B",
+        depart_at=datetime(2026, 1, 8, 8, 5),
+        arrive_at=datetime(2026, 1, 8, 8, 15),
+        distance_m=1200.0,
+        duration_s=600.0,
+        stops=(Stop(id="A", name="Á", location=a), Stop(id="B", name="B", location=b)),
+        path=(a, b),
+        line=TransitLine(route_id="R1", short_name="1", color="FF0000"),
+        trip_id="T1",
+    )
+    route = Route(origin=a, destination=b, legs=(bus,))
+    backend = FakeBackend()
+    RouteCache(backend=backend).put(_key(RouteCache()), route)
+
+    (stored,) = backend.items.values()
+    assert zlib.decompress(stored).startswith(b"{")
+    other = RouteCache(backend=backend)
+    assert other.get(_key(other)) == route
+
+    # A pickle planted in the shared table is a miss, not code execution.
+    backend.items = {k: zlib.compress(pickle.dumps(route)) for k in backend.items}
+    fresh = RouteCache(backend=backend)
+    assert fresh.get(_key(fresh)) is None
+
+
+def test_shared_backend_fills_other_processes() -> None:
+    backend = FakeBackend()
+    RouteCache(backend=backend).put(_key(RouteCache()), _route())
+
+    other = RouteCache(backend=backend)
+    assert other.get(_key(other)) == _route()
+    assert other.get(_key(other)) == _route()
+    assert (other.stats()["shared_hits"], other.stats()["hits"]) == (1, 1)
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from src.app.services.route_index import RouteIndex, route_index_for
+from src.domain.models import GeoPoint
+from src.domain.models.gtfs import Connection, GtfsFeed, GtfsRoute, GtfsTrip
+from src.domain.models.stop import Stop
+
+
+def _hops(trip_id: str, stop_ids: list[str], start_s: int) -> list[Connection]:
+    return [
+        Connection(
+            dep_stop_id=a,
+            arr_stop_id=b,
+            dep_time_s=start_s + 60 * i,
+            arr_time_s=start_s + 60 * (i + 1),
+            trip_id=trip_id,
+            seq_index=i,
+        )
+        for i, (a, b) in enumerate(zip(stop_ids, stop_ids[1:]))
+    ]
+
+
+def _feed(version: str | None = None) -> GtfsFeed:
+    # Stop names sort opposite to travel order on purpose.
+    names = {"A": "Zeta", "B": "Yota", "X": "Xi", "C": "Omega"}
+    stops = {
+        sid: Stop(id=sid, name=name, location=GeoPoint(lat=0.0, lon=float(i)))
+        for i, (sid, name) in enumerate(names.items())
+    }
+    conns = (
+        _hops("T1", ["A", "B", "C"], 100)
+        + _hops("T2", ["A", "B", "C"], 200)
+        + _hops("T3", ["A", "B", "X", "C"], 300)  # short-turn variant
+        + _hops("T4", ["C", "B", "A"], 400)
+    )
+    conns.sort(key=lambda c: c.dep_time_s)
+    return GtfsFeed(
+        stops_by_id=stops,
+        connections=tuple(conns),
+        routes_by_id={"R1": GtfsRoute(route_id="R1")},
+        trips_by_id={
+            "T1": GtfsTrip("T1", route_id="R1", shape_id="S1", direction_id="0"),
+            "T2": GtfsTrip("T2", route_id="R1", shape_id="S1", direction_id="0"),
+            "T3": GtfsTrip("T3", route_id="R1", shape_id="S2", direction_id="0"),
+            "T4": GtfsTrip("T4", route_id="R1", shape_id="S3", direction_id="1"),
+        },
+        shapes_by_id={
+            "S1": (GeoPoint(lat=0.0, lon=0.0), GeoPoint(lat=0.0, lon=3.0)),
+            "S2": (GeoPoint(lat=0.0, lon=0.0), GeoPoint(lat=0.0, lon=3.0)),
+            "S3": (GeoPoint(lat=0.0, lon=3.0),),  # degenerate, never returned
+        },
+        version=version,
+    )
+
+
+def test_route_index_orders_stops_by_travel_and_direction() -> None:
+    index = RouteIndex.build(_feed())
+
+    assert index.trips_by_route["R1"] == ("T1", "T2", "T3", "T4")
+    assert index.shapes_by_route["R1"] == ("S1", "S2")
+    assert index.route_stop_ids("R1", direction_id="0") == ("A", "B", "X", "C")
+    assert index.route_stop_ids("R1", direction_id="1") == ("C", "B", "A")
+    assert index.route_stop_ids("R1") == ("A", "B", "X", "C")
+    assert index.route_stop_ids("missing") == ()
+
+
+def test_route_index_is_cached_per_feed_version() -> None:
+    a = route_index_for(_feed("v1"))
+    assert route_index_for(_feed("v1")) is a
+    assert route_index_for(_feed("v2")) is not a
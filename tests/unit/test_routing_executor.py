@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import os
+import time
+from datetime import datetime
+
+import pytest
+
+from src.app.services.routing_executor import RoutingExecutor
+from src.domain.exceptions import RoutingBusy, RoutingTimeout, RoutingUnavailable
+from src.domain.models import GeoPoint, Route
+
+if "fork" not in multiprocessing.get_all_start_methods():
+    pytest.skip("needs the fork start method", allow_module_level=True)
+
+
+class _FakeRoutingService:
+    def calculate_route(
+        self,
+        *,
+        origin: GeoPoint,
+        destination: GeoPoint,
+        depart_at: datetime,
+        preference: str,
+    ) -> Route:
+        if preference == "slow":
+            time.sleep(1.0)
+        return Route(origin=origin, destination=destination, legs=())
+
+
+def _factory() -> _FakeRoutingService:
+    return _FakeRoutingService()
+
+
+def _executor(**kwargs) -> RoutingExecutor:
+    return RoutingExecutor(factory=_factory, start_method="fork", **kwargs)  # type: ignore[arg-type]
+
+
+def _route(executor: RoutingExecutor, preference: str = "fastest"):
+    return executor.calculate_route(
+        origin=GeoPoint(lat=0.0, lon=0.0),
+        destination=GeoPoint(lat=1.0, lon=1.0),
+        depart_at=datetime(2026, 1, 1, 8, 0),
+        preference=preference,  # type: ignore[arg-type]
+    )
+
+
+def test_routes_are_calculated_in_warm_worker_processes() -> None:
+    executor = _executor(workers=2)
+
+    async def run():
+        pids = await executor.start()
+        routes = await asyncio.gather(*(_route(executor) for _ in range(4)))
+        return pids, routes
+
+    try:
+        pids, routes = asyncio.run(run())
+    finally:
+        executor.shutdown()
+
+    assert pids and os.getpid() not in pids
+    assert routes[0].destination == GeoPoint(lat=1.0, lon=1.0)
+    assert executor.stats()["completed"] == 4
+
+
+def test_full_queue_is_rejected_and_slow_routes_time_out() -> None:
+    executor = _executor(workers=1, max_queue=0, timeout_s=0.3)
+
+    async def run():
+        await executor.start()
+        slow = asyncio.ensure_future(_route(executor, "slow"))
+        await asyncio.sleep(0.05)
+        with pytest.raises(RoutingBusy):
+            await _route(executor)
+        with pytest.raises(RoutingTimeout):
+            await slow
+
+    try:
+        asyncio.run(run())
+    finally:
+        executor.shutdown()
+
+    stats = executor.stats()
+    assert (stats["rejected"], stats["timeouts"]) == (1, 1)
+
+
+class _CrashingRoutingService(_FakeRoutingService):
+    def calculate_route(self, **kwargs) -> Route:
+        if kwargs["preference"] == "crash":
+            os._exit(1)  # a worker killed mid-calculation (e.g. OOM)
+        return super().calculate_route(**kwargs)
+
+
+def _crashing_factory() -> _CrashingRoutingService:
+    return _CrashingRoutingService()
+
+
+def test_dead_worker_is_replaced_instead_of_breaking_the_pool() -> None:
+    executor = RoutingExecutor(
+        factory=_crashing_factory,  # type: ignore[arg-type]
+        workers=1,
+        start_method="fork",
+    )
+
+    async def run():
+        await executor.start()
+        with pytest.raises(RoutingUnavailable):
+            await _route(executor, "crash")
+        return await _route(executor)
+
+    try:
+        route = asyncio.run(run())
+    finally:
+        executor.shutdown()
+
+    assert route.destination == GeoPoint(lat=1.0, lon=1.0)
+    assert executor.stats()["restarts"] == 1
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+import pytest
+
+from src.adapters.maps.tiled_map_adapter import TiledMapAdapter
+from src.adapters.persistence.local_gtfs_repository import LocalGtfsRepository
+from src.adapters.routing_factory import build_routing_service
+
+
+def test_tiles_disable_graph_bound_artifacts(monkeypatch) -> None:
+    monkeypatch.delenv("OSM_GRAPH_PATH", raising=False)
+    monkeypatch.setenv("STREET_GRAPH_TILES", "1")
+    monkeypatch.setenv("STOP_SNAPS_PATH", "/tmp/stops.json")
+    monkeypatch.setenv("WALK_SEARCH_METHOD", " ALT ")
+
+    service = build_routing_service(LocalGtfsRepository())
+
+    assert isinstance(service.map_provider, TiledMapAdapter)
+    assert service.stop_snap_repository is None
+    assert service.walk_method == "alt"
+
+
+def test_unknown_walk_search_method_is_rejected(monkeypatch) -> None:
+    monkeypatch.setenv("WALK_SEARCH_METHOD", "bfs")
+    with pytest.raises(ValueError, match="WALK_SEARCH_METHOD"):
+        build_routing_service(LocalGtfsRepository())
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import networkx as nx
+import pytest
+from shapely.geometry import LineString
+
+from src.app.services.routing_helpers import (
+    build_landmark_table,
+    build_stop_snap_table,
+    path_points_for_nodes,
+    shortest_walk,
+    walk_leg,
+    walk_search,
+)
+from src.domain.models import GeoPoint, Stop
+
+
+def _line_digraph() -> nx.MultiDiGraph:
+    # 1 -> 2 -> 3 -> 4 one-way chain plus a parallel (longer) 1 -> 2 edge.
+    g = nx.MultiDiGraph()
+    for n in (1, 2, 3, 4):
+        g.add_node(n, x=0.0, y=n * 0.001)
+    g.add_edge(1, 2, length=100.0)
+    g.add_edge(1, 2, length=250.0)
+    g.add_edge(2, 3, length=50.0)
+    g.add_edge(3, 4, length=75.0)
+    return g
+
+
+def test_walk_search_matches_networkx_distances() -> None:
+    g = _line_digraph()
+
+    tree = walk_search(g, 1)
+
+    expected = nx.single_source_dijkstra_path_length(g, 1, weight="length")
+    assert tree.dist_m == expected
+    assert tree.path_nodes(4) == [1, 2, 3, 4]
+
+
+def test_walk_search_stops_once_targets_are_settled() -> None:
+    g = _line_digraph()
+
+    tree = walk_search(g, 1, targets=[2])
+
+    assert tree.distance_m(2) == 100.0
+    assert tree.distance_m(4) is None
+    assert tree.path_nodes(4) is None
+
+
+def test_walk_search_reverse_follows_edges_backwards() -> None:
+    g = _line_digraph()
+
+    tree = walk_search(g, 4, targets=[1, 3], reverse=True)
+
+    assert tree.distance_m(1) == 225.0
+    assert tree.distance_m(3) == 75.0
+    # Reverse trees yield paths in walking direction (towards the source).
+    assert tree.path_nodes(1) == [1, 2, 3, 4]
+
+
+def test_walk_search_respects_cutoff() -> None:
+    g = _line_digraph()
+
+    tree = walk_search(g, 1, cutoff_m=120.0)
+
+    assert set(tree.dist_m) == {1, 2}
+
+
+def test_build_stop_snap_table_snaps_every_stop() -> None:
+    g = nx.Graph()
+    g.add_node(1, x=0.0, y=0.0)
+    g.add_node(2, x=0.0, y=0.01)
+    g.add_edge(1, 2, length=1100.0, name="Calle Mayor")
+    stops = {
+        "A": Stop(id="A", name="A", location=GeoPoint(lat=0.0001, lon=0.0)),
+        "B": Stop(id="B", name="B", location=GeoPoint(lat=0.0099, lon=0.0)),
+    }
+
+    table = build_stop_snap_table(g, stops, feed_version="f1", graph_version="g1")
+
+    assert table.matches(feed_version="f1", graph_version="g1")
+    assert not table.matches(feed_version="f2", graph_version="g1")
+    assert table.node_for("A") == 1
+    assert table.node_for("B") == 2
+    assert table.snaps_by_stop_id["A"].street_name == "Calle Mayor"
+    assert 5.0 < table.snaps_by_stop_id["A"].distance_m < 20.0
+
+
+def _grid_graph(n: int = 12) -> nx.MultiDiGraph:
+    # ~100 m spaced grid with node coordinates and geodesic-ish lengths.
+    g = nx.MultiDiGraph()
+    step = 0.001
+    for i in range(n):
+        for j in range(n):
+            g.add_node((i, j), x=-15.43 + j * step, y=28.1 + i * step)
+    for i in range(n):
+        for j in range(n):
+            for di, dj in ((0, 1), (1, 0)):
+                a, b = (i, j), (i + di, j + dj)
+                if b not in g:
+                    continue
+                # Longer than the straight line so the heuristics stay admissible.
+                length = 120.0 + 7.0 * ((i * 31 + j * 17) % 5)
+                g.add_edge(a, b, length=length)
+                g.add_edge(b, a, length=length)
+    return g
+
+
+def test_astar_and_alt_are_exact_and_settle_fewer_nodes() -> None:
+    g = _grid_graph()
+    source, target = (0, 0), (11, 6)
+    expected = nx.shortest_path_length(g, source, target, weight="length")
+
+    dijkstra = walk_search(g, source, targets=(target,))
+    astar = shortest_walk(g, source, target, method="astar")
+    landmarks = build_landmark_table(g, graph_version="g1", count=4)
+    alt = shortest_walk(g, source, target, method="alt", landmarks=landmarks)
+
+    for tree in (dijkstra, astar, alt):
+        assert tree.distance_m(target) == pytest.approx(expected)
+        assert tree.path_nodes(target)[0] == source
+    assert len(astar.dist_m) < len(dijkstra.dist_m)
+    assert len(alt.dist_m) <= len(astar.dist_m)
+
+
+def _curved_street_graph() -> nx.MultiGraph:
+    # One contracted street 1 - 2 whose geometry bends north (stored 2 -> 1),
+    # plus a straight edge 2 - 3 without geometry.
+    g = nx.MultiGraph()
+    g.add_node(1, x=0.0, y=0.0)
+    g.add_node(2, x=0.002, y=0.0)
+    g.add_node(3, x=0.003, y=0.0)
+    bend = [(0.002, 0.0), (0.0015, 0.0005), (0.001, 0.00049), (0.0005, 0.0005)]
+    g.add_edge(1, 2, length=320.0, geometry=LineString([*bend, (0.0, 0.0)]))
+    g.add_edge(2, 3, length=110.0)
+    return g
+
+
+def test_walk_geometry_follows_edge_geometries() -> None:
+    g = _curved_street_graph()
+
+    pts = path_points_for_nodes(g, [1, 2, 3])
+
+    assert [(p.lon, p.lat) for p in pts] == [
+        (0.0, 0.0),
+        (0.0005, 0.0005),
+        (0.001, 0.00049),
+        (0.0015, 0.0005),
+        (0.002, 0.0),
+        (0.003, 0.0),
+    ]
+
+
+def test_walk_leg_simplifies_geometry_before_caching() -> None:
+    g = _curved_street_graph()
+
+    full = walk_leg(g, 1, 3)
+    simplified = walk_leg(g, 1, 3, simplify_m=5.0)
+
+    assert full is not None and simplified is not None
+    assert simplified.distance_m == full.distance_m == 430.0
+    # The ~1 m dip along the top of the bend goes; the corners stay.
+    assert len(simplified.points()) == len(full.points()) - 1
+    assert simplified.points()[0] == full.points()[0]
+    assert simplified.points()[-1] == full.points()[-1]
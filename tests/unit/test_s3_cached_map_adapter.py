@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import gzip
+import io
+import pickle
+
+import networkx as nx
+import pytest
+from botocore.exceptions import ClientError
+
+from src.adapters.maps import s3_cached_map_adapter as scm
+from src.adapters.maps.s3_cached_map_adapter import S3CachedMapAdapter
+from src.domain.models import GeoPoint
+
+
+class _FakeS3:
+    def __init__(self) -> None:
+        self.objects: dict[str, tuple[bytes, str]] = {}
+        self.gets: list[dict] = []
+
+    def get_object(self, *, Bucket: str, Key: str, IfNoneMatch: str | None = None):
+        self.gets.append({"Key": Key, "IfNoneMatch": IfNoneMatch})
+        if Key not in self.objects:
+            raise ClientError({"Error": {"Code": "NoSuchKey"}}, "GetObject")
+        body, etag = self.objects[Key]
+        if IfNoneMatch == etag:
+            raise ClientError(
+                {
+                    "Error": {"Code": "304", "Message": "Not Modified"},
+                    "ResponseMetadata": {"HTTPStatusCode": 304},
+                },
+                "GetObject",
+            )
+        return {"Body": io.BytesIO(body), "ETag": etag}
+
+    def put_object(self, *, Bucket: str, Key: str, Body: bytes):
+        etag = f'"{len(self.objects) + 1}"'
+        self.objects[Key] = (Body, etag)
+        return {"ETag": etag}
+
+
+class _Upstream:
+    network_type = "walk"
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def get_street_graph(self, *, center: GeoPoint, dist_m: int):
+        self.calls += 1
+        g = nx.MultiDiGraph()
+        g.add_node(1, x="-15.43", y="28.12")
+        g.add_node(2, x="-15.42", y="28.12")
+        g.add_edge(1, 2, length="950.5")
+        return g
+
+
+@pytest.fixture()
+def fake_s3(monkeypatch) -> _FakeS3:
+    s3 = _FakeS3()
+    monkeypatch.setattr(scm, "s3_client", lambda: s3)
+    scm._memory.clear()
+    yield s3
+    scm._memory.clear()
+
+
+def _adapter(tmp_path, upstream, *, refresh_s: float) -> S3CachedMapAdapter:
+    return S3CachedMapAdapter(
+        upstream=upstream,
+        bucket="b",
+        cache_dir=tmp_path,
+        refresh_s=refresh_s,
+    )
+
+
+def test_memory_tier_serves_repeat_requests_without_s3(tmp_path, fake_s3) -> None:
+    upstream = _Upstream()
+    adapter = _adapter(tmp_path, upstream, refresh_s=60.0)
+    center = GeoPoint(lat=28.12, lon=-15.43)
+
+    g1 = adapter.get_street_graph(center=center, dist_m=1000)
+    gets_after_first = len(fake_s3.gets)
+    g2 = adapter.get_street_graph(center=center, dist_m=1000)
+
+    assert g2 is g1
+    assert upstream.calls == 1
+    assert len(fake_s3.gets) == gets_after_first
+    # Stored normalized: numeric attributes already floats.
+    assert g1.nodes[1]["x"] == -15.43
+    assert g1.edges[1, 2, 0]["length"] == 950.5
+
+
+def test_disk_tier_is_revalidated_with_etag(tmp_path, fake_s3) -> None:
+    upstream = _Upstream()
+    center = GeoPoint(lat=28.12, lon=-15.43)
+    _adapter(tmp_path, upstream, refresh_s=0.0).get_street_graph(
+        center=center, dist_m=1000
+    )
+
+    # New process: memory empty, disk copy present, S3 unchanged -> 304.
+    scm._memory.clear()
+    graph = _adapter(tmp_path, upstream, refresh_s=0.0).get_street_graph(
+        center=center, dist_m=1000
+    )
+
+    assert upstream.calls == 1
+    assert fake_s3.gets[-1]["IfNoneMatch"] is not None
+    assert graph.graph[scm._NORMALIZED] is True
+
+
+def test_changed_s3_object_replaces_local_copy(tmp_path, fake_s3) -> None:
+    upstream = _Upstream()
+    adapter = _adapter(tmp_path, upstream, refresh_s=0.0)
+    center = GeoPoint(lat=28.12, lon=-15.43)
+    first = adapter.get_street_graph(center=center, dist_m=1000)
+    first_version = first.graph["graph_version"]
+
+    # Another writer uploads a new (legacy, unnormalized) graph.
+    key = next(iter(fake_s3.objects))
+    newer = nx.MultiDiGraph()
+    newer.add_node(9, x="1.0", y="2.0")
+    fake_s3.objects[key] = (gzip.compress(pickle.dumps(newer)), '"new"')
+
+    graph = adapter.get_street_graph(center=center, dist_m=1000)
+
+    assert 9 in graph
+    assert graph.nodes[9]["x"] == 1.0
+    assert upstream.calls == 1
+    # Results cached for the old graph must not be reused.
+    assert graph.graph["graph_version"].endswith("@new")
+    assert graph.graph["graph_version"] != first_version
+
+
+def test_disk_writes_use_unique_temp_files(tmp_path, fake_s3, monkeypatch) -> None:
+    adapter = _adapter(tmp_path, _Upstream(), refresh_s=0.0)
+    adapter.get_street_graph(center=GeoPoint(lat=28.12, lon=-15.43), dist_m=1000)
+    assert not list(tmp_path.rglob("*.tmp"))
+
+    targets: list[str] = []
+
+    def _failing_replace(src, dst) -> None:
+        targets.append(str(src))
+        raise OSError("disk full")
+
+    monkeypatch.setattr(scm.os, "replace", _failing_replace)
+    scm._memory.clear()
+    adapter.get_street_graph(center=GeoPoint(lat=28.13, lon=-15.43), dist_m=1000)
+
+    # Named per process and thread, and cleaned up when the write fails.
+    assert targets and all(f".{scm.os.getpid()}." in t for t in targets)
+    assert not list(tmp_path.rglob("*.tmp"))
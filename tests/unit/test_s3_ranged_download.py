@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import io
+
+import pytest
+
+from src.adapters.maps.s3_ranged_download import download_s3_object
+
+
+class _FakeS3:
+    def __init__(self, body: bytes, metadata: dict[str, str] | None = None) -> None:
+        self.body = body
+        self.metadata = metadata or {}
+        self.ranges: list[str] = []
+
+    def head_object(self, *, Bucket: str, Key: str):
+        return {"ContentLength": len(self.body), "Metadata": self.metadata}
+
+    def get_object(self, *, Bucket: str, Key: str, Range: str):
+        self.ranges.append(Range)
+        start, end = (int(x) for x in Range.removeprefix("bytes=").split("-"))
+        return {"Body": io.BytesIO(self.body[start : end + 1])}
+
+
+def test_ranged_download_reassembles_and_gunzips_in_order(tmp_path) -> None:
+    raw = bytes(range(256)) * 2000
+    body = gzip.compress(raw)
+    s3 = _FakeS3(body, metadata={"sha256": hashlib.sha256(body).hexdigest()})
+    dest = tmp_path / "graph.graphml"
+
+    stats = download_s3_object(
+        s3, bucket="b", key="graph.graphml.gz", dest=dest, part_size=1000
+    )
+
+    assert dest.read_bytes() == raw
+    assert stats.parts == len(s3.ranges) > 1
+    assert stats.bytes_downloaded == len(body)
+    assert stats.bytes_written == len(raw)
+
+
+def test_ranged_download_rejects_checksum_mismatch(tmp_path) -> None:
+    s3 = _FakeS3(b"x" * 5000)
+
+    with pytest.raises(RuntimeError, match="Checksum mismatch"):
+        download_s3_object(
+            s3,
+            bucket="b",
+            key="graph.pkl",
+            dest=tmp_path / "graph.pkl",
+            part_size=512,
+            expected_sha256="0" * 64,
+        )
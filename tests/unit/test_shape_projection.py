@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import pytest
+
+from src.adapters.persistence.local_gtfs_repository import LocalGtfsRepository
+from src.app.services.shape_index import shape_index_for
+from src.domain.algorithms.shape_projection import build_shape_index
+from src.domain.models import GeoPoint, Stop
+from src.domain.models.gtfs import GtfsTrip
+
+# An out-and-back shape: east along lat 0, then back west along lat 0.001.
+_SHAPE = tuple(
+    [GeoPoint(lat=0.0, lon=i * 0.001) for i in range(5)]
+    + [GeoPoint(lat=0.001, lon=i * 0.001) for i in range(4, -1, -1)]
+)
+
+
+def _stops() -> dict[str, Stop]:
+    coords = {"A": (0.0001, 0.0005), "B": (0.0001, 0.0035), "C": (0.0009, 0.0005)}
+    return {
+        sid: Stop(id=sid, name=sid, location=GeoPoint(lat=lat, lon=lon))
+        for sid, (lat, lon) in coords.items()
+    }
+
+
+def test_geometric_projection_follows_the_stop_order() -> None:
+    index = build_shape_index(
+        trips_by_id={
+            "T1": GtfsTrip(trip_id="T1", shape_id="S"),
+            "T2": GtfsTrip(trip_id="T2", shape_id="S"),
+        },
+        shapes_by_id={"S": _SHAPE},
+        stops_by_id=_stops(),
+        stop_ids_by_trip={"T1": ["A", "B", "C"], "T2": ["A", "B", "C"]},
+    )
+
+    # Both trips share one pattern.
+    assert len(index.patterns) == 1
+    segments = [p.segment for p in index.pattern_for("T1").positions]
+    # C is next to A geographically but on the way back along the shape.
+    assert segments == [0, 3, 8]
+
+    start, end = _stops()["A"].location, _stops()["B"].location
+    path = index.slice("T2", 0, 1, _SHAPE, start=start, end=end)
+    assert path == (start, *_SHAPE[1:4], end)
+    assert index.slice("T2", 1, 0, _SHAPE, start=end, end=start) is None
+    assert index.slice("missing", 0, 1, _SHAPE, start=start, end=end) is None
+
+
+def test_shape_dist_traveled_takes_precedence() -> None:
+    index = build_shape_index(
+        trips_by_id={"T1": GtfsTrip(trip_id="T1", shape_id="S")},
+        shapes_by_id={"S": _SHAPE},
+        stops_by_id=_stops(),
+        stop_ids_by_trip={"T1": ["A", "B"]},
+        shape_dist_by_shape={"S": tuple(float(i) for i in range(len(_SHAPE)))},
+        stop_dist_by_trip={"T1": [0.5, 6.5]},
+    )
+
+    a, b = index.pattern_for("T1").positions
+    cum = index.cumulative_m_by_shape["S"]
+    assert (a.segment, b.segment) == (0, 6)
+    assert b.along_m == pytest.approx((cum[6] + cum[7]) / 2)
+
+
+def test_shape_index_is_built_once_per_loaded_feed_version(tmp_path) -> None:
+    (tmp_path / "stops.txt").write_text(
+        "stop_id,stop_name,stop_lat,stop_lon\nA,A,0.0001,0.0005\nB,B,0.0001,0.0035\n"
+    )
+    (tmp_path / "trips.txt").write_text("route_id,trip_id,shape_id\nR,T1,S\n")
+    (tmp_path / "shapes.txt").write_text(
+        "shape_id,shape_pt_lat,shape_pt_lon,shape_pt_sequence\n"
+        + "".join(f"S,{p.lat},{p.lon},{i}\n" for i, p in enumerate(_SHAPE))
+    )
+    (tmp_path / "stop_times.txt").write_text(
+        "trip_id,arrival_time,departure_time,stop_id,stop_sequence\n"
+        "T1,08:00:00,08:00:00,A,1\nT1,08:05:00,08:05:00,B,2\n"
+    )
+
+    repo = LocalGtfsRepository(base_path=tmp_path)
+    feed = repo.load_feed()
+
+    (conn,) = feed.connections
+    assert conn.seq_index == 0
+    index = shape_index_for(feed)
+    assert index.position("T1", 1).segment == 3
+    # Every request reloads the feed; the index is reused per version.
+    assert shape_index_for(repo.load_feed()) is index
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import pytest
+
+from src.adapters.realtime.http_gtfs_realtime_vehicle_provider import (
+    HttpGtfsRealtimeVehicleProvider,
+)
+from src.adapters.realtime.shared_snapshot import SharedVehicleSnapshot
+from src.adapters.realtime.vehicle_table import VehicleRow
+
+fcntl = pytest.importorskip("fcntl")
+
+
+def _rows() -> list[VehicleRow]:
+    return [
+        ("v1", "v1", "T1", "R1", 28.1, -15.4, 90.0, 7.5, 1000, "S1"),
+        ("ñ-2", None, None, None, 28.2, -15.5, None, None, None, None),
+    ]
+
+
+def test_publish_and_read_round_trip(tmp_path) -> None:
+    path = str(tmp_path / "vehicles.bin")
+    writer = SharedVehicleSnapshot(path)
+    assert writer.try_lead()
+    assert SharedVehicleSnapshot(path).read() is None
+
+    assert writer.publish(1234, _rows(), fetched_at=50.0) == 1
+    header, rows = SharedVehicleSnapshot(path).read()
+    assert (header.generation, header.header_ts, header.fetched_at) == (1, 1234, 50.0)
+    assert rows == _rows()
+
+    writer.touch(60.0)
+    assert SharedVehicleSnapshot(path).read_header().fetched_at == 60.0
+
+    writer.publish(None, [], fetched_at=70.0)
+    header, rows = SharedVehicleSnapshot(path).read()
+    assert (header.generation, header.header_ts, rows) == (2, None, [])
+
+
+def test_only_one_process_leads_until_it_releases(tmp_path) -> None:
+    path = str(tmp_path / "vehicles.bin")
+    first, second = SharedVehicleSnapshot(path), SharedVehicleSnapshot(path)
+    assert first.try_lead()
+    first.publish(None, _rows(), fetched_at=1.0)
+    assert not second.try_lead()
+
+    first.release()
+    assert second.try_lead()
+    # The new fetcher continues the generation sequence.
+    assert second.publish(None, _rows(), fetched_at=2.0) == 2
+
+
+def test_followers_read_the_leaders_snapshot_without_fetching(tmp_path) -> None:
+    gtfs_realtime_pb2 = pytest.importorskip("google.transit.gtfs_realtime_pb2")
+    feed = gtfs_realtime_pb2.FeedMessage()
+    feed.header.gtfs_realtime_version = "2.0"
+    feed.header.timestamp = 1000
+    for i in range(3):
+        ent = feed.entity.add(id=f"e{i}")
+        ent.vehicle.vehicle.id = f"v{i}"
+        ent.vehicle.trip.route_id = "R1"
+        ent.vehicle.position.latitude = 28.1 + i * 0.001
+        ent.vehicle.position.longitude = -15.4
+    content = feed.SerializeToString()
+    calls: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(str(request.url))
+        return httpx.Response(200, content=content)
+
+    def provider() -> HttpGtfsRealtimeVehicleProvider:
+        return HttpGtfsRealtimeVehicleProvider(
+            url="http://rt.test/vehicles",
+            headers_raw="",
+            shared_path=str(tmp_path / "vehicles.bin"),
+            transport=httpx.MockTransport(handler),
+        )
+
+    async def run():
+        leader, follower = provider(), provider()
+        led = await leader.snapshot()
+        followed = await follower.snapshot()
+        stats = (leader.stats(), follower.stats())
+        await leader.aclose()
+        await follower.aclose()
+        return led, followed, stats
+
+    led, followed, (leader_stats, follower_stats) = asyncio.run(run())
+
+    assert len(calls) == 1
+    assert followed.vehicles == led.vehicles
+    assert followed.feed_timestamp == led.feed_timestamp == 1000
+    assert followed.fetched_at == led.fetched_at
+    assert (leader_stats["shared_leader"], follower_stats["shared_leader"]) == (1, 0)
+    assert follower_stats["fetches"] == 0
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from src.domain.algorithms.geo_utils import haversine_distance_m
+from src.domain.algorithms.stop_index import StopSpatialIndex
+from src.domain.models import BoundingBox, GeoPoint, Stop
+
+
+def _stops(n: int = 400) -> list[Stop]:
+    rng = random.Random(3)
+    return [
+        Stop(
+            id=f"S{i}",
+            name=f"S{i}",
+            location=GeoPoint(
+                lat=28.08 + rng.random() * 0.06, lon=-15.45 + rng.random() * 0.06
+            ),
+        )
+        for i in range(n)
+    ]
+
+
+def _brute(stops: list[Stop], point: GeoPoint) -> list[tuple[float, str]]:
+    return sorted((haversine_distance_m(point, s.location), s.id) for s in stops)
+
+
+@pytest.mark.parametrize("cell_m", [100.0, 250.0, 2000.0])
+def test_within_matches_brute_force(cell_m: float) -> None:
+    stops = _stops()
+    index = StopSpatialIndex.build(stops, cell_m=cell_m)
+    point = GeoPoint(lat=28.11, lon=-15.42)
+
+    hits = index.within(point, 900.0)
+
+    expected = [sid for d, sid in _brute(stops, point) if d <= 900.0]
+    assert [s.id for _, s in hits] == expected
+    assert [s.id for _, s in index.within(point, 900.0, max_count=3)] == expected[:3]
+
+
+def test_nearest_matches_brute_force_even_far_from_the_stops() -> None:
+    stops = _stops()
+    index = StopSpatialIndex.build(stops)
+
+    for point in (GeoPoint(lat=28.1, lon=-15.43), GeoPoint(lat=28.3, lon=-15.7)):
+        got = [s.id for _, s in index.nearest(point, 5)]
+        assert got == [sid for _, sid in _brute(stops, point)[:5]]
+
+    assert index.nearest(GeoPoint(lat=28.3, lon=-15.7), 5, max_radius_m=100.0) == []
+    assert StopSpatialIndex.build([]).nearest(GeoPoint(lat=0.0, lon=0.0), 3) == []
+
+
+@pytest.mark.parametrize("cell_m", [100.0, 2000.0])
+def test_in_bbox_matches_a_full_scan(cell_m: float) -> None:
+    stops = _stops()
+    index = StopSpatialIndex.build(stops, cell_m=cell_m)
+    rng = random.Random(5)
+
+    for _ in range(30):
+        lat0, lon0 = 28.08 + rng.random() * 0.06, -15.45 + rng.random() * 0.06
+        box = BoundingBox(
+            min_lat=lat0,
+            min_lon=lon0,
+            max_lat=lat0 + rng.random() * 0.03,
+            max_lon=lon0 + rng.random() * 0.03,
+        )
+        expected = {s.id for s in stops if box.contains(s.location.lat, s.location.lon)}
+        assert {s.id for s in index.in_bbox(box)} == expected
+
+    world = BoundingBox(min_lat=-90.0, min_lon=-180.0, max_lat=90.0, max_lon=180.0)
+    assert len(index.in_bbox(world)) == len(stops)
+    assert len(index.in_bbox(world, limit=10)) == 10
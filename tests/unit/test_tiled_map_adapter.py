@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import networkx as nx
+
+from src.adapters.maps import tiled_map_adapter as tma
+from src.adapters.maps.tiled_map_adapter import TiledMapAdapter
+from src.domain.models import GeoPoint
+
+
+class _FakeUpstream:
+    network_type = "walk"
+
+    def __init__(self) -> None:
+        self.calls: list[tuple[float, float]] = []
+
+    def get_tile_graph(self, *, west: float, south: float, east: float, north: float):
+        self.calls.append((round(west, 4), round(south, 4)))
+        # Each tile holds its SW corner node and the node to its east, so
+        # horizontally adjacent tiles share a node id.
+        g = nx.MultiDiGraph()
+        a = (round(west, 4), round(south, 4))
+        b = (round(east, 4), round(south, 4))
+        g.add_node(a, x=a[0], y=a[1])
+        g.add_node(b, x=b[0], y=b[1])
+        g.add_edge(a, b, length=100.0)
+        return g
+
+
+def _reset_memory() -> None:
+    tma._tiles.clear()
+    tma._stitched.clear()
+    tma._tile_locks.clear()
+
+
+def test_tiles_cover_the_requested_square() -> None:
+    adapter = TiledMapAdapter(upstream=_FakeUpstream(), tile_deg=0.01)  # type: ignore[arg-type]
+
+    tiles = adapter.tiles_for(center=GeoPoint(lat=0.015, lon=0.015), dist_m=100)
+    assert tiles == [(1, 1)]
+
+    tiles = adapter.tiles_for(center=GeoPoint(lat=0.015, lon=0.015), dist_m=1000)
+    assert len(tiles) == 9
+
+
+def test_tiles_are_built_once_and_stitched(tmp_path, monkeypatch) -> None:
+    monkeypatch.delenv("STREET_GRAPH_BUCKET", raising=False)
+    _reset_memory()
+    upstream = _FakeUpstream()
+    adapter = TiledMapAdapter(
+        upstream=upstream,  # type: ignore[arg-type]
+        tile_deg=0.01,
+        cache_dir=tmp_path,
+    )
+
+    # Square spanning two tiles horizontally.
+    center = GeoPoint(lat=0.005, lon=0.01)
+    graph = adapter.get_street_graph(center=center, dist_m=300)
+
+    assert len(upstream.calls) == 2
+    assert nx.has_path(graph, (0.0, 0.0), (0.02, 0.0))
+    assert graph.graph["graph_version"]
+
+    # Same square again: served from memory.
+    assert adapter.get_street_graph(center=center, dist_m=300) is graph
+
+    # Fresh process (memory tiers empty): served from the local disk tier.
+    _reset_memory()
+    again = adapter.get_street_graph(center=center, dist_m=300)
+    assert len(upstream.calls) == 2
+    assert again.graph["graph_version"] == graph.graph["graph_version"]
+    _reset_memory()
+
+
+def test_concurrent_cold_requests_download_a_tile_once(tmp_path, monkeypatch) -> None:
+    import threading
+    import time
+
+    monkeypatch.delenv("STREET_GRAPH_BUCKET", raising=False)
+    _reset_memory()
+
+    class _SlowUpstream(_FakeUpstream):
+        def get_tile_graph(self, **bbox):
+            time.sleep(0.05)
+            return super().get_tile_graph(**bbox)
+
+    upstream = _SlowUpstream()
+    adapter = TiledMapAdapter(
+        upstream=upstream,  # type: ignore[arg-type]
+        tile_deg=0.01,
+        cache_dir=tmp_path,
+    )
+    center = GeoPoint(lat=0.005, lon=0.005)
+    errors: list[BaseException] = []
+
+    def _get() -> None:
+        try:
+            adapter.get_street_graph(center=center, dist_m=100)
+        except BaseException as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=_get) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert not errors
+    assert len(upstream.calls) == 1
+    assert [p.name for p in tmp_path.rglob("*") if p.is_file()] == ["0_0.pkl.gz"]
+    _reset_memory()
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+from src.app.services.vehicle_stream import VehicleStreamHub
+from src.domain.models.realtime import RealtimeVehicle, RealtimeVehicleChanges
+
+
+def _v(vid: str, route_id: str, lat: float) -> RealtimeVehicle:
+    return RealtimeVehicle(
+        vehicle_id=vid, trip_id=None, route_id=route_id, lat=lat, lon=0.0
+    )
+
+
+def _event(frame: str) -> tuple[str, dict]:
+    lines = dict(line.split(": ", 1) for line in frame.strip().splitlines())
+    return lines["event"], json.loads(lines["data"])
+
+
+def test_snapshot_then_filtered_deltas_from_one_poll_per_tick() -> None:
+    feeds = [
+        (_v("a", "R1", 1.0), _v("b", "R2", 2.0)),
+        (_v("a", "R1", 1.5), _v("b", "R2", 2.5)),
+        (_v("b", "R2", 2.5),),
+    ]
+    calls: list[int | None] = []
+
+    async def source(since: int | None) -> RealtimeVehicleChanges:
+        calls.append(since)
+        vehicles = feeds[min(len(calls), len(feeds)) - 1]
+        return RealtimeVehicleChanges(
+            feed_timestamp=len(calls), upserted=vehicles, full=True
+        )
+
+    async def run():
+        hub = VehicleStreamHub(source=source, interval_s=3600)
+        r1 = hub.stream({"R1"})
+        everything = hub.stream()
+        first = await anext(r1)
+        first_all = await anext(everything)
+        await hub.poll_once()
+        second = await anext(r1)
+        await hub.poll_once()
+        third = await anext(r1)
+        all_frames = [await anext(everything), await anext(everything)]
+        await r1.aclose()
+        await everything.aclose()
+        await hub.aclose()
+        return hub, first, first_all, second, third, all_frames
+
+    hub, first, first_all, second, third, all_frames = asyncio.run(run())
+
+    assert calls == [None, 1, 2]
+    assert _event(first) == (
+        "snapshot",
+        {
+            "version": 1,
+            "vehicles": [{"k": "a", "r": "R1", "lat": 1.0, "lon": 0.0, "v": "a"}],
+        },
+    )
+    assert len(_event(first_all)[1]["vehicles"]) == 2
+
+    kind, delta = _event(second)
+    assert kind == "delta" and [v["lat"] for v in delta["upserted"]] == [1.5]
+    assert _event(third)[1] == {"version": 3, "upserted": [], "removed": ["a"]}
+
+    assert [len(_event(f)[1]["upserted"]) for f in all_frames] == [2, 0]
+    assert hub.subscribers == 0
+
+
+def test_slow_subscriber_is_resynced_with_a_snapshot() -> None:
+    n = 0
+
+    async def source(since: int | None) -> RealtimeVehicleChanges:
+        nonlocal n
+        n += 1
+        return RealtimeVehicleChanges(
+            feed_timestamp=n, upserted=(_v("a", "R1", float(n)),), full=True
+        )
+
+    async def run():
+        hub = VehicleStreamHub(source=source, interval_s=3600, queue_size=1)
+        stream = hub.stream()
+        await anext(stream)
+        for _ in range(3):
+            await hub.poll_once()
+        frame = await anext(stream)
+        await stream.aclose()
+        await hub.aclose()
+        return frame
+
+    kind, data = _event(asyncio.run(run()))
+
+    assert kind == "snapshot"
+    assert data["vehicles"][0]["lat"] == 4.0
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from src.adapters.realtime.vehicle_table import VehicleRow, VehicleTable
+
+
+def _row(key: str, lat: float, ts: int = 100) -> VehicleRow:
+    return (key, key, f"T-{key}", "R1", lat, -15.4, None, None, ts, None)
+
+
+def test_unchanged_vehicles_are_not_reallocated() -> None:
+    table = VehicleTable()
+    table.apply(1000, [_row("a", 28.1), _row("b", 28.2)])
+    a, b = table.vehicles
+
+    changed = table.apply(1030, [_row("a", 28.1), _row("b", 28.25, ts=130)])
+
+    assert changed == 1
+    assert table.vehicles[0] is a
+    assert table.vehicles[1] is not b and table.vehicles[1].lat == 28.25
+
+
+def test_changes_since_reports_upserts_and_removals() -> None:
+    table = VehicleTable()
+    table.apply(1000, [_row("a", 28.1), _row("b", 28.2)])
+    table.apply(1030, [_row("a", 28.15), _row("c", 28.3)])
+
+    delta = table.changes_since(1000)
+    assert delta.feed_timestamp == 1030 and not delta.full
+    assert sorted(v.vehicle_id for v in delta.upserted) == ["a", "c"]
+    assert delta.removed == ("b",)
+
+    assert table.changes_since(1030).upserted == ()
+    assert table.changes_since(None).full
+
+
+def test_same_header_timestamp_still_advances() -> None:
+    table = VehicleTable()
+    table.apply(1000, [_row("a", 28.1)])
+    table.apply(1000, [_row("a", 28.2)])
+
+    assert table.feed_timestamp == 1001
+    assert [v.lat for v in table.changes_since(1000).upserted] == [28.2]
+
+
+def test_old_clients_get_the_full_set_after_history_expires() -> None:
+    table = VehicleTable(history_s=60)
+    table.apply(1000, [_row("a", 28.1), _row("b", 28.2)])
+    table.apply(1010, [_row("a", 28.1)])
+    table.apply(1100, [_row("a", 28.12)])
+
+    assert table.changes_since(1000).full
+    assert not table.changes_since(1010).full
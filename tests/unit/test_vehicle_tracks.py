@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from src.app.services.vehicle_tracks import VehicleTrackStore
+from src.domain.models.realtime import RealtimeVehicle
+
+
+def _v(
+    key: str, lat: float, lon: float = -15.4, ts: int | None = 1000, route="R1"
+) -> RealtimeVehicle:
+    return RealtimeVehicle(
+        vehicle_id=key,
+        trip_id=None,
+        route_id=route,
+        lat=lat,
+        lon=lon,
+        timestamp=datetime.fromtimestamp(ts, tz=timezone.utc) if ts else None,
+    )
+
+
+def test_ring_keeps_latest_samples_in_order() -> None:
+    store = VehicleTrackStore(max_vehicles=4, samples=3)
+    for i in range(5):
+        store.record([_v("a", 28.0 + i * 0.001, ts=1000 + i * 10)])
+    # Same timestamp again adds nothing.
+    assert store.record([_v("a", 28.004, ts=1040)]) == 0
+
+    (trail,) = store.trails(now_s=1040)
+    assert trail.key == "a"
+    assert trail.timestamps == (1020.0, 1030.0, 1040.0)
+    assert trail.lats == (28.002, 28.003, 28.004)
+    assert store.trails(max_age_s=15, now_s=1040)[0].timestamps == (1030.0, 1040.0)
+    assert store.trails(route_ids={"R2"}, now_s=1040) == []
+
+
+def test_motion_from_last_two_samples() -> None:
+    store = VehicleTrackStore()
+    store.record([_v("a", 28.0, ts=1000), _v("b", 28.0, ts=1000)])
+    # a moves ~111 m north in 10 s; b sits still.
+    store.record([_v("a", 28.001, ts=1010), _v("b", 28.0, ts=1010)])
+
+    (speed_a, bearing_a), (speed_b, bearing_b), missing = store.motion(["a", "b", "zz"])
+    assert 10.5 < speed_a < 11.6
+    assert bearing_a is not None and (bearing_a < 1 or bearing_a > 359)
+    assert speed_b == 0.0 and bearing_b is None
+    assert missing == (None, None)
+
+
+def test_observe_fills_missing_motion_and_is_memoized() -> None:
+    store = VehicleTrackStore()
+    store.observe((_v("a", 28.0, ts=1000),))
+    snap = (_v("a", 28.0, lon=-15.399, ts=1010),)
+
+    enriched = store.observe(snap)
+    assert enriched[0].speed_mps is not None and enriched[0].speed_mps > 9
+    assert 89 < enriched[0].bearing < 91
+    assert store.observe(snap) is enriched
+
+
+def test_stream_deltas_keep_the_snapshot_memo() -> None:
+    store = VehicleTrackStore()
+    snap = (_v("a", 28.0, ts=1000), _v("b", 28.0, ts=1000))
+    enriched = store.observe(snap)
+
+    delta = store.observe_changes((_v("a", 28.001, ts=1010),))
+    assert delta[0].speed_mps is not None and delta[0].speed_mps > 10
+    # The full snapshot is still served from the memo (identity caches hold).
+    assert store.observe(snap) is enriched
+
+
+def test_untimed_vehicles_only_record_when_moved() -> None:
+    store = VehicleTrackStore()
+    assert store.record([_v("a", 28.0, ts=None)], now_s=1000) == 1
+    assert store.record([_v("a", 28.0, ts=None)], now_s=1010) == 0
+    assert store.record([_v("a", 28.001, ts=None)], now_s=1020) == 1
+
+
+def test_least_recently_seen_vehicle_is_evicted() -> None:
+    store = VehicleTrackStore(max_vehicles=2, samples=4)
+    store.record([_v("a", 28.0, ts=1000), _v("b", 28.0, ts=1005)])
+    store.record([_v("b", 28.1, ts=1010), _v("c", 28.0, ts=1010)])
+
+    assert len(store) == 2
+    assert sorted(t.key for t in store.trails(now_s=1010)) == ["b", "c"]
+    assert store.motion(["a"]) == [(None, None)]
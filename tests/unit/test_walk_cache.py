@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from src.app.services.walk_cache import WalkCache, WalkResult
+from src.domain.models import GeoPoint
+
+
+def _result(n_points: int) -> WalkResult:
+    pts = [GeoPoint(lat=0.0, lon=i * 0.001) for i in range(n_points)]
+    return WalkResult.from_points(float(n_points), pts)
+
+
+def test_walk_result_round_trips_geometry() -> None:
+    r = _result(3)
+    assert r.points() == (
+        GeoPoint(lat=0.0, lon=0.0),
+        GeoPoint(lat=0.0, lon=0.001),
+        GeoPoint(lat=0.0, lon=0.002),
+    )
+
+
+def test_walk_cache_counts_hits_and_misses_per_graph_version() -> None:
+    cache = WalkCache()
+    cache.put("g1", 1, 2, _result(2))
+
+    assert cache.get("g1", 1, 2) is not None
+    assert cache.get("g2", 1, 2) is None
+    assert cache.get("g1", 2, 1) is None
+    # Unversioned graphs are never cached.
+    cache.put(None, 1, 2, _result(2))
+    assert cache.get(None, 1, 2) is None
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+    assert stats["entries"] == 1
+
+
+def test_walk_cache_evicts_least_recently_used_within_byte_budget() -> None:
+    size = _result(10).size_bytes()
+    cache = WalkCache(max_bytes=2 * size)
+
+    cache.put("g", "a", "b", _result(10))
+    cache.put("g", "c", "d", _result(10))
+    assert cache.get("g", "a", "b") is not None  # a->b becomes most recent
+    cache.put("g", "e", "f", _result(10))
+
+    assert cache.get("g", "c", "d") is None
+    assert cache.get("g", "a", "b") is not None
+    assert cache.get("g", "e", "f") is not None
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] <= 2 * size
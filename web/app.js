@@ -21,6 +21,7 @@ let rtLineLayers = new Map(); // route_id -> array of polyline layers
 let rtVehicleMarkers = new Map(); // vehicle key -> marker
 let rtStopMarkersByRoute = new Map(); // route_id -> array of markers
 let rtPollTimer = null;
+let rtStream = null; // EventSource on /api/realtime/vehicles/stream
 
 function setStatus(text) {
   if (!statusBox) return;
@@ -614,7 +615,7 @@ function renderRealtimeRoutes(routes) {
       else rtSelectedRouteIds.delete(rid);
 
       await syncRealtimeLayers();
-      await refreshRealtimeVehicles();
+      await updateRealtimeVehicles();
     });
   }
 }
@@ -716,16 +717,52 @@ function vehicleKey(v, idx) {
   return v.vehicle_id || v.trip_id || `${v.route_id || 'unknown'}:${idx}`;
 }
 
+function clearVehicleMarkers() {
+  for (const marker of rtVehicleMarkers.values()) {
+    try { marker.remove(); } catch (_) {}
+  }
+  rtVehicleMarkers = new Map();
+}
+
+function removeVehicleMarker(key) {
+  const marker = rtVehicleMarkers.get(key);
+  if (!marker) return;
+  try { marker.remove(); } catch (_) {}
+  rtVehicleMarkers.delete(key);
+}
+
+function upsertVehicleMarker(key, v) {
+  if (!v || typeof v.lat !== 'number' || typeof v.lon !== 'number') return;
+
+  const r = v.route_id ? rtRoutesById.get(v.route_id) : null;
+  const color = rtRouteColor(r || { route_id: v.route_id || key });
+
+  const label = `Vehículo ${escapeHtml(v.vehicle_id || '?')}<br/>Línea ${escapeHtml(routeDisplayName(r) || v.route_id || '?')}`;
+
+  const existing = rtVehicleMarkers.get(key);
+  if (existing) {
+    existing.setLatLng([v.lat, v.lon]);
+  } else {
+    const marker = L.circleMarker([v.lat, v.lon], {
+      radius: 7,
+      weight: 2,
+      color: '#111111',
+      fillColor: color,
+      fillOpacity: 1.0,
+    }).addTo(map);
+    marker._rtRouteId = String(v.route_id || '');
+    marker.bindPopup(label);
+    rtVehicleMarkers.set(key, marker);
+  }
+}
+
 async function refreshRealtimeVehicles() {
   if (!realtimeViewActive) return;
 
   if (!rtSelectedRouteIds || rtSelectedRouteIds.size === 0) {
     setStatus('Selecciona al menos una línea.');
     // Clear vehicles if nothing selected.
-    for (const marker of rtVehicleMarkers.values()) {
-      try { marker.remove(); } catch (_) {}
-    }
-    rtVehicleMarkers = new Map();
+    clearVehicleMarkers();
     return;
   }
 
@@ -741,35 +778,12 @@ async function refreshRealtimeVehicles() {
       if (!v || typeof v.lat !== 'number' || typeof v.lon !== 'number') return;
       const key = vehicleKey(v, idx);
       seen.add(key);
-
-      const r = v.route_id ? rtRoutesById.get(v.route_id) : null;
-      const color = rtRouteColor(r || { route_id: v.route_id || key });
-
-      const label = `Vehículo ${escapeHtml(v.vehicle_id || '?')}<br/>Línea ${escapeHtml(routeDisplayName(r) || v.route_id || '?')}`;
-
-      const existing = rtVehicleMarkers.get(key);
-      if (existing) {
-        existing.setLatLng([v.lat, v.lon]);
-      } else {
-        const marker = L.circleMarker([v.lat, v.lon], {
-          radius: 7,
-          weight: 2,
-          color: '#111111',
-          fillColor: color,
-          fillOpacity: 1.0,
-        }).addTo(map);
-        marker._rtRouteId = String(v.route_id || '');
-        marker.bindPopup(label);
-        rtVehicleMarkers.set(key, marker);
-      }
+      upsertVehicleMarker(key, v);
     });
 
     // Remove stale markers
-    for (const [key, marker] of rtVehicleMarkers.entries()) {
-      if (!seen.has(key)) {
-        try { marker.remove(); } catch (_) {}
-        rtVehicleMarkers.delete(key);
-      }
+    for (const key of [...rtVehicleMarkers.keys()]) {
+      if (!seen.has(key)) removeVehicleMarker(key);
     }
 
     setStatus(`Tiempo real: ${vehicles.length} guaguas.`);
@@ -778,19 +792,90 @@ async function refreshRealtimeVehicles() {
   }
 }
 
+// Stream vehicles use compact keys: k=key, r=route_id, v=vehicle_id, t=trip_id.
+function streamVehicle(c) {
+  return { vehicle_id: c.v, trip_id: c.t, route_id: c.r, lat: c.lat, lon: c.lon };
+}
+
+function applyVehicleStreamEvent(kind, data) {
+  if (kind === 'snapshot') {
+    const keep = new Set();
+    for (const c of data?.vehicles || []) {
+      keep.add(c.k);
+      upsertVehicleMarker(c.k, streamVehicle(c));
+    }
+    for (const key of [...rtVehicleMarkers.keys()]) {
+      if (!keep.has(key)) removeVehicleMarker(key);
+    }
+  } else {
+    for (const c of data?.upserted || []) upsertVehicleMarker(c.k, streamVehicle(c));
+    for (const key of data?.removed || []) removeVehicleMarker(key);
+  }
+  setStatus(`Tiempo real: ${rtVehicleMarkers.size} guaguas.`);
+}
+
+function closeVehicleStream() {
+  if (rtStream) rtStream.close();
+  rtStream = null;
+}
+
+function startVehiclePolling() {
+  if (rtPollTimer) clearInterval(rtPollTimer);
+  refreshRealtimeVehicles();
+  rtPollTimer = setInterval(refreshRealtimeVehicles, 30000);
+}
+
+function openVehicleStream() {
+  closeVehicleStream();
+  if (!realtimeViewActive) return;
+
+  if (!rtSelectedRouteIds || rtSelectedRouteIds.size === 0) {
+    setStatus('Selecciona al menos una línea.');
+    clearVehicleMarkers();
+    return;
+  }
+
+  // Filtering happens server-side; the stream is reopened when the selection changes.
+  const qs = new URLSearchParams();
+  for (const rid of rtSelectedRouteIds) qs.append('route_id', rid);
+  const es = new EventSource(`/api/realtime/vehicles/stream?${qs.toString()}`);
+  const handle = (kind) => (ev) => {
+    try { applyVehicleStreamEvent(kind, JSON.parse(ev.data)); } catch (_) {}
+  };
+  es.addEventListener('snapshot', handle('snapshot'));
+  es.addEventListener('delta', handle('delta'));
+  es.onerror = () => {
+    // EventSource retries on its own; fall back to polling once it gives up.
+    if (es.readyState === EventSource.CLOSED && rtStream === es) {
+      closeVehicleStream();
+      startVehiclePolling();
+    }
+  };
+  rtStream = es;
+}
+
+async function updateRealtimeVehicles() {
+  if (typeof EventSource === 'undefined' || rtPollTimer) {
+    await refreshRealtimeVehicles();
+    return;
+  }
+  openVehicleStream();
+}
+
 function startRealtimeView() {
   stopRealtimeView();
   if (!rtRoutesById || rtRoutesById.size === 0) {
     loadRealtimeRoutes().then(async () => {
       await syncRealtimeLayers();
-      await refreshRealtimeVehicles();
+      await updateRealtimeVehicles();
     });
   }
-  refreshRealtimeVehicles();
-  rtPollTimer = setInterval(refreshRealtimeVehicles, 30000);
+  if (typeof EventSource === 'undefined') startVehiclePolling();
+  else openVehicleStream();
 }
 
 function stopRealtimeView() {
+  closeVehicleStream();
   if (rtPollTimer) clearInterval(rtPollTimer);
   rtPollTimer = null;
 }
@@ -902,11 +987,12 @@ if (tabRealtimeBtn) tabRealtimeBtn.addEventListener('click', () => setActiveView
 
 if (btnRtRefresh) btnRtRefresh.addEventListener('click', async () => {
   await syncRealtimeLayers();
-  await refreshRealtimeVehicles();
+  await updateRealtimeVehicles();
 });
 
 if (btnRtClear) btnRtClear.addEventListener('click', () => {
   rtSelectedRouteIds = new Set();
+  closeVehicleStream();
   clearRealtimeLayers();
   if (rtLinesBox) {
     for (const el of rtLinesBox.querySelectorAll('input[type=checkbox][data-route-id]')) {